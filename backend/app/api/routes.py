@@ -1,30 +1,157 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from app.models.schemas import (
     UploadResponse,
+    BatchUploadResponse,
     SummarizeRequest,
     SummarizeResponse,
     StorylineRequest,
     StorylineResponse,
     AskRequest,
     AskResponse,
+    AskBatchRequest,
+    LibraryAskRequest,
+    LibraryAskResponse,
+    LibrarySource,
     RateRequest,
     RateResponse,
     ModelInfo,
     SessionDetailResponse,
+    RelatedPaper,
+    RelatedPapersResponse,
     EvaluateRequest,
     EvaluateResponse,
-    EvaluationScores
+    EvaluationScores,
+    BatchEvaluateRequest,
+    BatchEvaluateResponse,
+    ThreadCreateRequest,
+    ThreadResponse
 )
 from app.services.pdf_parser import PDFParser
+from app.services.parse_cache import parse_pdf_cached
 from app.services.session_manager import session_manager
 from app.services.llm_service import llm_service
 from app.services.rag_service import rag_service
-from typing import List
+from app.services.rate_limiter import rate_limiter, Priority
+from app.services.batch_evaluator import batch_evaluator, evaluation_key
+from app.services.batch_ingestor import batch_ingestor
+from app.services.retention import delete_sessions
+from app.config import settings
+from app.services.metrics import observe_stage, record_cache
+from app.services.conversation import conversation_manager
+from typing import Any, List, Optional
+import asyncio
+import gzip
+import hashlib
+import json
+import os
 
 router = APIRouter()
 pdf_parser = PDFParser()
 
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+}
+
+
+# Strong references to fire-and-forget tasks so they are not garbage collected
+_background_tasks = set()
+
+
+def _run_in_background(coro):
+    """Schedule a coroutine without awaiting it"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _accepts_gzip(request: Request) -> bool:
+    """Whether the Accept-Encoding header allows gzip (q=0 refuses it)"""
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _json_response(request: Request, content: Any, etag: Optional[str] = None) -> Response:
+    """
+    JSON response, gzip-compressed when large and the client accepts it
+    
+    Args:
+        request: Incoming request (for Accept-Encoding)
+        content: JSON-serializable content
+        etag: Strong entity tag of the uncompressed representation (optional);
+            the compressed one gets a "-gzip" suffix, as the bytes differ
+        
+    Returns:
+        Response with Vary: Accept-Encoding
+    """
+    body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= settings.gzip_minimum_size and _accepts_gzip(request):
+        body = gzip.compress(body, compresslevel=settings.gzip_level)
+        headers["Content-Encoding"] = "gzip"
+        if etag:
+            etag = f'{etag[:-1]}-gzip"'
+    if etag:
+        headers["ETag"] = etag
+        # Cache, but revalidate on every navigation
+        headers["Cache-Control"] = "private, no-cache"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _etag_match(request: Request, etag: str) -> Optional[str]:
+    """
+    If-None-Match check (weak comparison, either content coding)
+    
+    Returns:
+        The matching entity tag (the compressed variant if that is what the
+        client holds), or None
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    accepted = {etag, f'{etag[:-1]}-gzip"'}
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag == "*":
+            return etag
+        if tag in accepted:
+            return tag
+    return None
+
+
+def _sse_event(payload: dict) -> str:
+    """Format a payload as a Server-Sent Events data line"""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def _auto_evaluate(session_id: str, paper_text: str, summary: str, model: str):
+    """
+    Evaluate a freshly generated summary, store the result on the session
+    and log it to Langfuse
+    Failures are logged and never propagated to the caller
+    """
+    try:
+        evaluation = await llm_service.evaluate_summary(
+            original_text=paper_text,
+            summary=summary,
+            model=model,
+            session_id=session_id,
+            # Nobody waits on this evaluation, so it queues behind user requests
+            priority=Priority.BACKGROUND
+        )
+        if "error" not in evaluation:
+            session_manager.save_evaluation(session_id, evaluation_key(summary, model), evaluation)
+        print(f"✅ Summary evaluated - Overall Score: {evaluation['overall_score']}/10")
+        print(f"   Scores: F={evaluation['faithfulness']}, C={evaluation['completeness']}, "
+              f"Co={evaluation['conciseness']}, Ch={evaluation['coherence']}, Cl={evaluation['clarity']}")
+    except Exception as eval_error:
+        # Don't fail the summarization if evaluation fails
+        print(f"⚠️  Summary evaluation failed (non-critical): {eval_error}")
+
 
 @router.post("/upload", response_model=UploadResponse)
 async def upload_pdf(file: UploadFile = File(...)):
@@ -35,25 +162,34 @@ async def upload_pdf(file: UploadFile = File(...)):
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
     
+    staged = None
     try:
-        # Read file content
-        content = await file.read()
+        # Stream the upload to disk; parsing reads that file, not a copy in memory
+        staged = await session_manager.stage_upload(file.file)
+        if staged is None:
+            raise HTTPException(status_code=413, detail="File too large")
         
-        # Extract text from PDF
-        text = await pdf_parser.extract_text_from_pdf(content)
+        with observe_stage("pdf_parse"):
+            # Pages are kept for boilerplate detection; the same PDF is parsed only once
+            parsed = await asyncio.to_thread(parse_pdf_cached, staged, file.filename)
+        record_cache("pdf_parse", parsed["cached"])
+        cleaned_text = parsed["text"]
         
-        # Clean the text
-        cleaned_text = pdf_parser.clean_text(text)
-        
-        # Create session with PDF content
+        # Create session, moving the staged PDF into place
         session_id = session_manager.create_session(
             filename=file.filename,
             text=cleaned_text,
-            pdf_content=content  # Save PDF file
+            pdf_file=staged,
+            content_hash=parsed["content_hash"]
         )
+        staged = None
         
-        # Extract metadata (title, authors, year)
-        metadata = await llm_service.extract_metadata(cleaned_text)
+        # Extract metadata (title, authors, year), locally when possible
+        metadata = await llm_service.extract_metadata(
+            cleaned_text,
+            filename=file.filename,
+            local=parsed["metadata"]
+        )
         session_manager.update_metadata(
             session_id,
             title=metadata["title"],
@@ -62,7 +198,7 @@ async def upload_pdf(file: UploadFile = File(...)):
         )
         
         # Index document for RAG
-        num_chunks = await rag_service.index_document(session_id, cleaned_text)
+        num_chunks = await rag_service.index_document(session_id, cleaned_text, pages=parsed["pages"])
         
         return UploadResponse(
             session_id=session_id,
@@ -71,8 +207,34 @@ async def upload_pdf(file: UploadFile = File(...)):
             message=f"PDF uploaded successfully. Indexed {num_chunks} chunks."
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if staged and os.path.exists(staged):
+            os.remove(staged)
+
+
+@router.post("/upload/batch", response_model=BatchUploadResponse)
+async def upload_batch(files: List[UploadFile] = File(...)):
+    """
+    Upload many PDFs (or zip archives of PDFs) and ingest them in the background
+    Poll GET /upload/batch/{job_id} for per-file status and session ids
+    """
+    job = await batch_ingestor.start([(file.filename, file.file) for file in files])
+    return BatchUploadResponse(**job.to_dict())
+
+
+@router.get("/upload/batch/{job_id}", response_model=BatchUploadResponse)
+async def get_batch_upload(job_id: str):
+    """
+    Get per-file status of a batch upload
+    """
+    job = batch_ingestor.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch upload not found")
+    return BatchUploadResponse(**job.to_dict())
 
 
 @router.post("/summarize", response_model=SummarizeResponse)
@@ -90,7 +252,9 @@ async def summarize_paper(request: SummarizeRequest):
         model_used = request.model or llm_service.default_model
         
         # If summary already exists and no custom prompt, return cached summary
-        if session.summary and not request.custom_prompt:
+        cached = bool(session.summary and not request.custom_prompt)
+        record_cache("summary", cached)
+        if cached:
             print(f"✅ Returning cached summary for session {request.session_id}")
             return SummarizeResponse(
                 session_id=request.session_id,
@@ -113,19 +277,7 @@ async def summarize_paper(request: SummarizeRequest):
         session_manager.update_summary(request.session_id, summary)
 
         # Automatically evaluate the summary and log to Langfuse
-        try:
-            evaluation = await llm_service.evaluate_summary(
-                original_text=paper_text,
-                summary=summary,
-                model=model_used,
-                session_id=request.session_id
-            )
-            print(f"✅ Summary evaluated - Overall Score: {evaluation['overall_score']}/10")
-            print(f"   Scores: F={evaluation['faithfulness']}, C={evaluation['completeness']}, "
-                  f"Co={evaluation['conciseness']}, Ch={evaluation['coherence']}, Cl={evaluation['clarity']}")
-        except Exception as eval_error:
-            # Don't fail the summarization if evaluation fails
-            print(f"⚠️  Summary evaluation failed (non-critical): {eval_error}")
+        await _auto_evaluate(request.session_id, paper_text, summary, model_used)
 
         return SummarizeResponse(
             session_id=request.session_id,
@@ -137,6 +289,54 @@ async def summarize_paper(request: SummarizeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/summarize/stream")
+async def summarize_paper_stream(request: SummarizeRequest):
+    """
+    Summarize the paper from a session with streaming response
+    Cached summaries are sent as a single chunk; new summaries are saved
+    to the session and evaluated in the background once complete
+    """
+    # Check if session exists
+    session = session_manager.get_session(request.session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    model_used = request.model or llm_service.default_model
+    paper_text = session.text
+
+    async def generate():
+        try:
+            # If summary already exists and no custom prompt, return cached summary
+            cached = bool(session.summary and not request.custom_prompt)
+            record_cache("summary", cached)
+            if cached:
+                print(f"✅ Returning cached summary for session {request.session_id}")
+                yield _sse_event({'type': 'content', 'content': session.summary})
+                yield _sse_event({'type': 'done', 'model': model_used, 'cached': True})
+                return
+
+            print(f"🔄 Streaming new summary for session {request.session_id}")
+            parts = []
+            async for chunk in llm_service.summarize_paper_stream(
+                paper_text=paper_text,
+                custom_prompt=request.custom_prompt,
+                model=request.model
+            ):
+                parts.append(chunk)
+                yield _sse_event({'type': 'content', 'content': chunk})
+
+            summary = "".join(parts)
+            session_manager.update_summary(request.session_id, summary)
+            yield _sse_event({'type': 'done', 'model': model_used, 'cached': False})
+
+            # Evaluate after the stream has finished so it never delays the user
+            _run_in_background(_auto_evaluate(request.session_id, paper_text, summary, model_used))
+        except Exception as e:
+            yield _sse_event({'type': 'error', 'error': str(e)})
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.post("/storyline", response_model=StorylineResponse)
 async def analyze_storyline(request: StorylineRequest):
     """
@@ -151,6 +351,7 @@ async def analyze_storyline(request: StorylineRequest):
         model_used = request.model or llm_service.default_model
         
         # If storyline already exists, return cached version
+        record_cache("storyline", bool(session.storyline))
         if session.storyline:
             print(f"✅ Returning cached storyline for session {request.session_id}")
             return StorylineResponse(
@@ -182,10 +383,77 @@ async def analyze_storyline(request: StorylineRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/storyline/stream")
+async def analyze_storyline_stream(request: StorylineRequest):
+    """
+    Analyze the paper's storyline/narrative flow with streaming response
+    Cached storylines are sent as a single chunk
+    """
+    # Check if session exists
+    session = session_manager.get_session(request.session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    model_used = request.model or llm_service.default_model
+
+    async def generate():
+        try:
+            # If storyline already exists, return cached version
+            record_cache("storyline", bool(session.storyline))
+            if session.storyline:
+                print(f"✅ Returning cached storyline for session {request.session_id}")
+                yield _sse_event({'type': 'content', 'content': session.storyline})
+                yield _sse_event({'type': 'done', 'model': model_used, 'cached': True})
+                return
+
+            print(f"🔄 Streaming new storyline for session {request.session_id}")
+            parts = []
+            async for chunk in llm_service.analyze_storyline_stream(
+                paper_text=session.text,
+                model=request.model,
+                language=request.language or "en"
+            ):
+                parts.append(chunk)
+                yield _sse_event({'type': 'content', 'content': chunk})
+
+            session_manager.update_storyline(request.session_id, "".join(parts))
+            yield _sse_event({'type': 'done', 'model': model_used, 'cached': False})
+        except Exception as e:
+            yield _sse_event({'type': 'error', 'error': str(e)})
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def _get_thread(session_id: str, thread_id: str):
+    """Look up a conversation thread of a session, or raise 404"""
+    thread = conversation_manager.get_thread(thread_id)
+    if not thread or thread.session_id != session_id:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    return thread
+
+
+async def _prepare_question(session_id: str, question: str, thread_id: Optional[str]):
+    """
+    Retrieve context for a question, continuing a thread if one is given
+
+    Returns:
+        Tuple of (thread or None, context, sources, history messages,
+        (chunk index, text) pairs, whether the previous turn's chunks were reused)
+    """
+    if thread_id:
+        thread = _get_thread(session_id, thread_id)
+        turn = await conversation_manager.prepare_turn(thread, question)
+        return thread, turn.context, turn.sources, turn.history, turn.chunks, turn.reused
+    chunks, citations = await rag_service.retrieve_chunks(session_id, question)
+    context, sources = rag_service.format_context(chunks, citations)
+    return None, context, sources, None, tuple(chunks), False
+
+
 @router.post("/ask", response_model=AskResponse)
 async def ask_question(request: AskRequest):
     """
     Ask a question about the paper using RAG
+    With thread_id, the question continues that conversation thread
     """
     # Check if session exists
     session = session_manager.get_session(request.session_id)
@@ -193,11 +461,9 @@ async def ask_question(request: AskRequest):
         raise HTTPException(status_code=404, detail="Session not found")
     
     try:
-        # Query relevant context using RAG
-        context, sources = await rag_service.query_document(
-            session_id=request.session_id,
-            question=request.question,
-            top_k=3
+        # Query relevant context using RAG (or reuse the previous turn's chunks)
+        thread, context, sources, history, chunks, reused = await _prepare_question(
+            request.session_id, request.question, request.thread_id
         )
         
         if not context:
@@ -210,14 +476,20 @@ async def ask_question(request: AskRequest):
         answer = await llm_service.answer_question(
             question=request.question,
             context=context,
-            model=request.model
+            model=request.model,
+            history=history
         )
         
+        if thread:
+            conversation_manager.record_turn(thread, request.question, answer, chunks)
+        
         return AskResponse(
             session_id=request.session_id,
             question=request.question,
             answer=answer,
-            sources=sources
+            sources=sources,
+            thread_id=thread.thread_id if thread else None,
+            reused_context=reused
         )
     
     except HTTPException:
@@ -226,58 +498,195 @@ async def ask_question(request: AskRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _stream_answer(session_id: str, question: str, model: Optional[str], thread_id: Optional[str]):
+    """
+    Answer one question as a sequence of event payloads
+    (sources, content..., done) shared by the SSE and WebSocket endpoints
+    """
+    thread, context, sources, history, chunks, reused = await _prepare_question(
+        session_id, question, thread_id
+    )
+    if not context:
+        raise HTTPException(status_code=404, detail="No relevant context found for the question")
+    
+    # Send sources first
+    yield {'type': 'sources', 'sources': sources, 'reused_context': reused}
+    
+    # Then stream the answer
+    answer = []
+    async for chunk in llm_service.answer_question_stream(
+        question=question,
+        context=context,
+        model=model,
+        history=history
+    ):
+        answer.append(chunk)
+        yield {'type': 'content', 'content': chunk}
+    
+    if thread:
+        conversation_manager.record_turn(thread, question, "".join(answer), chunks)
+    
+    # Send done signal
+    yield {'type': 'done', 'thread_id': thread.thread_id if thread else None}
+
+
 @router.post("/ask/stream")
 async def ask_question_stream(request: AskRequest):
     """
     Ask a question about the paper using RAG with streaming response
+    With thread_id, the question continues that conversation thread
     """
     # Check if session exists
     session = session_manager.get_session(request.session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
+    if request.thread_id:
+        _get_thread(request.session_id, request.thread_id)
     
-    try:
-        # Query relevant context using RAG
-        context, sources = await rag_service.query_document(
-            session_id=request.session_id,
-            question=request.question,
-            top_k=3
+    async def generate():
+        try:
+            async for event in _stream_answer(
+                request.session_id, request.question, request.model, request.thread_id
+            ):
+                yield _sse_event(event)
+        except HTTPException as e:
+            yield _sse_event({'type': 'error', 'error': e.detail})
+        except Exception as e:
+            yield _sse_event({'type': 'error', 'error': str(e)})
+    
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/ask/batch")
+async def ask_batch(request: AskBatchRequest):
+    """
+    Answer many questions about one paper, streaming each answer as it completes
+
+    All questions are embedded in one request and retrieved concurrently;
+    completions run concurrently under the rate limiter. Identical questions
+    are answered once. Streams NDJSON lines (or SSE events with format="sse"):
+    {"type": "answer", "indices", "question", "answer", "sources"} or
+    {"type": "error", "indices", "question", "error"} per question, then
+    {"type": "done"}.
+    """
+    session = session_manager.get_session(request.session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if request.format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    
+    # Positions of each distinct question in the request
+    positions = {}
+    for position, question in enumerate(request.questions):
+        if question.strip():
+            positions.setdefault(question.strip(), []).append(position)
+    if not positions:
+        raise HTTPException(status_code=400, detail="No questions given")
+    if len(positions) > settings.ask_batch_max_questions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.ask_batch_max_questions} questions per batch"
         )
-        
+    questions = list(positions)
+    concurrency = max(1, min(request.concurrency, settings.ask_batch_max_concurrency))
+    
+    def encode(event: dict) -> str:
+        if request.format == "sse":
+            return _sse_event(event)
+        return json.dumps(event) + "\n"
+    
+    async def answer(question: str, chunks, citations, semaphore: asyncio.Semaphore) -> dict:
+        result = {"indices": positions[question], "question": question}
+        context, sources = rag_service.format_context(chunks, citations)
         if not context:
-            raise HTTPException(
-                status_code=404,
-                detail="No relevant context found for the question"
-            )
-        
-        # Stream answer using LLM
-        def generate():
-            try:
-                # Send sources first
-                import json
-                yield f"data: {json.dumps({'type': 'sources', 'sources': sources})}\n\n"
-                
-                # Then stream the answer
-                for chunk in llm_service.answer_question_stream(
-                    question=request.question,
+            return {"type": "error", **result, "error": "No relevant context found for the question"}
+        try:
+            async with semaphore:
+                text = await llm_service.answer_question(
+                    question=question,
                     context=context,
-                    model=request.model
-                ):
-                    yield f"data: {json.dumps({'type': 'content', 'content': chunk})}\n\n"
-                
-                # Send done signal
-                yield f"data: {json.dumps({'type': 'done'})}\n\n"
-            except Exception as e:
-                yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+                    model=request.model,
+                    priority=Priority.DEFAULT
+                )
+            return {"type": "answer", **result, "answer": text, "sources": sources}
+        except Exception as e:
+            return {"type": "error", **result, "error": str(e)}
+    
+    async def generate():
+        try:
+            retrieved = await rag_service.retrieve_batch(request.session_id, questions)
+        except Exception as e:
+            yield encode({"type": "error", "error": f"Retrieval failed: {e}"})
+            return
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = [
+            asyncio.create_task(answer(question, chunks, citations, semaphore))
+            for question, (chunks, citations) in zip(questions, retrieved)
+        ]
+        answered = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                event = await next_result
+                answered += event["type"] == "answer"
+                yield encode(event)
+        finally:
+            # Client went away: stop the remaining completions
+            for task in tasks:
+                task.cancel()
         
-        return StreamingResponse(
-            generate(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-            }
+        unique_chunks = {index for chunks, _ in retrieved for index, _ in chunks}
+        yield encode({
+            "type": "done",
+            "questions": len(questions),
+            "answered": answered,
+            "failed": len(questions) - answered,
+            "unique_chunks": len(unique_chunks)
+        })
+    
+    media_type = "text/event-stream" if request.format == "sse" else "application/x-ndjson"
+    return StreamingResponse(generate(), media_type=media_type, headers=SSE_HEADERS)
+
+
+@router.post("/library/ask", response_model=LibraryAskResponse)
+async def ask_library(request: LibraryAskRequest):
+    """
+    Ask a question across all papers (or the given sessions)
+    Papers are shortlisted by their paper-level vectors, then chunks are
+    searched within the shortlist; sources cite session id and page
+    """
+    if request.session_ids is None:
+        session_ids = session_manager.session_ids()
+    else:
+        session_ids = [s for s in request.session_ids if session_manager.session_exists(s, touch=False)]
+    
+    try:
+        chunks = await rag_service.retrieve_library(request.question, session_ids=session_ids)
+        if not chunks:
+            raise HTTPException(status_code=404, detail="No relevant context found in the library")
+        
+        sources = []
+        excerpts = []
+        for number, chunk in enumerate(chunks, start=1):
+            session = session_manager.get_session(chunk["session_id"])
+            title = (session.title or session.filename) if session else None
+            source = LibrarySource(
+                label=f"S{number}",
+                session_id=chunk["session_id"],
+                title=title,
+                page=chunk["page"],
+                chunk_index=chunk["chunk_index"]
+            )
+            sources.append(source)
+            page = f", page {source.page}" if source.page else ""
+            excerpts.append(f"[{source.label}] {title or source.session_id}{page}\n{chunk['text']}")
+        
+        answer = await llm_service.answer_library_question(
+            question=request.question,
+            context="\n\n".join(excerpts),
+            model=request.model
         )
+        return LibraryAskResponse(question=request.question, answer=answer, sources=sources)
     
     except HTTPException:
         raise
@@ -285,6 +694,80 @@ async def ask_question_stream(request: AskRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/threads", response_model=ThreadResponse)
+async def create_thread(request: ThreadCreateRequest):
+    """
+    Start a conversation thread; pass its thread_id to /ask or /ask/stream
+    """
+    if not session_manager.session_exists(request.session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    thread = conversation_manager.create_thread(request.session_id)
+    return ThreadResponse(**conversation_manager.to_dict(thread))
+
+
+@router.get("/threads/{thread_id}", response_model=ThreadResponse)
+async def get_thread(thread_id: str):
+    """
+    Get a conversation thread's rolling summary and recent turns
+    """
+    thread = conversation_manager.get_thread(thread_id)
+    if not thread:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    return ThreadResponse(**conversation_manager.to_dict(thread))
+
+
+@router.websocket("/ask/ws/{session_id}")
+async def ask_websocket(websocket: WebSocket, session_id: str, thread_id: Optional[str] = None):
+    """
+    Conversation over one WebSocket connection
+
+    Creates a thread (or continues ?thread_id=...) and announces it with a
+    {"type": "thread"} message. Each {"question": ..., "model": ...} message
+    is answered with the same events as /ask/stream.
+    """
+    await websocket.accept()
+    if not session_manager.session_exists(session_id):
+        await websocket.send_json({'type': 'error', 'error': 'Session not found'})
+        await websocket.close(code=4404)
+        return
+    thread = conversation_manager.get_thread(thread_id) if thread_id else None
+    if not thread or thread.session_id != session_id:
+        thread = conversation_manager.create_thread(session_id)
+    await websocket.send_json({'type': 'thread', 'thread_id': thread.thread_id})
+    
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except (ValueError, TypeError, KeyError):
+                await websocket.send_json({'type': 'error', 'error': 'Invalid JSON message'})
+                continue
+            question = message.get("question") if isinstance(message, dict) else None
+            model = message.get("model") if isinstance(message, dict) else None
+            if not isinstance(question, str) or not question.strip():
+                await websocket.send_json({'type': 'error', 'error': 'Expected {"question": "..."}'})
+                continue
+            if model is not None and not isinstance(model, str):
+                await websocket.send_json({'type': 'error', 'error': 'model must be a string'})
+                continue
+            question = question.strip()
+            if conversation_manager.get_thread(thread.thread_id) is None:
+                # Expired while the connection was idle
+                thread = conversation_manager.create_thread(session_id)
+                await websocket.send_json({'type': 'thread', 'thread_id': thread.thread_id})
+            try:
+                async for event in _stream_answer(session_id, question, model, thread.thread_id):
+                    await websocket.send_json(event)
+            except HTTPException as e:
+                await websocket.send_json({'type': 'error', 'error': e.detail})
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                await websocket.send_json({'type': 'error', 'error': str(e)})
+    except WebSocketDisconnect:
+        pass
+
+
 @router.post("/rate", response_model=RateResponse)
 async def rate_summary(request: RateRequest):
     """
@@ -329,14 +812,22 @@ async def get_models():
     return [ModelInfo(**model) for model in models]
 
 
+@router.get("/rate-limits")
+async def get_rate_limits():
+    """
+    Get OpenAI rate limiter queue depth, wait time and retry counters per model
+    """
+    return rate_limiter.get_stats()
+
+
 @router.get("/sessions")
-async def get_all_sessions():
+async def get_all_sessions(request: Request):
     """
     Get all paper sessions (history)
     """
     sessions = session_manager.get_all_sessions()
     
-    return [
+    return _json_response(request, [
         {
             "session_id": session.session_id,
             "filename": session.filename,
@@ -346,27 +837,56 @@ async def get_all_sessions():
             "authors": session.authors,
             "year": session.year,
             "created_at": session.created_at.isoformat(),
-            "text_length": len(session.text)
+            "text_length": session.text_length
         }
         for session in sessions
-    ]
+    ])
+
+
+SESSION_DETAIL_FIELDS = tuple(SessionDetailResponse.model_fields)
 
 
 @router.get("/session/{session_id}", response_model=SessionDetailResponse)
-async def get_session_detail(session_id: str):
+async def get_session_detail(session_id: str, request: Request, fields: Optional[str] = None):
     """
     Get session detail including PDF text content
+    
+    fields is an optional comma-separated projection (e.g. "title,authors,summary");
+    the paper text is only decompressed and sent when it is requested. Responses
+    carry a strong ETag of the session's content version and fields, and
+    If-None-Match is answered with 304 Not Modified.
     """
     session = session_manager.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    selected = SESSION_DETAIL_FIELDS
+    if fields is not None:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = sorted(set(requested) - set(SESSION_DETAIL_FIELDS))
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(SESSION_DETAIL_FIELDS)}"
+            )
+        selected = tuple(name for name in SESSION_DETAIL_FIELDS if name in requested)
+    
     has_pdf = session.pdf_path is not None and session_manager.get_pdf_path(session_id) is not None
+    # has_pdf depends on the file, not the record version
+    fingerprint = f"{session_id}:{session.created_at.isoformat()}:{session.version}:{has_pdf}:{','.join(selected)}"
+    etag = f'"{hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:32]}"'
+    matched = _etag_match(request, etag)
+    if matched:
+        return Response(status_code=304, headers={
+            "ETag": matched,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "private, no-cache",
+        })
     
-    return SessionDetailResponse(
+    detail = SessionDetailResponse.model_construct(
         session_id=session.session_id,
         filename=session.filename,
-        text=session.text,
+        text=session.text if "text" in selected else "",
         has_pdf=has_pdf,
         title=session.title,
         authors=session.authors,
@@ -376,6 +896,44 @@ async def get_session_detail(session_id: str):
         rating=session.rating,
         created_at=session.created_at.isoformat()
     )
+    return _json_response(request, detail.model_dump(include=set(selected)), etag=etag)
+
+
+@router.delete("/session/{session_id}")
+async def delete_session(session_id: str):
+    """
+    Delete a session with its PDF, vectors and conversation threads
+    """
+    if not session_manager.session_exists(session_id, touch=False):
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    await delete_sessions([session_id])
+    return {"session_id": session_id, "deleted": True}
+
+
+@router.get("/session/{session_id}/related", response_model=RelatedPapersResponse)
+async def get_related_papers(session_id: str, limit: int = 5):
+    """
+    Get the papers most similar to a session's paper
+    Uses the stored paper-level vectors; no embedding calls are made
+    """
+    if not session_manager.session_exists(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    related = []
+    for related_id, score in rag_service.related_papers(
+        session_id,
+        limit=max(1, min(limit, 50)),
+        session_ids=session_manager.session_ids()
+    ):
+        session = session_manager.get_session(related_id, touch=False)
+        related.append(RelatedPaper(
+            session_id=related_id,
+            filename=session.filename,
+            title=session.title,
+            score=round(score, 4)
+        ))
+    return RelatedPapersResponse(session_id=session_id, related=related)
 
 
 @router.get("/session/{session_id}/pdf")
@@ -390,16 +948,9 @@ async def get_session_pdf(session_id: str):
     session = session_manager.get_session(session_id)
     filename = session.filename if session else "paper.pdf"
 
-    from starlette.responses import Response
-    import os
-
-    # Read the PDF file
-    with open(pdf_path, "rb") as f:
-        pdf_content = f.read()
-
-    # Return PDF with inline disposition
-    return Response(
-        content=pdf_content,
+    # Streamed from disk in chunks, off the event loop
+    return FileResponse(
+        pdf_path,
         media_type="application/pdf",
         headers={
             "Content-Disposition": f'inline; filename="{filename}"'
@@ -412,6 +963,8 @@ async def evaluate_summary(request: EvaluateRequest):
     """
     Evaluate summary quality using LLM-as-a-judge approach
     All evaluations are automatically logged to Langfuse with session tracking
+    Results are stored per (summary, judge prompt version, judge model) and
+    returned without a new LLM call unless force is set
     """
     # Check if session exists
     session = session_manager.get_session(request.session_id)
@@ -425,16 +978,32 @@ async def evaluate_summary(request: EvaluateRequest):
             detail="No summary found for this session. Please generate a summary first."
         )
 
+    model_used = request.model or llm_service.default_model
+    key = evaluation_key(session.summary, model_used)
+
+    if not request.force:
+        cached_evaluation = session_manager.get_evaluation(request.session_id, key)
+        record_cache("evaluation", cached_evaluation is not None)
+        if cached_evaluation:
+            return EvaluateResponse(
+                session_id=request.session_id,
+                evaluation=EvaluationScores(**cached_evaluation),
+                model=model_used,
+                cached=True
+            )
+
     try:
         # Evaluate the summary with Langfuse tracing
         evaluation = await llm_service.evaluate_summary(
             original_text=session.text,
             summary=session.summary,
-            model=request.model,
+            model=model_used,
             session_id=request.session_id  # This enables Langfuse session tracking
         )
 
-        model_used = request.model or llm_service.default_model
+        # Failed evaluations come back with an "error" key and are not stored
+        if "error" not in evaluation:
+            session_manager.save_evaluation(request.session_id, key, evaluation)
 
         # Create response with evaluation scores
         evaluation_scores = EvaluationScores(**evaluation)
@@ -447,3 +1016,41 @@ async def evaluate_summary(request: EvaluateRequest):
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/evaluate/batch", response_model=BatchEvaluateResponse)
+async def evaluate_batch(request: BatchEvaluateRequest):
+    """
+    Re-score many stored summaries concurrently in the background
+    Already-scored (summary, prompt version, judge model) tuples are skipped
+    unless force is set; poll GET /evaluate/batch/{job_id} for progress
+    """
+    if request.session_ids is None:
+        sessions = [session for session in session_manager.get_all_sessions() if session.summary]
+    else:
+        sessions = []
+        for session_id in request.session_ids:
+            session = session_manager.get_session(session_id)
+            if not session:
+                raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
+            if session.summary:
+                sessions.append(session)
+
+    job = batch_evaluator.start(
+        items=[(session.session_id, session.text, session.summary) for session in sessions],
+        model=request.model or llm_service.default_model,
+        concurrency=request.concurrency,
+        force=request.force
+    )
+    return BatchEvaluateResponse(**job.to_dict())
+
+
+@router.get("/evaluate/batch/{job_id}", response_model=BatchEvaluateResponse)
+async def get_batch_evaluation(job_id: str):
+    """
+    Get progress and aggregate score distributions of a batch evaluation
+    """
+    job = batch_evaluator.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch evaluation not found")
+    return BatchEvaluateResponse(**job.to_dict())
@@ -1,18 +1,118 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
     openai_api_key: str
+    # Alternative OpenAI-compatible endpoint (e.g. a local stand-in for benchmarks)
+    openai_base_url: Optional[str] = None
+    # Disable when the embedding endpoint does not accept token arrays
+    embedding_check_ctx_length: bool = True
+    # Changing the model (or chunking below) re-indexes sessions lazily; a model
+    # with another dimension also needs a new Pinecone index
+    embedding_model: str = "text-embedding-ada-002"
+    embedding_dimensions: int = 1536
     pinecone_api_key: str
     pinecone_environment: str
     pinecone_index_name: str = "paper-reading-agent"
+    # "pinecone", "memory" (in-process index for development and benchmarks)
+    # or "quantized" (local int8 index memory-mapped from local_vector_dir)
+    vector_store: str = "pinecone"
+    local_vector_dir: Optional[str] = None  # Defaults to backend/vector_store
+    # The quantized index rescores this many times top_k candidates in float32
+    quantized_rescore_factor: int = 4
     default_model: str = "gpt-5-mini"
 
+    # Input token budgets for paper text per task (None = fill the context window)
+    summary_input_tokens: Optional[int] = None
+    storyline_input_tokens: int = 4000
+    metadata_input_tokens: int = 1500
+    evaluation_input_tokens: int = 3000
+
+    # Minimum per-field confidence for local metadata before falling back to the LLM
+    metadata_confidence_threshold: float = 0.6
+
+    # Section-aware chunking for the vector index
+    chunk_size: int = 1200
+    chunk_overlap: int = 100
+    # References and appendix chunks are kept per session but only embedded if enabled
+    index_references: bool = False
+    index_appendix: bool = True
+
+    # Retrieval for /ask: over-fetch candidates, then pick up to retrieval_max_k
+    # by maximal marginal relevance within retrieval_context_tokens
+    retrieval_fetch_k: int = 20
+    retrieval_min_k: int = 3
+    retrieval_max_k: int = 8
+    retrieval_context_tokens: int = 2000
+    mmr_lambda: float = 0.7
+    # Beyond retrieval_min_k, candidates in this lower fraction of the
+    # candidates' relevance range (least to most relevant) are not used
+    retrieval_relative_floor: float = 0.5
+
+    # Library search: papers shortlisted by the paper-level index before
+    # searching their chunks
+    library_shortlist_papers: int = 5
+
+    # Conversation threads: turns kept verbatim before folding into the summary,
+    # and the token cap on each earlier answer replayed to the model
+    conversation_recent_turns: int = 4
+    conversation_answer_tokens: int = 300
+    # Threads idle this long are dropped, and the least recently used beyond
+    # conversation_max_threads (0 disables either limit)
+    conversation_thread_ttl_seconds: int = 24 * 3600
+    conversation_max_threads: int = 1000
+
+    # /ask/batch: questions per request and completions in flight per request
+    ask_batch_max_questions: int = 50
+    ask_batch_max_concurrency: int = 16
+
+    # Batch uploads: files per request, files processed at once across all
+    # batches, parser processes, and texts per shared embeddings request
+    batch_upload_max_files: int = 500
+    batch_upload_concurrency: int = 4
+    batch_upload_parse_workers: int = 2
+    embedding_batch_size: int = 512
+
+    # Background migration of sessions indexed with an older index version:
+    # sessions per batch and pause between batches (0 disables the sweep;
+    # sessions are still migrated on first access)
+    reindex_batch_size: int = 4
+    reindex_interval_seconds: float = 5.0
+
+    # Recreate sessions at startup from stored PDFs with a cached parse result
+    restore_sessions: bool = True
+
+    # Session retention, enforced by a periodic sweep (0 disables a limit).
+    # Sessions are evicted least recently used first, together with their PDF,
+    # vectors and conversation threads; max_upload_bytes bounds stored PDFs
+    session_ttl_seconds: float = 0
+    max_sessions: int = 0
+    max_upload_bytes: int = 0
+    retention_sweep_interval_seconds: float = 60.0
+
+    # JSON responses of at least this many bytes are gzip-compressed for
+    # clients that accept it (session detail and listing)
+    gzip_minimum_size: int = 1024
+    gzip_level: int = 6
+
+    # OpenAI rate limiting (shared across all completion and embedding calls)
+    openai_requests_per_minute: int = 500
+    openai_tokens_per_minute: int = 500000
+    openai_max_concurrency: int = 16
+    openai_max_retries: int = 5
+    # Per-model overrides, e.g. {"gpt-5-mini": {"rpm": 500, "tpm": 500000, "concurrency": 8}}
+    openai_model_rate_limits: Dict[str, Dict[str, int]] = {}
+
     # Langfuse (optional)
     langfuse_secret_key: Optional[str] = None
     langfuse_public_key: Optional[str] = None
     langfuse_host: Optional[str] = "https://cloud.langfuse.com"
+    # Scores are exported in the background in batches of up to this size
+    langfuse_export_batch_size: int = 50
+    langfuse_export_interval_seconds: float = 1.0
+    # Scores beyond this many queued are dropped (and counted) rather than blocking
+    langfuse_export_queue_size: int = 1000
     
     class Config:
         env_file = ".env"
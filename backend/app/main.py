@@ -1,6 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.responses import Response
 from app.api.routes import router
+from app.services.metrics import MetricsMiddleware, render_metrics, CONTENT_TYPE_LATEST
+from app.services.score_exporter import score_exporter
+from app.services.llm_service import langfuse_client
+from app.services.batch_ingestor import batch_ingestor
+from app.services.reindexer import reindexer
+from app.services.retention import retention_sweeper
+from app.services.parse_cache import restore_sessions
+from app.config import settings
+import asyncio
 import os
 
 app = FastAPI(
@@ -27,10 +37,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request latency and endpoint labels for Prometheus metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include API routes
 app.include_router(router, prefix="/api")
 
 
+@app.on_event("startup")
+async def restore_stored_sessions():
+    """Bring back sessions lost with the previous process from their stored PDFs"""
+    if settings.restore_sessions:
+        restored = await asyncio.to_thread(restore_sessions)
+        if restored:
+            print(f"📂 Restored {restored} sessions from stored PDFs")
+
+
+@app.on_event("startup")
+async def start_reindexing():
+    """Migrate sessions indexed with older chunking settings or embedding model"""
+    reindexer.start()
+
+
+@app.on_event("shutdown")
+async def stop_reindexing():
+    await reindexer.stop()
+
+
+@app.on_event("startup")
+async def start_retention_sweep():
+    """Evict sessions beyond the retention limits and reclaim their storage"""
+    retention_sweeper.start()
+
+
+@app.on_event("shutdown")
+async def stop_retention_sweep():
+    await retention_sweeper.stop()
+
+
+@app.on_event("shutdown")
+async def drain_telemetry():
+    """Send queued Langfuse scores and buffered traces before exiting"""
+    await score_exporter.shutdown()
+    if langfuse_client:
+        # The SDK's own flush blocks, so keep it off the event loop
+        await asyncio.to_thread(langfuse_client.flush)
+
+
+@app.on_event("shutdown")
+async def stop_batch_ingestion():
+    """Stop the PDF parser processes used by batch uploads"""
+    batch_ingestor.shutdown()
+
+
 @app.get("/")
 async def root():
     return {
@@ -44,3 +103,8 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -1,6 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
-from datetime import datetime
+from typing import Any, Dict, Optional, List
 
 
 class UploadResponse(BaseModel):
@@ -10,6 +9,27 @@ class UploadResponse(BaseModel):
     message: str
 
 
+class BatchUploadFile(BaseModel):
+    filename: str  # Zip members are reported as "<archive>/<member path>"
+    status: str  # queued, parsing, indexing, done, failed or skipped
+    session_id: Optional[str] = None
+    chunks: Optional[int] = None
+    title: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchUploadResponse(BaseModel):
+    job_id: str
+    status: str
+    total: int
+    completed: int
+    failed: int
+    skipped: int
+    files: List[BatchUploadFile]
+    started_at: str
+    finished_at: Optional[str] = None
+
+
 class SummarizeRequest(BaseModel):
     session_id: str
     custom_prompt: Optional[str] = None
@@ -26,6 +46,7 @@ class AskRequest(BaseModel):
     session_id: str
     question: str
     model: Optional[str] = None
+    thread_id: Optional[str] = None  # Continue a conversation thread
 
 
 class AskResponse(BaseModel):
@@ -33,6 +54,55 @@ class AskResponse(BaseModel):
     question: str
     answer: str
     sources: List[str]
+    thread_id: Optional[str] = None
+    reused_context: bool = False  # Follow-up answered from the previous turn's chunks
+
+
+class AskBatchRequest(BaseModel):
+    session_id: str
+    questions: List[str]
+    model: Optional[str] = None
+    concurrency: int = 4  # Completions in flight
+    format: str = "ndjson"  # "ndjson" or "sse"
+
+
+class LibraryAskRequest(BaseModel):
+    question: str
+    session_ids: Optional[List[str]] = None  # Defaults to the whole library
+    model: Optional[str] = None
+
+
+class LibrarySource(BaseModel):
+    label: str  # "S1", "S2", ... as cited in the answer
+    session_id: str
+    title: Optional[str] = None
+    page: Optional[int] = None
+    chunk_index: int
+
+
+class LibraryAskResponse(BaseModel):
+    question: str
+    answer: str
+    sources: List[LibrarySource]
+
+
+class ThreadCreateRequest(BaseModel):
+    session_id: str
+
+
+class ThreadTurn(BaseModel):
+    question: str
+    answer: str
+    chunk_indices: List[int]
+
+
+class ThreadResponse(BaseModel):
+    thread_id: str
+    session_id: str
+    summary: str
+    summarized_turns: int
+    turns: List[ThreadTurn]
+    created_at: str
 
 
 class RateRequest(BaseModel):
@@ -52,18 +122,16 @@ class ModelInfo(BaseModel):
     is_default: bool
 
 
-class SessionData(BaseModel):
+class RelatedPaper(BaseModel):
     session_id: str
     filename: str
-    text: str
-    pdf_path: Optional[str] = None
     title: Optional[str] = None
-    authors: Optional[str] = None
-    year: Optional[str] = None
-    summary: Optional[str] = None
-    storyline: Optional[str] = None
-    rating: Optional[str] = None
-    created_at: datetime
+    score: float  # Cosine similarity of the paper vectors
+
+
+class RelatedPapersResponse(BaseModel):
+    session_id: str
+    related: List[RelatedPaper]
 
 
 class SessionDetailResponse(BaseModel):
@@ -96,6 +164,7 @@ class EvaluateRequest(BaseModel):
     session_id: str
     model: Optional[str] = None
     auto_evaluate: bool = True  # Automatically evaluate after summarization
+    force: bool = False  # Recompute even if this summary was already evaluated
 
 
 class EvaluationScores(BaseModel):
@@ -114,4 +183,25 @@ class EvaluateResponse(BaseModel):
     session_id: str
     evaluation: EvaluationScores
     model: str
+    cached: bool = False
 
+
+class BatchEvaluateRequest(BaseModel):
+    session_ids: Optional[List[str]] = None  # Defaults to every session with a summary
+    model: Optional[str] = None
+    concurrency: int = 8
+    force: bool = False  # Re-score summaries already evaluated with this prompt and model
+
+
+class BatchEvaluateResponse(BaseModel):
+    job_id: str
+    status: str
+    model: str
+    prompt_version: str
+    total: int
+    completed: int
+    skipped: int
+    failed: int
+    started_at: str
+    finished_at: Optional[str] = None
+    aggregate: Optional[Dict[str, Any]] = None
@@ -57,6 +57,11 @@ IMPORTANT: For mathematical formulas, use proper LaTeX syntax:
 - Do NOT use brackets [ ] or \\[ \\] for formulas."""
 
 
+ANSWER_LIBRARY_QUESTION_PROMPT = """You are a helpful research assistant. Answer the user's question using excerpts from several research papers in the user's library.
+Each excerpt starts with a label such as [S1] followed by the paper title and page.
+Cite the excerpts you use with their labels, e.g. [S1][S3], and say which papers they come from. If the excerpts do not answer the question, say so."""
+
+
 # Storyline analysis prompts
 STORYLINE_KOREAN_PROMPT = """당신은 연구 논문 분석 전문가입니다. 논문의 스토리라인을 분석하여 정확히 다음 형식으로 답변하세요 (600자 이내):
 
@@ -100,6 +105,13 @@ IMPORTANT:
 - Use proper LaTeX for formulas: $inline$ or $$block$$"""
 
 
+# Conversation prompts
+SUMMARIZE_CONVERSATION_PROMPT = """You maintain a running summary of a question-and-answer conversation about a research paper.
+Merge the previous summary and the new exchanges into one updated summary of at most 120 words.
+Keep the questions asked, the key facts and numbers in the answers, and what the user seems to be trying to understand.
+Write plain prose without headings."""
+
+
 # Metadata extraction prompt
 EXTRACT_METADATA_PROMPT = """Extract title, authors, and year from the paper.
 
@@ -0,0 +1,247 @@
+from datetime import datetime
+from statistics import mean, median
+from typing import Dict, List, Optional, Tuple
+from app.prompts import EVALUATE_SUMMARY_PROMPT
+from app.services.llm_service import llm_service
+from app.services.rate_limiter import Priority
+from app.services.session_manager import session_manager
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+
+# Directory for evaluation checkpoints
+EVALUATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "evaluations")
+
+# Changes whenever the judge prompt changes, so old scores are not reused
+EVALUATION_PROMPT_VERSION = hashlib.sha256(EVALUATE_SUMMARY_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+SCORE_DIMENSIONS = ["faithfulness", "completeness", "conciseness", "coherence", "clarity"]
+
+MAX_CONCURRENCY = 32
+
+
+def summary_hash(summary: str) -> str:
+    """Stable hash of a summary's text"""
+    return hashlib.sha256(summary.encode("utf-8")).hexdigest()[:16]
+
+
+def evaluation_key(summary: str, model: str) -> str:
+    """
+    Key identifying one evaluation: (summary hash, judge prompt version, judge model)
+
+    Args:
+        summary: Summary text
+        model: Judge model
+
+    Returns:
+        Key string
+    """
+    return f"{summary_hash(summary)}:{EVALUATION_PROMPT_VERSION}:{model}"
+
+
+class EvaluationCheckpoint:
+    """Append-only JSONL store of completed evaluations keyed by evaluation_key"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._records: Dict[str, dict] = {}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self._records[record["key"]] = record
+                    except (json.JSONDecodeError, KeyError):
+                        # A run interrupted mid-write leaves a partial last line
+                        continue
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._records.get(key)
+
+    def add(self, record: dict):
+        """Persist a record immediately so an interrupted run can resume"""
+        self._records[record["key"]] = record
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+
+
+class BatchEvaluationJob:
+    """Progress and results of one batch evaluation run"""
+
+    def __init__(self, model: str, total: int):
+        self.job_id = str(uuid.uuid4())
+        self.model = model
+        self.prompt_version = EVALUATION_PROMPT_VERSION
+        self.status = "running"
+        self.total = total
+        self.completed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.evaluations: List[dict] = []
+        self.started_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "model": self.model,
+            "prompt_version": self.prompt_version,
+            "total": self.total,
+            "completed": self.completed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "aggregate": BatchEvaluator.aggregate(self.evaluations),
+        }
+
+
+class BatchEvaluator:
+    """Runs summary evaluations concurrently with checkpointing and resume"""
+
+    def __init__(self, checkpoint_path: Optional[str] = None):
+        self.checkpoint_path = checkpoint_path or os.path.join(EVALUATIONS_DIR, "evaluations.jsonl")
+        self._checkpoint: Optional[EvaluationCheckpoint] = None
+        self._jobs: Dict[str, BatchEvaluationJob] = {}
+        self._tasks = set()
+
+    @property
+    def checkpoint(self) -> EvaluationCheckpoint:
+        if self._checkpoint is None:
+            self._checkpoint = EvaluationCheckpoint(self.checkpoint_path)
+        return self._checkpoint
+
+    def start(
+        self,
+        items: List[Tuple[str, str, str]],
+        model: str,
+        concurrency: int = 8,
+        force: bool = False
+    ) -> BatchEvaluationJob:
+        """
+        Start a batch evaluation in the background
+
+        Args:
+            items: List of (session_id, original_text, summary)
+            model: Judge model
+            concurrency: Maximum evaluations in flight
+            force: Re-score tuples that are already checkpointed
+
+        Returns:
+            The running job
+        """
+        job = BatchEvaluationJob(model=model, total=len(items))
+        self._jobs[job.job_id] = job
+        task = asyncio.create_task(self.run(job, items, concurrency, force))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def run(
+        self,
+        job: BatchEvaluationJob,
+        items: List[Tuple[str, str, str]],
+        concurrency: int = 8,
+        force: bool = False
+    ) -> BatchEvaluationJob:
+        """
+        Evaluate all items, skipping (summary, prompt version, model) tuples
+        already in the checkpoint unless force is set
+
+        Args:
+            job: Job to report progress on
+            items: List of (session_id, original_text, summary)
+            concurrency: Maximum evaluations in flight
+            force: Re-score tuples that are already checkpointed
+
+        Returns:
+            The finished job
+        """
+        semaphore = asyncio.Semaphore(max(1, min(concurrency, MAX_CONCURRENCY)))
+
+        async def evaluate(session_id: str, original_text: str, summary: str):
+            key = evaluation_key(summary, job.model)
+            existing = self.checkpoint.get(key)
+            if existing and not force:
+                job.skipped += 1
+                job.evaluations.append(existing["evaluation"])
+                session_manager.save_evaluation(session_id, key, existing["evaluation"])
+                return
+
+            async with semaphore:
+                evaluation = await llm_service.evaluate_summary(
+                    original_text=original_text,
+                    summary=summary,
+                    model=job.model,
+                    session_id=session_id,
+                    priority=Priority.BACKGROUND
+                )
+
+            # evaluate_summary reports failures in-band; those are retried next run
+            if "error" in evaluation:
+                job.failed += 1
+                return
+            self.checkpoint.add({
+                "key": key,
+                "session_id": session_id,
+                "summary_hash": summary_hash(summary),
+                "prompt_version": EVALUATION_PROMPT_VERSION,
+                "model": job.model,
+                "evaluation": evaluation,
+                "evaluated_at": datetime.now().isoformat()
+            })
+            session_manager.save_evaluation(session_id, key, evaluation)
+            job.completed += 1
+            job.evaluations.append(evaluation)
+
+        try:
+            await asyncio.gather(*(evaluate(*item) for item in items))
+            job.status = "completed"
+        except Exception as e:
+            print(f"⚠️  Batch evaluation {job.job_id} failed: {e}")
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.now()
+        print(f"📊 Batch evaluation {job.job_id}: {job.completed} scored, "
+              f"{job.skipped} skipped, {job.failed} failed")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[BatchEvaluationJob]:
+        return self._jobs.get(job_id)
+
+    @staticmethod
+    def aggregate(evaluations: List[dict]) -> Optional[dict]:
+        """
+        Score distributions across evaluations
+
+        Returns:
+            Per-dimension mean/median/min/max and a histogram of integer scores,
+            or None if there are no evaluations
+        """
+        if not evaluations:
+            return None
+        aggregate = {"count": len(evaluations)}
+        for dimension in SCORE_DIMENSIONS + ["overall_score"]:
+            values = [float(e[dimension]) for e in evaluations if dimension in e]
+            if not values:
+                continue
+            histogram = {str(score): 0 for score in range(11)}
+            for value in values:
+                histogram[str(min(10, max(0, int(round(value)))))] += 1
+            aggregate[dimension] = {
+                "mean": round(mean(values), 2),
+                "median": round(median(values), 2),
+                "min": min(values),
+                "max": max(values),
+                "histogram": histogram,
+            }
+        return aggregate
+
+
+# Global batch evaluator instance
+batch_evaluator = BatchEvaluator()
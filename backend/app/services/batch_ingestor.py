@@ -0,0 +1,270 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.llm_service import llm_service
+from app.services.metrics import observe_stage, record_cache
+from app.services.parse_cache import parse_pdf_cached
+from app.services.rag_service import rag_service
+from app.services.session_manager import session_manager, write_atomic, INCOMING_DIR, MAX_PDF_BYTES
+import asyncio
+import multiprocessing
+import os
+import shutil
+import uuid
+import zipfile
+
+
+class BatchUploadJob:
+    """Per-file status of one batch upload"""
+
+    def __init__(self):
+        self.job_id = str(uuid.uuid4())
+        self.status = "running"
+        self.files: List[dict] = []
+        self.staging_dir = os.path.join(INCOMING_DIR, self.job_id)
+        self.started_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+
+    def add_file(self, filename: str, path: Optional[str] = None, status: str = "queued",
+                 error: Optional[str] = None):
+        self.files.append({
+            "filename": filename,
+            "status": status,
+            "session_id": None,
+            "chunks": None,
+            "title": None,
+            "error": error,
+            "path": path,
+        })
+
+    def count(self, status: str) -> int:
+        return sum(entry["status"] == status for entry in self.files)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total": len(self.files),
+            "completed": self.count("done"),
+            "failed": self.count("failed"),
+            "skipped": self.count("skipped"),
+            "files": [
+                {key: value for key, value in entry.items() if key != "path"}
+                for entry in self.files
+            ],
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class BatchIngestor:
+    """
+    Ingests many PDFs in the background
+
+    Uploads are streamed to a staging directory, parsed in a process pool,
+    and embedded through the RAG service's shared embedding batches at
+    background priority. A global cap on files in flight (across all batch
+    jobs) keeps bulk imports from starving interactive requests.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, BatchUploadJob] = {}
+        self._tasks = set()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(max(1, settings.batch_upload_concurrency))
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that runs an event loop and client threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.batch_upload_parse_workers),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def start(self, uploads: List[Tuple[str, BinaryIO]]) -> BatchUploadJob:
+        """
+        Stage uploaded files and start ingesting them in the background
+
+        PDFs are staged as-is; zip archives are expanded into their PDF members.
+        Files beyond batch_upload_max_files are skipped.
+
+        Args:
+            uploads: List of (filename, file object)
+
+        Returns:
+            The running job
+        """
+        job = BatchUploadJob()
+        os.makedirs(job.staging_dir, exist_ok=True)
+        for filename, source in uploads:
+            name = filename or "upload"
+            if name.lower().endswith(".pdf"):
+                await self._stage_pdf(job, name, source)
+            elif name.lower().endswith(".zip"):
+                await self._stage_zip(job, name, source)
+            else:
+                job.add_file(name, status="skipped", error="Only PDF files and zip archives are allowed")
+
+        queued = [entry for entry in job.files if entry["status"] == "queued"]
+        for entry in queued[settings.batch_upload_max_files:]:
+            os.remove(entry["path"])
+            entry.update(status="skipped", path=None,
+                         error=f"More than {settings.batch_upload_max_files} files in one batch")
+
+        self._jobs[job.job_id] = job
+        task = asyncio.create_task(self.run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _stage_pdf(self, job: BatchUploadJob, filename: str, source: BinaryIO):
+        path = os.path.join(job.staging_dir, f"{len(job.files):05d}.pdf")
+        if await asyncio.to_thread(write_atomic, source, path, MAX_PDF_BYTES) is not None:
+            job.add_file(filename, path)
+        else:
+            job.add_file(filename, status="failed", error="File too large")
+
+    async def _stage_zip(self, job: BatchUploadJob, filename: str, source: BinaryIO):
+        archive = os.path.join(job.staging_dir, f"{len(job.files):05d}.zip")
+        limit = MAX_PDF_BYTES * settings.batch_upload_max_files
+        if await asyncio.to_thread(write_atomic, source, archive, limit) is None:
+            job.add_file(filename, status="failed", error="Archive too large")
+            return
+        try:
+            await asyncio.to_thread(self._extract_zip, job, filename, archive)
+        except zipfile.BadZipFile:
+            job.add_file(filename, status="failed", error="Not a valid zip archive")
+        finally:
+            os.remove(archive)
+
+    @staticmethod
+    def _extract_zip(job: BatchUploadJob, filename: str, archive: str):
+        """
+        Stage the PDF members of a zip archive (member paths are never used on disk)
+
+        Extraction stops once the job holds batch_upload_max_files queued
+        files; the PDF members left over are reported as one skipped entry.
+        """
+        limit = settings.batch_upload_max_files
+        with zipfile.ZipFile(archive) as zf:
+            members = []
+            for info in zf.infolist():
+                name = info.filename.replace("\\", "/")
+                base = os.path.basename(name)
+                if info.is_dir() or not base.lower().endswith(".pdf") \
+                        or base.startswith("._") or name.startswith("__MACOSX/"):
+                    continue
+                members.append((info, name))
+
+            queued = job.count("queued")
+            for position, (info, name) in enumerate(members):
+                if queued >= limit:
+                    job.add_file(filename, status="skipped",
+                                 error=f"More than {limit} files in one batch: "
+                                       f"{len(members) - position} PDF files not extracted")
+                    break
+                member = f"{filename}/{name}"
+                if info.file_size > MAX_PDF_BYTES:
+                    job.add_file(member, status="failed", error="File too large")
+                    continue
+                path = os.path.join(job.staging_dir, f"{len(job.files):05d}.pdf")
+                with zf.open(info) as source:
+                    if write_atomic(source, path, MAX_PDF_BYTES) is not None:
+                        job.add_file(member, path)
+                        queued += 1
+                    else:
+                        job.add_file(member, status="failed", error="File too large")
+
+    async def run(self, job: BatchUploadJob) -> BatchUploadJob:
+        """
+        Ingest every queued file of a job
+
+        Args:
+            job: Job with staged files
+
+        Returns:
+            The finished job
+        """
+        try:
+            await asyncio.gather(*(
+                self._ingest(entry) for entry in job.files if entry["status"] == "queued"
+            ))
+            job.status = "completed"
+        except Exception as e:
+            print(f"⚠️  Batch upload {job.job_id} failed: {e}")
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.now()
+            shutil.rmtree(job.staging_dir, ignore_errors=True)
+        print(f"📚 Batch upload {job.job_id}: {job.count('done')} indexed, "
+              f"{job.count('failed')} failed, {job.count('skipped')} skipped")
+        return job
+
+    async def _ingest(self, entry: dict):
+        """Parse, register and index one staged PDF"""
+        async with self._semaphore:
+            session_id = None
+            try:
+                entry["status"] = "parsing"
+                loop = asyncio.get_running_loop()
+                with observe_stage("pdf_parse"):
+                    parsed = await loop.run_in_executor(
+                        self.pool, parse_pdf_cached, entry["path"], os.path.basename(entry["filename"])
+                    )
+                record_cache("pdf_parse", parsed["cached"])
+
+                session_id = session_manager.create_session(
+                    filename=os.path.basename(entry["filename"]),
+                    text=parsed["text"],
+                    pdf_file=entry["path"],
+                    content_hash=parsed["content_hash"]
+                )
+                entry.update(session_id=session_id, path=None)
+
+                metadata = await llm_service.extract_metadata(
+                    parsed["text"],
+                    filename=os.path.basename(entry["filename"]),
+                    local=parsed["metadata"]
+                )
+                session_manager.update_metadata(
+                    session_id,
+                    title=metadata["title"],
+                    authors=metadata["authors"],
+                    year=metadata["year"]
+                )
+
+                entry["status"] = "indexing"
+                chunks = await rag_service.index_document(
+                    session_id, parsed["text"], pages=parsed["pages"], shared_batches=True
+                )
+                entry.update(status="done", chunks=chunks, title=metadata["title"])
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    # A worker died (e.g. out of memory); start a fresh pool for the next file
+                    self._pool = None
+                entry.update(status="failed", error=str(e) or type(e).__name__, session_id=None)
+                if session_id:
+                    # In-memory state on the event loop, the index client in a thread
+                    rag_service.forget_sessions([session_id])
+                    if rag_service.pc:
+                        await asyncio.to_thread(rag_service.delete_index_vectors, [session_id])
+                    else:
+                        rag_service.delete_index_vectors([session_id])
+                    session_manager.delete_session(session_id)
+
+    def get_job(self, job_id: str) -> Optional[BatchUploadJob]:
+        return self._jobs.get(job_id)
+
+    def shutdown(self):
+        """Stop the parser processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Global batch ingestor instance
+batch_ingestor = BatchIngestor()
@@ -0,0 +1,241 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.llm_service import llm_service
+from app.services.rag_service import rag_service
+from app.services.token_budget import truncate_to_tokens
+import asyncio
+import re
+import time
+import uuid
+
+# Words that make a question refer back to the previous answer
+_REFERRING_WORDS = {
+    "it", "its", "this", "that", "these", "those", "they", "them", "their",
+    "above", "previous", "earlier", "more", "elaborate", "explain", "why", "example",
+}
+# Words that carry no topic of their own ("can you say more about that?")
+_FILLER_WORDS = _REFERRING_WORDS | {
+    "a", "an", "the", "is", "are", "was", "were", "be", "do", "does", "did", "can", "could",
+    "would", "will", "you", "me", "i", "we", "please", "tell", "say", "give", "show", "go",
+    "what", "how", "so", "and", "or", "but", "of", "in", "on", "about", "for", "to", "with",
+    "into", "again", "further", "detail", "details", "exactly", "mean", "means", "meant",
+    "examples", "clarify", "bit", "little", "some", "any", "other", "another", "else", "there",
+    "here", "then", "really", "just", "one", "s", "it's", "that's",
+}
+_WORD = re.compile(r"[a-z']+")
+
+
+@dataclass(slots=True)
+class Turn:
+    question: str
+    answer: str
+    # (chunk index, text) pairs the answer was based on, reused by follow-ups
+    chunks: Tuple[Tuple[int, str], ...]
+
+    @property
+    def chunk_indices(self) -> Tuple[int, ...]:
+        return tuple(index for index, _ in self.chunks)
+
+
+@dataclass(slots=True)
+class ConversationThread:
+    thread_id: str
+    session_id: str
+    created_at: datetime
+    # Rolling summary of turns that were folded out of `turns`
+    summary: str = ""
+    summarized_turns: int = 0
+    turns: List[Turn] = field(default_factory=list)
+    compacting: bool = False
+    last_used: float = field(default_factory=time.time)
+
+
+@dataclass
+class TurnContext:
+    context: str
+    sources: List[str]
+    history: List[dict]
+    chunks: Tuple[Tuple[int, str], ...]
+    reused: bool
+
+
+def is_follow_up(question: str) -> bool:
+    """
+    Whether a question reads as a follow-up about the previous answer
+    ("why?", "can you explain that in more detail?")
+
+    A question that names a topic of its own ("what datasets do they use?",
+    "explain the loss function") is not a follow-up, even if it refers back.
+
+    Args:
+        question: User's question
+
+    Returns:
+        True for questions that refer back to earlier turns and add no topic
+    """
+    words = _WORD.findall(question.lower())
+    return bool(_REFERRING_WORDS.intersection(words)) and all(word in _FILLER_WORDS for word in words)
+
+
+class ConversationManager:
+    """
+    In-memory multi-turn Q&A threads per session
+
+    Recent turns are kept verbatim (answers truncated); older turns are
+    folded into a rolling summary in the background. Each turn keeps the
+    chunks it was answered from, so a follow-up that names no topic of its
+    own ("why?") is answered from the same chunks without an embedding call
+    or vector search; any other question is retrieved as usual. Threads idle
+    for conversation_thread_ttl_seconds are dropped, and the least recently
+    used ones beyond conversation_max_threads.
+    """
+
+    def __init__(self):
+        self._threads: Dict[str, ConversationThread] = {}
+        self._tasks = set()
+
+    def create_thread(self, session_id: str) -> ConversationThread:
+        """
+        Start a new conversation thread
+
+        Args:
+            session_id: Session the thread asks about
+
+        Returns:
+            The new thread
+        """
+        self._prune()
+        thread = ConversationThread(
+            thread_id=str(uuid.uuid4()),
+            session_id=session_id,
+            created_at=datetime.now()
+        )
+        self._threads[thread.thread_id] = thread
+        return thread
+
+    def get_thread(self, thread_id: str) -> Optional[ConversationThread]:
+        """Look up a thread, marking it used; expired threads are not returned"""
+        thread = self._threads.get(thread_id)
+        if thread is None:
+            return None
+        now = time.time()
+        if 0 < settings.conversation_thread_ttl_seconds < now - thread.last_used:
+            del self._threads[thread_id]
+            return None
+        thread.last_used = now
+        # Keep the dict in least recently used order
+        self._threads[thread_id] = self._threads.pop(thread_id)
+        return thread
+
+    def _prune(self):
+        """Drop expired threads, then the least recently used beyond the limit"""
+        if settings.conversation_thread_ttl_seconds > 0:
+            cutoff = time.time() - settings.conversation_thread_ttl_seconds
+            for thread_id in [t.thread_id for t in self._threads.values() if t.last_used < cutoff]:
+                del self._threads[thread_id]
+        if settings.conversation_max_threads > 0:
+            while len(self._threads) >= settings.conversation_max_threads:
+                del self._threads[next(iter(self._threads))]
+
+    def delete_session_threads(self, session_id: str):
+        """Drop every thread of a session"""
+        for thread_id in [t.thread_id for t in self._threads.values() if t.session_id == session_id]:
+            del self._threads[thread_id]
+
+    def _history(self, thread: ConversationThread) -> List[dict]:
+        """Summary and recent turns as chat messages"""
+        messages = []
+        if thread.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation: {thread.summary}"
+            })
+        for turn in thread.turns:
+            messages.append({"role": "user", "content": turn.question})
+            messages.append({
+                "role": "assistant",
+                "content": truncate_to_tokens(turn.answer, settings.conversation_answer_tokens)
+            })
+        return messages
+
+    async def prepare_turn(self, thread: ConversationThread, question: str) -> TurnContext:
+        """
+        Build the context and history for the next question in a thread
+
+        Args:
+            thread: Conversation thread
+            question: Follow-up question
+
+        Returns:
+            TurnContext with retrieved (or reused) context and prior messages
+        """
+        previous = thread.turns[-1] if thread.turns else None
+        citations: List[str] = []
+        reused = bool(previous and previous.chunks and is_follow_up(question))
+        if reused:
+            chunks = list(previous.chunks)
+        else:
+            chunks, citations = await rag_service.retrieve_chunks(thread.session_id, question)
+        context, sources = rag_service.format_context(chunks, citations)
+        return TurnContext(
+            context=context,
+            sources=sources,
+            history=self._history(thread),
+            chunks=tuple(chunks),
+            reused=reused
+        )
+
+    def record_turn(self, thread: ConversationThread, question: str, answer: str, chunks: Tuple[Tuple[int, str], ...]):
+        """
+        Append a finished turn and fold old turns into the summary if needed
+
+        Args:
+            thread: Conversation thread
+            question: Question asked
+            answer: Answer given
+            chunks: (chunk index, text) pairs the answer was based on
+        """
+        thread.turns.append(Turn(question=question, answer=answer, chunks=tuple(chunks)))
+        if len(thread.turns) > settings.conversation_recent_turns and not thread.compacting:
+            thread.compacting = True
+            task = asyncio.create_task(self._compact(thread))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _compact(self, thread: ConversationThread):
+        """Summarize the turns beyond the recent window into the rolling summary"""
+        try:
+            while len(thread.turns) > settings.conversation_recent_turns:
+                count = len(thread.turns) - settings.conversation_recent_turns
+                folded = thread.turns[:count]
+                thread.summary = await llm_service.summarize_conversation(
+                    thread.summary,
+                    [(turn.question, turn.answer) for turn in folded]
+                )
+                # Turns added while summarizing stay in the window
+                del thread.turns[:count]
+                thread.summarized_turns += count
+        except Exception as e:
+            # Keep the turns verbatim; the next turn tries again
+            print(f"⚠️  Conversation summary failed (non-critical): {e}")
+        finally:
+            thread.compacting = False
+
+    def to_dict(self, thread: ConversationThread) -> dict:
+        return {
+            "thread_id": thread.thread_id,
+            "session_id": thread.session_id,
+            "summary": thread.summary,
+            "summarized_turns": thread.summarized_turns,
+            "turns": [
+                {"question": turn.question, "answer": turn.answer, "chunk_indices": list(turn.chunk_indices)}
+                for turn in thread.turns
+            ],
+            "created_at": thread.created_at.isoformat(),
+        }
+
+
+# Global conversation manager instance
+conversation_manager = ConversationManager()
@@ -0,0 +1,82 @@
+from typing import Awaitable, Callable, List, Optional, Tuple
+from app.services.rate_limiter import Priority
+import asyncio
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces embedding requests from concurrent callers into shared batches
+
+    Texts submitted by different papers within `linger` seconds of each other
+    go out in one embeddings request of up to `batch_size` texts, instead of
+    one small request per paper (or per chunk).
+    """
+
+    def __init__(
+        self,
+        embed_many: Callable[[List[str], Priority], Awaitable[List[List[float]]]],
+        batch_size: int = 512,
+        linger: float = 0.05,
+        priority: Priority = Priority.BACKGROUND
+    ):
+        """
+        Args:
+            embed_many: Coroutine function embedding a list of texts in one request
+            batch_size: Maximum texts per request
+            linger: Seconds to wait for more texts before sending a partial batch
+            priority: Scheduling priority for the rate limiter
+        """
+        self.embed_many = embed_many
+        self.batch_size = batch_size
+        self.linger = linger
+        self.priority = priority
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.stats = {"requests": 0, "texts": 0}
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts as part of the next shared batch(es)
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding vectors in input order
+        """
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(self.linger, self._flush)
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self):
+        """Send everything pending as one request"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            vectors = await self.embed_many([text for text, _ in batch], self.priority)
+            self.stats["requests"] += 1
+            self.stats["texts"] += len(batch)
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
@@ -0,0 +1,138 @@
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import List, Optional, Set
+from app.utils.sections import detect_sections
+from app.services.pdf_parser import PDFParser, find_boilerplate, strip_boilerplate
+import re
+
+# A bracketed bibliography entry: "[12] A. Author"
+_CITATION_ENTRY = re.compile(r"(?:^|\s)\[(\d{1,3})\]\s+[A-Z]")
+# Maximum gap between consecutive bibliography entries
+_MAX_ENTRY_GAP = 600
+_MIN_ENTRIES = 5
+
+
+@dataclass
+class FilteredText:
+    text: str
+    references_start: Optional[int] = None
+    boilerplate: Set[str] = field(default_factory=set)
+    pages: Optional[List[str]] = None  # Page texts `text` was built from
+
+
+def find_references_start(text: str) -> Optional[int]:
+    """
+    Locate the bibliography in paper text
+
+    Uses the References/Bibliography heading when there is one, otherwise
+    the start of a trailing run of bracketed entries ("[1] ...", "[2] ...")
+    in the second half of the text.
+
+    Args:
+        text: Paper text
+
+    Returns:
+        Character offset where the references begin, or None
+    """
+    for offset, label in detect_sections(text):
+        if label == "references":
+            return offset
+
+    entries = [match.start(1) - 1 for match in _CITATION_ENTRY.finditer(text)]
+    if len(entries) < _MIN_ENTRIES:
+        return None
+    run_start = len(entries) - 1
+    while run_start > 0 and entries[run_start] - entries[run_start - 1] <= _MAX_ENTRY_GAP:
+        run_start -= 1
+    if len(entries) - run_start >= _MIN_ENTRIES and entries[run_start] >= len(text) // 2:
+        return entries[run_start]
+    return None
+
+
+def find_citations(references: str, numbers: List[str]) -> List[str]:
+    """
+    Look up bibliography entries by their bracketed number
+
+    Args:
+        references: Text of the references section
+        numbers: Citation numbers, e.g. ["3", "12"]
+
+    Returns:
+        Matching entries, e.g. ["[3] A. Author. Title. 2020."]
+    """
+    entries = []
+    for number in numbers:
+        match = re.search(
+            rf"\[{re.escape(number)}\]\s+(.*?)(?=\s\[\d{{1,3}}\]\s|$)", references, re.DOTALL
+        )
+        if match:
+            entries.append(f"[{number}] {match.group(1).strip()}")
+    return entries
+
+
+def filter_for_indexing(text: str, pages: Optional[List[str]] = None) -> FilteredText:
+    """
+    Pre-indexing filter: drop per-page boilerplate and locate the bibliography
+
+    Args:
+        text: Cleaned paper text
+        pages: Raw page texts, needed to detect repeated headers/footers
+
+    Returns:
+        FilteredText with the text to chunk, where its references begin and
+        the boilerplate line keys that were removed
+    """
+    boilerplate = find_boilerplate(pages) if pages else set()
+    if boilerplate:
+        pages = strip_boilerplate(pages, boilerplate)
+        text = PDFParser.clean_text(PDFParser.join_pages(pages))
+    return FilteredText(
+        text=text,
+        references_start=find_references_start(text),
+        boilerplate=boilerplate,
+        pages=pages
+    )
+
+
+# Characters cleaning may drop besides whitespace (joined line-break hyphens)
+_HYPHENS = "-\u00ad"
+
+
+def _visible_length(text: str) -> int:
+    return len(text) - sum(1 for character in text if character.isspace() or character in _HYPHENS)
+
+
+def locate_pages(text: str, pieces: List[str], pages: Optional[List[str]]) -> List[Optional[int]]:
+    """
+    Page number (1-based) on which each piece of text starts
+
+    Cleaning changes whitespace and joins hyphenated words but keeps every
+    other character, so offsets are compared as counts of characters that
+    are neither whitespace nor hyphens.
+
+    Args:
+        text: Text the pieces were cut from, in order
+        pieces: Chunk texts in document order (may overlap)
+        pages: Page texts text was built from
+
+    Returns:
+        Page number per piece, or None where it cannot be located
+    """
+    page_ends = list(accumulate(_visible_length(page) for page in pages or []))
+    if not page_ends or page_ends[-1] != _visible_length(text):
+        return [None] * len(pieces)
+
+    located: List[Optional[int]] = []
+    cursor = 0
+    counted_to, counted = 0, 0
+    for piece in pieces:
+        start = text.find(piece, cursor)
+        if start < 0:
+            located.append(None)
+            continue
+        counted += _visible_length(text[counted_to:start])
+        counted_to = start
+        located.append(min(bisect_right(page_ends, counted), len(page_ends) - 1) + 1)
+        cursor = start + 1
+    return located
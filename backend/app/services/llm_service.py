@@ -1,18 +1,31 @@
-from openai import OpenAI
+from openai import AsyncOpenAI
 from app.config import settings
 from app.prompts import (
     SUMMARIZE_PAPER_PROMPT,
     ANSWER_QUESTION_PROMPT,
     ANSWER_QUESTION_STREAM_PROMPT,
+    ANSWER_LIBRARY_QUESTION_PROMPT,
     STORYLINE_KOREAN_PROMPT,
     STORYLINE_ENGLISH_PROMPT,
     EXTRACT_METADATA_PROMPT,
-    EVALUATE_SUMMARY_PROMPT
+    EVALUATE_SUMMARY_PROMPT,
+    SUMMARIZE_CONVERSATION_PROMPT
 )
-from typing import Optional
+from app.services.token_budget import fit_text, count_tokens
+from app.services.rate_limiter import rate_limiter, Priority
+from app.services.metrics import (
+    LLM_SECONDS,
+    LLM_TTFT_SECONDS,
+    current_endpoint,
+    record_llm_usage
+)
+from app.services.score_exporter import score_exporter
+from app.services.metadata_extractor import metadata_extractor, UNKNOWN
+from typing import List, Optional
 import os
 import json
 import re
+import time
 
 # Langfuse integration via OpenAI wrapper (optional)
 LANGFUSE_ENABLED = False
@@ -26,7 +39,7 @@ try:
         os.environ["LANGFUSE_PUBLIC_KEY"] = settings.langfuse_public_key
         os.environ["LANGFUSE_HOST"] = settings.langfuse_host or "https://cloud.langfuse.com"
 
-        from langfuse.openai import OpenAI as _LangfuseOpenAI
+        from langfuse.openai import AsyncOpenAI as _LangfuseOpenAI
         from langfuse import Langfuse
         LangfuseOpenAI = _LangfuseOpenAI
         langfuse_client = Langfuse()
@@ -42,19 +55,119 @@ class LLMService:
     """Service for interacting with OpenAI LLM"""
     
     def __init__(self):
-        # Standard OpenAI client (always works)
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        # Standard OpenAI client (always works); retries are handled by the rate limiter
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            max_retries=0
+        )
         # Langfuse-wrapped client for traced calls (if available)
         if LANGFUSE_ENABLED and LangfuseOpenAI:
             try:
-                self.traced_client = LangfuseOpenAI(api_key=settings.openai_api_key)
+                self.traced_client = LangfuseOpenAI(
+                    api_key=settings.openai_api_key,
+                    base_url=settings.openai_base_url,
+                    max_retries=0
+                )
             except Exception as e:
                 print(f"⚠️ Langfuse client init failed: {e}")
                 self.traced_client = self.client
         else:
             self.traced_client = self.client
         self.default_model = settings.default_model
+
+    async def _create_completion(
+        self,
+        client,
+        model: str,
+        messages: list,
+        max_completion_tokens: int,
+        priority: Priority,
+        **kwargs
+    ):
+        """
+        Create a chat completion through the shared rate limiter
+
+        Args:
+            client: OpenAI client to use (plain or Langfuse-traced)
+            model: Model to use
+            messages: Chat messages
+            max_completion_tokens: Completion token limit
+            priority: Scheduling priority for the rate limiter
+            **kwargs: Extra arguments for chat.completions.create
+
+        Returns:
+            Completion response (or stream when stream=True)
+        """
+        tokens = sum(count_tokens(message["content"]) for message in messages) + max_completion_tokens
+        start = time.perf_counter()
+        response = await rate_limiter.call(
+            model,
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_completion_tokens=max_completion_tokens,
+                **kwargs
+            ),
+            tokens=tokens,
+            priority=priority
+        )
+        LLM_SECONDS.labels(model, current_endpoint.get()).observe(time.perf_counter() - start)
+        record_llm_usage(model, getattr(response, "usage", None))
+        return response
     
+    async def _stream_completion(
+        self,
+        client,
+        model: str,
+        messages: list,
+        max_completion_tokens: int,
+        priority: Priority
+    ):
+        """
+        Stream a chat completion through the shared rate limiter
+
+        Args:
+            client: OpenAI client to use (plain or Langfuse-traced)
+            model: Model to use
+            messages: Chat messages
+            max_completion_tokens: Completion token limit
+            priority: Scheduling priority for the rate limiter
+
+        Yields:
+            Chunks of completion text
+        """
+        tokens = sum(count_tokens(message["content"]) for message in messages) + max_completion_tokens
+        endpoint = current_endpoint.get()
+        start = time.perf_counter()
+        first_token = True
+        stream = rate_limiter.stream(
+            model,
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_completion_tokens=max_completion_tokens,
+                stream=True,
+                stream_options={"include_usage": True}
+            ),
+            tokens=tokens,
+            priority=priority,
+            completion_tokens=max_completion_tokens
+        )
+        try:
+            async for chunk in stream:
+                # The final chunk carries usage and no choices
+                record_llm_usage(model, getattr(chunk, "usage", None))
+                if chunk.choices and chunk.choices[0].delta.content is not None:
+                    if first_token:
+                        LLM_TTFT_SECONDS.labels(model, endpoint).observe(time.perf_counter() - start)
+                        first_token = False
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Release the slot and the OpenAI stream now, not when collected
+            await stream.aclose()
+        LLM_SECONDS.labels(model, endpoint).observe(time.perf_counter() - start)
+
     def get_available_models(self):
         """
         Get list of available models
@@ -70,11 +183,32 @@ class LLMService:
             }
         ]
     
+    def _summary_messages(
+        self,
+        paper_text: str,
+        custom_prompt: Optional[str],
+        model: str
+    ) -> list:
+        """Build the summarization messages with the paper fitted to the budget"""
+        system_prompt = custom_prompt if custom_prompt else SUMMARIZE_PAPER_PROMPT
+        paper_text = fit_text(
+            paper_text,
+            model=model,
+            max_completion_tokens=2000,
+            prompt_text=system_prompt,
+            max_input_tokens=settings.summary_input_tokens
+        )
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Paper text:\n\n{paper_text}"}
+        ]
+
     async def summarize_paper(
         self,
         paper_text: str,
         custom_prompt: Optional[str] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        priority: Priority = Priority.DEFAULT
     ) -> str:
         """
         Summarize paper text using LLM
@@ -83,22 +217,21 @@ class LLMService:
             paper_text: Full text of the paper
             custom_prompt: Optional custom prompt to guide summarization
             model: Model to use (defaults to configured default)
+            priority: Scheduling priority for the rate limiter
             
         Returns:
             Summary text
         """
         model_to_use = model or self.default_model
-        system_prompt = custom_prompt if custom_prompt else SUMMARIZE_PAPER_PROMPT
         
         try:
             # Use traced client for Langfuse logging
-            response = self.traced_client.chat.completions.create(
+            response = await self._create_completion(
+                self.traced_client,
                 model=model_to_use,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Paper text:\n\n{paper_text}"}
-                ],
-                max_completion_tokens=2000
+                messages=self._summary_messages(paper_text, custom_prompt, model_to_use),
+                max_completion_tokens=2000,
+                priority=priority
             )
             
             summary = response.choices[0].message.content
@@ -106,12 +239,49 @@ class LLMService:
         
         except Exception as e:
             raise Exception(f"Failed to generate summary: {str(e)}")
+
+    async def summarize_paper_stream(
+        self,
+        paper_text: str,
+        custom_prompt: Optional[str] = None,
+        model: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ):
+        """
+        Summarize paper text using LLM with streaming
+        
+        Args:
+            paper_text: Full text of the paper
+            custom_prompt: Optional custom prompt to guide summarization
+            model: Model to use (defaults to configured default)
+            priority: Scheduling priority for the rate limiter
+            
+        Yields:
+            Chunks of summary text
+        """
+        model_to_use = model or self.default_model
+        
+        try:
+            # Use traced client for Langfuse logging
+            async for chunk in self._stream_completion(
+                self.traced_client,
+                model=model_to_use,
+                messages=self._summary_messages(paper_text, custom_prompt, model_to_use),
+                max_completion_tokens=2000,
+                priority=priority
+            ):
+                yield chunk
+        
+        except Exception as e:
+            raise Exception(f"Failed to generate summary: {str(e)}")
     
     async def answer_question(
         self,
         question: str,
         context: str,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        history: Optional[List[dict]] = None
     ) -> str:
         """
         Answer a question about the paper using RAG context
@@ -120,6 +290,8 @@ class LLMService:
             question: User's question
             context: Relevant context from the paper
             model: Model to use (defaults to configured default)
+            priority: Scheduling priority for the rate limiter
+            history: Earlier conversation messages to put before the question
             
         Returns:
             Answer text
@@ -134,13 +306,16 @@ Question: {question}
 Please provide a clear and concise answer based on the context above."""
         
         try:
-            response = self.client.chat.completions.create(
+            response = await self._create_completion(
+                self.client,
                 model=model_to_use,
                 messages=[
                     {"role": "system", "content": system_prompt},
+                    *(history or []),
                     {"role": "user", "content": user_message}
                 ],
-                max_completion_tokens=1000
+                max_completion_tokens=1000,
+                priority=priority
             )
             
             answer = response.choices[0].message.content
@@ -149,11 +324,13 @@ Please provide a clear and concise answer based on the context above."""
         except Exception as e:
             raise Exception(f"Failed to generate answer: {str(e)}")
     
-    def answer_question_stream(
+    async def answer_question_stream(
         self,
         question: str,
         context: str,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        history: Optional[List[dict]] = None
     ):
         """
         Answer a question about the paper using RAG context with streaming
@@ -162,6 +339,8 @@ Please provide a clear and concise answer based on the context above."""
             question: User's question
             context: Relevant context from the paper
             model: Model to use (defaults to configured default)
+            priority: Scheduling priority for the rate limiter
+            history: Earlier conversation messages to put before the question
             
         Yields:
             Chunks of answer text
@@ -177,28 +356,130 @@ Please provide a clear and concise answer based on the context above. Use $$...$
         
         try:
             # Use traced client for Langfuse logging
-            stream = self.traced_client.chat.completions.create(
+            async for chunk in self._stream_completion(
+                self.traced_client,
                 model=model_to_use,
                 messages=[
                     {"role": "system", "content": system_prompt},
+                    *(history or []),
                     {"role": "user", "content": user_message}
                 ],
                 max_completion_tokens=1000,
-                stream=True
-            )
+                priority=priority
+            ):
+                yield chunk
+        
+        except Exception as e:
+            raise Exception(f"Failed to generate answer: {str(e)}")
+    
+    async def answer_library_question(
+        self,
+        question: str,
+        context: str,
+        model: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> str:
+        """
+        Answer a question from labelled excerpts of several papers
+        
+        Args:
+            question: User's question
+            context: Excerpts labelled [S1], [S2], ... with paper title and page
+            model: Model to use (defaults to configured default)
+            priority: Scheduling priority for the rate limiter
             
-            for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
-                    yield chunk.choices[0].delta.content
+        Returns:
+            Answer text citing excerpt labels
+        """
+        model_to_use = model or self.default_model
+        user_message = f"""Excerpts from the library:
+{context}
+
+Question: {question}"""
+        
+        try:
+            response = await self._create_completion(
+                self.client,
+                model=model_to_use,
+                messages=[
+                    {"role": "system", "content": ANSWER_LIBRARY_QUESTION_PROMPT},
+                    {"role": "user", "content": user_message}
+                ],
+                max_completion_tokens=1000,
+                priority=priority
+            )
+            return response.choices[0].message.content
         
         except Exception as e:
             raise Exception(f"Failed to generate answer: {str(e)}")
     
+    async def summarize_conversation(
+        self,
+        previous_summary: str,
+        exchanges: List[tuple],
+        model: Optional[str] = None
+    ) -> str:
+        """
+        Fold older question/answer exchanges into a rolling conversation summary
+        
+        Args:
+            previous_summary: Summary so far (may be empty)
+            exchanges: (question, answer) pairs to fold in, oldest first
+            model: Model to use (defaults to configured default)
+            
+        Returns:
+            Updated summary text
+        """
+        model_to_use = model or self.default_model
+        transcript = "\n\n".join(f"Q: {question}\nA: {answer}" for question, answer in exchanges)
+        user_message = f"""Previous summary:
+{previous_summary or "(none)"}
+
+New exchanges:
+{transcript}"""
+        
+        try:
+            response = await self._create_completion(
+                self.client,
+                model=model_to_use,
+                messages=[
+                    {"role": "system", "content": SUMMARIZE_CONVERSATION_PROMPT},
+                    {"role": "user", "content": user_message}
+                ],
+                max_completion_tokens=400,
+                priority=Priority.BACKGROUND
+            )
+            return response.choices[0].message.content.strip()
+        
+        except Exception as e:
+            raise Exception(f"Failed to summarize conversation: {str(e)}")
+    
+    def _storyline_messages(self, paper_text: str, model: str, language: str) -> list:
+        """Build the storyline messages with the paper fitted to the budget"""
+        # Select prompt based on language
+        system_prompt = STORYLINE_KOREAN_PROMPT if language == "ko" else STORYLINE_ENGLISH_PROMPT
+        paper_text = fit_text(
+            paper_text,
+            model=model,
+            max_completion_tokens=800,
+            prompt_text=system_prompt,
+            max_input_tokens=settings.storyline_input_tokens
+        )
+        if language == "ko":
+            user_message = f"논문 텍스트:\n\n{paper_text}"
+        else:
+            user_message = f"Paper text:\n\n{paper_text}"
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message}
+        ]
+
     async def analyze_storyline(
         self,
         paper_text: str,
         model: Optional[str] = None,
-        language: str = "en"
+        language: str = "en",
+        priority: Priority = Priority.DEFAULT
     ) -> str:
         """
         Analyze the paper's storyline/narrative flow
@@ -206,29 +487,22 @@ Please provide a clear and concise answer based on the context above. Use $$...$
         Args:
             paper_text: Full text of the paper
             model: Model to use (defaults to configured default)
+            language: Output language ("en" or "ko")
+            priority: Scheduling priority for the rate limiter
             
         Returns:
             Storyline analysis
         """
         model_to_use = model or self.default_model
         
-        # Select prompt based on language
-        if language == "ko":
-            system_prompt = STORYLINE_KOREAN_PROMPT
-            user_message = f"논문 텍스트:\n\n{paper_text[:15000]}"
-        else:
-            system_prompt = STORYLINE_ENGLISH_PROMPT
-            user_message = f"Paper text:\n\n{paper_text[:15000]}"
-        
         try:
             # Use traced client for Langfuse logging
-            response = self.traced_client.chat.completions.create(
+            response = await self._create_completion(
+                self.traced_client,
                 model=model_to_use,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                max_completion_tokens=800
+                messages=self._storyline_messages(paper_text, model_to_use, language),
+                max_completion_tokens=800,
+                priority=priority
             )
             
             storyline = response.choices[0].message.content
@@ -236,13 +510,86 @@ Please provide a clear and concise answer based on the context above. Use $$...$
         
         except Exception as e:
             raise Exception(f"Failed to analyze storyline: {str(e)}")
+
+    async def analyze_storyline_stream(
+        self,
+        paper_text: str,
+        model: Optional[str] = None,
+        language: str = "en",
+        priority: Priority = Priority.INTERACTIVE
+    ):
+        """
+        Analyze the paper's storyline/narrative flow with streaming
+        
+        Args:
+            paper_text: Full text of the paper
+            model: Model to use (defaults to configured default)
+            language: Output language ("en" or "ko")
+            priority: Scheduling priority for the rate limiter
+            
+        Yields:
+            Chunks of storyline analysis
+        """
+        model_to_use = model or self.default_model
+        
+        try:
+            # Use traced client for Langfuse logging
+            async for chunk in self._stream_completion(
+                self.traced_client,
+                model=model_to_use,
+                messages=self._storyline_messages(paper_text, model_to_use, language),
+                max_completion_tokens=800,
+                priority=priority
+            ):
+                yield chunk
+        
+        except Exception as e:
+            raise Exception(f"Failed to analyze storyline: {str(e)}")
     
     async def extract_metadata(
         self,
-        paper_text: str
+        paper_text: str,
+        pdf_content: Optional[bytes] = None,
+        filename: Optional[str] = None,
+        local: Optional[dict] = None
     ) -> dict:
         """
-        Extract paper metadata (title, authors, year) from text
+        Extract paper metadata (title, authors, year)
+
+        Runs the local heuristic extractor on the PDF first and only calls the
+        LLM when any field's confidence is below the configured threshold.
+
+        Args:
+            paper_text: Full text of the paper (first part)
+            pdf_content: Raw PDF bytes for local extraction (optional)
+            filename: Original filename, used for arXiv identifiers (optional)
+            local: Result of metadata_extractor.extract if already run (optional)
+
+        Returns:
+            Dictionary with title, authors, year
+        """
+        fields = ["title", "authors", "year"]
+        threshold = settings.metadata_confidence_threshold
+
+        if local is None and pdf_content:
+            local = metadata_extractor.extract(pdf_content, filename)
+        if local and all(local["confidence"][field] >= threshold for field in fields):
+            print(f"⚡ Metadata extracted locally (confidence: {local['confidence']})")
+            return {field: local[field] for field in fields}
+
+        metadata = await self._extract_metadata_llm(paper_text)
+        if local:
+            # Keep confident local fields and fill gaps the LLM could not answer
+            for field in fields:
+                if local["confidence"][field] >= threshold or (
+                    metadata[field] == UNKNOWN and local[field] != UNKNOWN
+                ):
+                    metadata[field] = local[field]
+        return metadata
+
+    async def _extract_metadata_llm(self, paper_text: str) -> dict:
+        """
+        Extract paper metadata (title, authors, year) from text with the LLM
 
         Args:
             paper_text: Full text of the paper (first part)
@@ -251,15 +598,26 @@ Please provide a clear and concise answer based on the context above. Use $$...$
             Dictionary with title, authors, year
         """
         system_prompt = EXTRACT_METADATA_PROMPT
+        # Title, authors and year are on the first page, so keep the head only
+        paper_text = fit_text(
+            paper_text,
+            model=self.default_model,
+            max_completion_tokens=500,
+            prompt_text=system_prompt,
+            max_input_tokens=settings.metadata_input_tokens,
+            strategy="head"
+        )
         
         try:
-            response = self.client.chat.completions.create(
+            response = await self._create_completion(
+                self.client,
                 model=self.default_model,
                 messages=[
                     {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Extract from:\n\n{paper_text[:5000]}"}
+                    {"role": "user", "content": f"Extract from:\n\n{paper_text}"}
                 ],
-                max_completion_tokens=500
+                max_completion_tokens=500,
+                priority=Priority.DEFAULT
             )
 
             result = response.choices[0].message.content.strip()
@@ -305,7 +663,8 @@ Please provide a clear and concise answer based on the context above. Use $$...$
         original_text: str,
         summary: str,
         model: Optional[str] = None,
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE
     ) -> dict:
         """
         Evaluate summary quality using LLM-as-a-judge approach
@@ -315,14 +674,22 @@ Please provide a clear and concise answer based on the context above. Use $$...$
             summary: Generated summary to evaluate
             model: Model to use for evaluation (defaults to gpt-5-mini)
             session_id: Optional session ID for tracking
+            priority: Scheduling priority for the rate limiter
 
         Returns:
             Dictionary with evaluation scores and reasoning
         """
         model_to_use = model or self.default_model
         system_prompt = EVALUATE_SUMMARY_PROMPT
-        user_message = f"""Original Paper (first 10000 chars):
-{original_text[:10000]}
+        original_text = fit_text(
+            original_text,
+            model=model_to_use,
+            max_completion_tokens=1500,
+            prompt_text=system_prompt + summary,
+            max_input_tokens=settings.evaluation_input_tokens
+        )
+        user_message = f"""Original Paper (key sections):
+{original_text}
 
 ---
 
@@ -342,13 +709,15 @@ Please evaluate this summary using the criteria above and return a JSON response
             if LANGFUSE_ENABLED and session_id:
                 # Langfuse OpenAI wrapper doesn't accept session_id directly
                 # Instead, we can use the name parameter for tracking
-                response = self.traced_client.chat.completions.create(
+                response = await self._create_completion(
+                    self.traced_client,
                     model=model_to_use,
                     messages=[
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": user_message}
                     ],
                     max_completion_tokens=1500,  # Increased for detailed reasoning
+                    priority=priority,
                     name=f"evaluate_summary_{session_id}",  # For Langfuse tracking
                     metadata={
                         "session_id": session_id,
@@ -363,13 +732,15 @@ Please evaluate this summary using the criteria above and return a JSON response
                 if hasattr(response, '_langfuse_trace_id'):
                     trace_id = response._langfuse_trace_id
             else:
-                response = self.traced_client.chat.completions.create(
+                response = await self._create_completion(
+                    self.traced_client,
                     model=model_to_use,
                     messages=[
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": user_message}
                     ],
-                    max_completion_tokens=1500   # Increased for detailed reasoning
+                    max_completion_tokens=1500,  # Increased for detailed reasoning
+                    priority=priority
                 )
 
             result_text = response.choices[0].message.content
@@ -398,40 +769,31 @@ Please evaluate this summary using the criteria above and return a JSON response
                     result_json["clarity"]
                 ]) / 5, 1)
 
-            # Log scores to Langfuse Scores tab
-            if LANGFUSE_ENABLED and langfuse_client and session_id:
-                try:
-                    # Determine trace ID for scoring
-                    scoring_trace_id = trace_id if trace_id else f"summary_{session_id}"
+            # Queue scores for the Langfuse Scores tab; sent in the background
+            if LANGFUSE_ENABLED and session_id:
+                # Determine trace ID for scoring
+                scoring_trace_id = trace_id if trace_id else f"summary_{session_id}"
+
+                # Overall score (main score)
+                score_exporter.create_score(
+                    name="overall_quality",
+                    value=result_json["overall_score"] / 10,  # Normalize to 0-1
+                    trace_id=scoring_trace_id,
+                    observation_id=observation_id,
+                    comment=result_json.get("reasoning", ""),
+                    data_type="NUMERIC"
+                )
 
-                    # Overall score (main score)
-                    langfuse_client.create_score(
-                        name="overall_quality",
-                        value=result_json["overall_score"] / 10,  # Normalize to 0-1
+                # Individual dimension scores
+                for dimension in ["faithfulness", "completeness", "conciseness", "coherence", "clarity"]:
+                    score_exporter.create_score(
+                        name=dimension,
+                        value=result_json[dimension] / 10,  # Normalize to 0-1
                         trace_id=scoring_trace_id,
                         observation_id=observation_id,
-                        comment=result_json.get("reasoning", ""),
                         data_type="NUMERIC"
                     )
 
-                    # Individual dimension scores
-                    for dimension in ["faithfulness", "completeness", "conciseness", "coherence", "clarity"]:
-                        langfuse_client.create_score(
-                            name=dimension,
-                            value=result_json[dimension] / 10,  # Normalize to 0-1
-                            trace_id=scoring_trace_id,
-                            observation_id=observation_id,
-                            data_type="NUMERIC"
-                        )
-
-                    # Flush to ensure scores are sent
-                    langfuse_client.flush()
-
-                    print(f"📊 Scores logged to Langfuse for session {session_id}")
-
-                except Exception as score_error:
-                    print(f"⚠️  Failed to log scores to Langfuse: {score_error}")
-
             return result_json
 
         except json.JSONDecodeError as e:
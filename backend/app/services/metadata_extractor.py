@@ -0,0 +1,292 @@
+import PyPDF2
+from io import BytesIO
+from statistics import median
+from typing import BinaryIO, List, Optional, Tuple, Union
+import math
+import re
+
+UNKNOWN = "Unknown"
+
+# Titles that PDF producers write into the info dictionary by default
+_PLACEHOLDER_TITLE = re.compile(
+    r"^(untitled|microsoft word|document\d*|slide \d+|title)\b|\.(docx?|tex|dvi|pdf|ps)$",
+    re.IGNORECASE
+)
+
+_ARXIV_NEW = re.compile(r"arXiv:\s*(\d{2})(0[1-9]|1[0-2])\.\d{4,5}(?:v\d+)?\b")
+_ARXIV_FILENAME = re.compile(r"^(\d{2})(0[1-9]|1[0-2])\.\d{4,5}(?:v\d+)?\.pdf$")
+_ARXIV_OLD = re.compile(r"arXiv:[a-z\-]+(?:\.[A-Z]{2})?/(\d{2})(0[1-9]|1[0-2])\d{3}")
+_VENUE_YEAR = re.compile(
+    r"\b(?:NeurIPS|NIPS|ICML|ICLR|CVPR|ICCV|ECCV|ACL|EMNLP|NAACL|COLING|AAAI|IJCAI|KDD|"
+    r"SIGIR|WWW|Interspeech|ICASSP|Conference|Proceedings|Workshop|Symposium|Journal|"
+    r"Transactions|Published)\b[^\n]{0,60}?\b((?:19|20)\d{2})\b"
+)
+_COPYRIGHT_YEAR = re.compile(r"(?:©|\(c\)|Copyright)\s*((?:19|20)\d{2})\b", re.IGNORECASE)
+_ANY_YEAR = re.compile(r"\b((?:19[89]|20[0-4])\d)\b")
+
+# Lines on the title page that are affiliations or contact details, not names
+_AFFILIATION = re.compile(
+    r"@|https?://|\b(universit\w*|institut\w*|department|dept\.?|school|college|[ée]cole|"
+    r"laborator(y|ies)|lab|labs|research|inc\.?|ltd|corporation|google|microsoft|meta|"
+    r"deepmind|openai|academy|center|centre|faculty|hospital|polytechni\w*|mellon|stanford|"
+    r"berkeley|mit|eth|epfl|inria|cnrs|montr[ée]al|bremen|toronto|amsterdam|oxford|cambridge|"
+    r"usa|canada|china|korea|japan|germany|france|switzerland|israel|india)\b",
+    re.IGNORECASE
+)
+# One word of a personal name: "Kaiming", "Ming-Wei", "O'Neil", or an initial "P."
+_NAME_WORD = re.compile(r"^[^\W\d_][^\W\d_]*(?:['\-][^\W\d_]+)*\.?$")
+_NAME_PARTICLES = {"van", "von", "der", "den", "de", "del", "della", "da", "di", "du", "la", "le", "bin"}
+_FOOTNOTE_MARKS = re.compile(r"[\d\*†‡§¶∗♯♭,]+$")
+
+
+class MetadataExtractor:
+    """Local, heuristic extraction of paper metadata from the PDF itself"""
+
+    @staticmethod
+    def _first_page_lines(reader: PyPDF2.PdfReader) -> List[Tuple[float, str]]:
+        """
+        Collect first-page text lines with their effective font size
+
+        Args:
+            reader: Opened PDF reader
+
+        Returns:
+            List of (font size, line text) in reading order
+        """
+        runs = []
+
+        def visitor(text, cm, tm, font_dict, font_size):
+            if not text or not text.strip():
+                return
+            # Skip rotated text such as the arXiv side stamp
+            if abs(tm[1]) > abs(tm[0]) or abs(cm[1]) > abs(cm[0]):
+                return
+            scale = math.hypot(tm[2], tm[3]) * math.hypot(cm[2], cm[3])
+            size = round(font_size * (scale or 1.0), 1)
+            y = round(tm[5] * cm[3] + cm[5], 0)
+            for part in text.split("\n"):
+                if part.strip():
+                    runs.append((y, size, part.strip()))
+
+        reader.pages[0].extract_text(visitor_text=visitor)
+
+        # Merge runs that share a baseline and size into lines
+        lines: List[Tuple[float, str]] = []
+        previous = None
+        for y, size, text in runs:
+            if previous == (y, size) and lines:
+                lines[-1] = (size, f"{lines[-1][1]} {text}")
+            else:
+                lines.append((size, text))
+            previous = (y, size)
+        return lines
+
+    @staticmethod
+    def _title_from_layout(lines: List[Tuple[float, str]]) -> Tuple[str, float, int]:
+        """
+        Pick the title as the largest-font text near the top of the first page
+
+        Returns:
+            Tuple of (title, confidence, index of the line after the title)
+        """
+        candidates = [
+            (i, size, text) for i, (size, text) in enumerate(lines[:30])
+            if len(text) > 3 and not _ARXIV_NEW.search(text) and not _ARXIV_OLD.search(text)
+        ]
+        if not candidates:
+            return UNKNOWN, 0.0, 0
+
+        title_size = max(size for _, size, _ in candidates)
+        body_size = median(size for size, _ in lines)
+        title_parts = []
+        end = 0
+        for i, size, text in candidates:
+            if size == title_size:
+                title_parts.append(text)
+                end = i + 1
+            elif title_parts:
+                break
+
+        title = " ".join(" ".join(title_parts).split())
+        if not 10 <= len(title) <= 300:
+            return title or UNKNOWN, 0.3, end
+        # A title set clearly larger than the body text is a reliable signal
+        confidence = 0.8 if title_size >= 1.2 * body_size else 0.4
+        return title, confidence, end
+
+    @staticmethod
+    def _split_names(part: str) -> Tuple[List[str], bool]:
+        """
+        Check that a fragment of an author line is shaped like personal names
+
+        Args:
+            part: Fragment between separators, footnote marks removed
+
+        Returns:
+            Tuple of (names, whether the split between names was guessed)
+        """
+        words = part.split()
+        for word in words:
+            if word in _NAME_PARTICLES:
+                continue
+            core = word.rstrip(".")
+            # Acronyms such as "IEEE" or "AI" are not names
+            if not _NAME_WORD.match(word) or not core[0].isupper() or (len(core) > 1 and core.isupper()):
+                return [], False
+        if len(words) < 2 or words[0] in _NAME_PARTICLES:
+            return [], False
+        if len(words) <= 3 or any(word.endswith(".") or word in _NAME_PARTICLES for word in words):
+            return ([part], False) if len(words) <= 5 else ([], False)
+        # Names set side by side without separators ("Kyunghyun Cho Yoshua Bengio")
+        if len(words) % 2 == 0:
+            return [" ".join(words[i:i + 2]) for i in range(0, len(words), 2)], True
+        return [], False
+
+    @staticmethod
+    def _authors_from_layout(lines: List[Tuple[float, str]], start: int) -> Tuple[str, float]:
+        """
+        Collect author names from the lines between the title and the abstract
+
+        Confidence reflects the evidence: names in an explicit list or each
+        followed by its affiliation score high, while guessed splits, stray
+        name-like lines and fragments that are not shaped like names keep the
+        result below the LLM fallback threshold.
+
+        Returns:
+            Tuple of (comma-separated authors, confidence)
+        """
+        block = []
+        for _, text in lines[start:start + 15]:
+            if re.match(r"^\s*(abstract|introduction|1\s+introduction)\b", text, re.IGNORECASE):
+                break
+            block.append(text)
+
+        names = []
+        confidence = 0.8
+        for i, text in enumerate(block):
+            if _AFFILIATION.search(text):
+                continue
+            parts = [
+                _FOOTNOTE_MARKS.sub("", part.strip()).strip()
+                for part in re.split(r",|\band\b|&|;|\s{2,}", text)
+            ]
+            parts = [part for part in parts if part]
+            found = []
+            for part in parts:
+                split, guessed = MetadataExtractor._split_names(part)
+                if split:
+                    found.extend(split)
+                    if guessed:
+                        confidence = min(confidence, 0.5)
+            if not found:
+                continue
+            if len(found) < len(parts):
+                # Part of the line is not names: possibly an affiliation we do not know
+                confidence = min(confidence, 0.45)
+            if len(parts) == 1 and len(found) == 1:
+                # A lone name-like line is only trusted when its affiliation follows
+                following = block[i + 1] if i + 1 < len(block) else ""
+                if not _AFFILIATION.search(following):
+                    confidence = min(confidence, 0.5)
+            names.extend(found)
+        if not names:
+            return UNKNOWN, 0.0
+        return ", ".join(dict.fromkeys(names)), confidence
+
+    @staticmethod
+    def _year_from_text(text: str, filename: Optional[str]) -> Tuple[str, float]:
+        """
+        Find the publication year from arXiv identifiers and year patterns
+
+        Returns:
+            Tuple of (year, confidence)
+        """
+        match = _ARXIV_FILENAME.match(filename or "") or _ARXIV_NEW.search(text)
+        if match and int(match.group(1)) >= 7:
+            return f"20{match.group(1)}", 0.95
+        match = _ARXIV_OLD.search(text)
+        if match:
+            prefix = "19" if int(match.group(1)) >= 91 else "20"
+            return f"{prefix}{match.group(1)}", 0.95
+
+        match = _VENUE_YEAR.search(text)
+        if match:
+            return match.group(1), 0.8
+        match = _COPYRIGHT_YEAR.search(text)
+        if match:
+            return match.group(1), 0.75
+
+        years = _ANY_YEAR.findall(text)
+        if years:
+            # References cite older work, so the latest year is the best guess
+            return max(years), 0.4
+        return UNKNOWN, 0.0
+
+    @staticmethod
+    def extract(pdf_content: Union[bytes, BinaryIO], filename: Optional[str] = None) -> dict:
+        """
+        Extract title, authors and year without calling an LLM
+
+        Uses the PDF document info dictionary, the first-page font-size layout,
+        arXiv identifiers and year patterns. Every field carries a confidence
+        in [0, 1] so callers can decide when to fall back to the LLM.
+
+        Args:
+            pdf_content: Raw bytes of the PDF file, or a seekable binary file
+            filename: Original filename (arXiv downloads carry the identifier)
+
+        Returns:
+            Dictionary with title, authors, year and per-field confidence
+        """
+        result = {
+            "title": UNKNOWN,
+            "authors": UNKNOWN,
+            "year": UNKNOWN,
+            "confidence": {"title": 0.0, "authors": 0.0, "year": 0.0}
+        }
+        try:
+            reader = PyPDF2.PdfReader(BytesIO(pdf_content) if isinstance(pdf_content, bytes) else pdf_content)
+            lines = MetadataExtractor._first_page_lines(reader)
+            info = reader.metadata or {}
+        except Exception as e:
+            print(f"Warning: Local metadata extraction failed: {str(e)}")
+            return result
+
+        first_page = "\n".join(text for _, text in lines)
+        first_page_normalized = " ".join(first_page.lower().split())
+        confidence = result["confidence"]
+
+        # Title: layout first, then confirm or override with the info dictionary
+        title, confidence["title"], title_end = MetadataExtractor._title_from_layout(lines)
+        result["title"] = title
+        info_title = " ".join(str(info.get("/Title") or "").split())
+        if len(info_title) >= 5 and not _PLACEHOLDER_TITLE.search(info_title):
+            if info_title.lower() in first_page_normalized:
+                result["title"], confidence["title"] = info_title, 0.95
+            elif confidence["title"] < 0.5:
+                result["title"], confidence["title"] = info_title, 0.5
+
+        # Authors: info dictionary if it looks like real names, else layout
+        info_author = " ".join(str(info.get("/Author") or "").split())
+        if info_author and " " in info_author and not _AFFILIATION.search(info_author):
+            surname = re.split(r"[,;]| and ", info_author)[0].split()[-1].lower()
+            result["authors"] = info_author
+            confidence["authors"] = 0.9 if surname in first_page_normalized else 0.6
+        else:
+            result["authors"], confidence["authors"] = MetadataExtractor._authors_from_layout(
+                lines, title_end
+            )
+
+        # Year: identifiers and venue lines, then the file's creation date
+        result["year"], confidence["year"] = MetadataExtractor._year_from_text(first_page, filename)
+        if confidence["year"] < 0.5:
+            created = str(info.get("/CreationDate") or "")
+            match = re.match(r"^D:((?:19|20)\d{2})", created)
+            if match:
+                result["year"], confidence["year"] = match.group(1), 0.5
+
+        return result
+
+
+# Global metadata extractor instance
+metadata_extractor = MetadataExtractor()
@@ -0,0 +1,221 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Tuple
+from starlette.routing import Match
+import time
+
+# Prometheus integration (optional)
+PROMETHEUS_ENABLED = False
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+    PROMETHEUS_ENABLED = True
+except ImportError:
+    print("ℹ️ Prometheus metrics disabled (prometheus_client not installed)")
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _NoopMetric:
+    """Stand-in for Prometheus metrics when prometheus_client is missing"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def set_function(self, fn):
+        pass
+
+
+# Endpoint label of requests no route matches (404s, scanners), so arbitrary
+# paths never become label values
+UNMATCHED_ENDPOINT = "unmatched"
+
+# Route template of the request being served, e.g. "/api/summarize"
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="background")
+
+# Stage latencies are short (ms) while LLM calls take seconds to minutes
+_STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+_LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120, 300)
+# Rate limiter waits: none at all when idle, minutes behind a full queue
+_WAIT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+if PROMETHEUS_ENABLED:
+    REQUEST_SECONDS = Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency",
+        ["method", "endpoint", "status"],
+        buckets=_LLM_BUCKETS
+    )
+    STAGE_SECONDS = Histogram(
+        "pipeline_stage_duration_seconds",
+        "Latency of request-path stages (pdf_parse, chunking, embedding_batch, "
+        "vector_upsert, vector_query, rerank, langfuse_flush)",
+        ["stage", "endpoint"],
+        buckets=_STAGE_BUCKETS
+    )
+    LLM_TTFT_SECONDS = Histogram(
+        "llm_time_to_first_token_seconds",
+        "Time from request to first streamed token",
+        ["model", "endpoint"],
+        buckets=_LLM_BUCKETS
+    )
+    LLM_SECONDS = Histogram(
+        "llm_request_duration_seconds",
+        "Total LLM call latency",
+        ["model", "endpoint"],
+        buckets=_LLM_BUCKETS
+    )
+    LLM_TOKENS = Counter(
+        "llm_tokens_total",
+        "Tokens sent to and received from the LLM",
+        ["model", "direction", "endpoint"]
+    )
+    CACHE_LOOKUPS = Counter(
+        "cache_lookups_total",
+        "Cache lookups by cache and result (hit/miss)",
+        ["cache", "result", "endpoint"]
+    )
+    TELEMETRY_EVENTS = Counter(
+        "telemetry_export_events_total",
+        "Langfuse events by export result (exported/dropped/failed)",
+        ["result"]
+    )
+    RATE_LIMIT_QUEUE_DEPTH = Gauge(
+        "llm_rate_limit_queue_depth",
+        "OpenAI calls waiting for a rate limiter slot",
+        ["model"]
+    )
+    RATE_LIMIT_WAIT_SECONDS = Histogram(
+        "llm_rate_limit_wait_seconds",
+        "Time OpenAI calls waited in the rate limiter queue",
+        ["model", "priority"],
+        buckets=_WAIT_BUCKETS
+    )
+else:
+    REQUEST_SECONDS = _NoopMetric()
+    STAGE_SECONDS = _NoopMetric()
+    LLM_TTFT_SECONDS = _NoopMetric()
+    LLM_SECONDS = _NoopMetric()
+    LLM_TOKENS = _NoopMetric()
+    CACHE_LOOKUPS = _NoopMetric()
+    TELEMETRY_EVENTS = _NoopMetric()
+    RATE_LIMIT_QUEUE_DEPTH = _NoopMetric()
+    RATE_LIMIT_WAIT_SECONDS = _NoopMetric()
+
+
+@contextmanager
+def observe_stage(stage: str):
+    """
+    Time a block and record it in the stage latency histogram
+
+    Args:
+        stage: Stage name (e.g. "pdf_parse", "vector_query")
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage, current_endpoint.get()).observe(time.perf_counter() - start)
+
+
+def record_cache(cache: str, hit: bool):
+    """
+    Count a cache lookup for the current endpoint
+
+    Args:
+        cache: Cache name (e.g. "summary", "storyline")
+        hit: Whether the lookup was served from cache
+    """
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss", current_endpoint.get()).inc()
+
+
+def record_llm_usage(model: str, usage):
+    """
+    Count prompt and completion tokens from an OpenAI usage object
+
+    Args:
+        model: Model the call was made against
+        usage: Usage object from a completion (may be None)
+    """
+    if usage is None:
+        return
+    endpoint = current_endpoint.get()
+    LLM_TOKENS.labels(model, "in", endpoint).inc(getattr(usage, "prompt_tokens", 0) or 0)
+    LLM_TOKENS.labels(model, "out", endpoint).inc(getattr(usage, "completion_tokens", 0) or 0)
+
+
+def render_metrics() -> bytes:
+    """Render all metrics in the Prometheus text exposition format"""
+    if not PROMETHEUS_ENABLED:
+        return b"# prometheus_client not installed\n"
+    return generate_latest()
+
+
+def _match_template(routes, scope, prefix: str = "") -> Tuple[Match, Optional[str]]:
+    """Best match and path template of the route serving scope, searching included routers"""
+    best, template = Match.NONE, None
+    for route in routes:
+        path = getattr(route, "path", None)
+        router = getattr(route, "original_router", None)
+        if path:
+            match = route.matches(scope)[0]
+            candidate = prefix + path
+        elif router is not None:
+            # Newer FastAPI keeps included routers unflattened, with their prefix
+            router_prefix = getattr(getattr(route, "include_context", None), "prefix", "") or ""
+            if not scope["path"].startswith(router_prefix):
+                continue
+            inner = {**scope, "path": scope["path"][len(router_prefix):]}
+            match, candidate = _match_template(router.routes, inner, prefix + router_prefix)
+        else:
+            continue
+        if match == Match.FULL:
+            return match, candidate
+        if match == Match.PARTIAL and best == Match.NONE:
+            best, template = match, candidate
+    return best, template
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that labels work with the matched route template and
+    records request latency
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route_template(scope) -> str:
+        """Matched route path (also for a wrong method), or UNMATCHED_ENDPOINT"""
+        _, template = _match_template(getattr(scope.get("app"), "routes", []), scope)
+        return template or UNMATCHED_ENDPOINT
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self._route_template(scope)
+        token = current_endpoint.set(endpoint)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_SECONDS.labels(scope["method"], endpoint, str(status)).observe(
+                time.perf_counter() - start
+            )
+            current_endpoint.reset(token)
@@ -0,0 +1,193 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import base64
+import json
+import os
+import numpy as np
+
+# Sections whose chunks describe the paper as a whole
+OVERVIEW_SECTIONS = {"front matter", "abstract"}
+
+
+def pool_paper_vector(vectors: Sequence[Sequence[float]], sections: Sequence[str]) -> Optional[np.ndarray]:
+    """
+    One vector for a whole paper from its chunk embeddings
+
+    Averages the title/abstract chunks when there are any, otherwise every
+    chunk, so no extra embedding call is needed.
+
+    Args:
+        vectors: Chunk embeddings
+        sections: Section label of each chunk
+
+    Returns:
+        Normalized paper vector, or None without chunks
+    """
+    if not len(vectors):
+        return None
+    matrix = np.asarray(vectors, dtype=np.float32)
+    overview = [i for i, section in enumerate(sections) if section in OVERVIEW_SECTIONS]
+    pooled = matrix[overview].mean(axis=0) if overview else matrix.mean(axis=0)
+    norm = float(np.linalg.norm(pooled))
+    return pooled / norm if norm > 0 else None
+
+
+class PaperIndex:
+    """
+    In-memory paper-level vectors (one per session) with exact cosine search
+
+    Rows live in one contiguous matrix that grows by doubling; removal moves
+    the last row into the freed slot, so add and remove are O(dimension).
+    With a path, every add and remove is also appended to a JSONL log that
+    is replayed (and compacted if mostly superseded) on startup. Records of
+    another index version are skipped on replay, so papers re-appear only
+    once they are re-indexed with the current version.
+    """
+
+    def __init__(self, path: Optional[str] = None, version: Optional[str] = None):
+        """
+        Args:
+            path: JSONL file to persist vectors in (optional, in-memory only without)
+            version: Index version the vectors belong to (optional)
+        """
+        self.path = path
+        self.version = version
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            if os.path.exists(path):
+                self._load()
+
+    def _load(self):
+        """Replay the log; rewrite it when most records are superseded"""
+        records = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    records += 1
+                    if record.get("deleted"):
+                        self._remove(record["id"])
+                    elif record.get("version") != self.version:
+                        continue
+                    else:
+                        vector = np.frombuffer(base64.b64decode(record["vector"]), dtype=np.float32)
+                        self._add(record["id"], vector)
+                except (json.JSONDecodeError, KeyError, ValueError):
+                    # An interrupted write leaves a partial last line
+                    continue
+        if records > 2 * len(self._ids):
+            self.compact()
+
+    def _append(self, record: dict):
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def _record(self, paper_id: str, vector: np.ndarray) -> dict:
+        encoded = base64.b64encode(vector.astype(np.float32).tobytes()).decode("ascii")
+        return {"id": paper_id, "version": self.version, "vector": encoded}
+
+    def compact(self):
+        """Rewrite the log with one record per live paper"""
+        if not self.path:
+            return
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            for paper_id in self._ids:
+                f.write(json.dumps(self._record(paper_id, self._matrix[self._positions[paper_id]])) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self._positions
+
+    def add(self, paper_id: str, vector: Sequence[float]):
+        """
+        Insert or replace a paper's vector
+
+        Args:
+            paper_id: Session identifier
+            vector: Paper vector (normalized here)
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+        self._add(paper_id, vector)
+        self._append(self._record(paper_id, vector))
+
+    def _add(self, paper_id: str, vector: np.ndarray):
+        if self._matrix is None:
+            self._matrix = np.zeros((16, len(vector)), dtype=np.float32)
+        if paper_id in self._positions:
+            self._matrix[self._positions[paper_id]] = vector
+            return
+        if len(self._ids) == len(self._matrix):
+            grown = np.zeros((len(self._matrix) * 2, self._matrix.shape[1]), dtype=np.float32)
+            grown[:len(self._ids)] = self._matrix[:len(self._ids)]
+            self._matrix = grown
+        self._positions[paper_id] = len(self._ids)
+        self._matrix[len(self._ids)] = vector
+        self._ids.append(paper_id)
+
+    def remove(self, paper_id: str):
+        """Drop a paper's vector, if present"""
+        if self._remove(paper_id):
+            self._append({"id": paper_id, "deleted": True})
+
+    def _remove(self, paper_id: str) -> bool:
+        position = self._positions.pop(paper_id, None)
+        if position is None:
+            return False
+        last = len(self._ids) - 1
+        if position != last:
+            moved = self._ids[last]
+            self._matrix[position] = self._matrix[last]
+            self._ids[position] = moved
+            self._positions[moved] = position
+        self._ids.pop()
+        return True
+
+    def get(self, paper_id: str) -> Optional[np.ndarray]:
+        position = self._positions.get(paper_id)
+        return None if position is None else self._matrix[position].copy()
+
+    def search(
+        self,
+        vector: Sequence[float],
+        top_k: int,
+        allowed: Optional[Set[str]] = None,
+        exclude: Iterable[str] = ()
+    ) -> List[Tuple[str, float]]:
+        """
+        Papers most similar to a vector
+
+        Args:
+            vector: Query vector
+            top_k: Number of papers to return
+            allowed: Only consider these paper ids (optional)
+            exclude: Paper ids to leave out
+
+        Returns:
+            (paper id, cosine similarity) pairs, most similar first
+        """
+        if not self._ids or top_k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = self._matrix[:len(self._ids)] @ query
+        excluded = set(exclude)
+        if allowed is not None or excluded:
+            mask = np.array([
+                (allowed is None or paper_id in allowed) and paper_id not in excluded
+                for paper_id in self._ids
+            ], dtype=bool)
+            scores = np.where(mask, scores, -np.inf)
+        top_k = min(top_k, len(scores))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [(self._ids[i], float(scores[i])) for i in best if np.isfinite(scores[i])]
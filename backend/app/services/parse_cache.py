@@ -0,0 +1,161 @@
+from datetime import datetime
+from io import BytesIO
+from typing import List, Optional
+from app.services.metadata_extractor import UNKNOWN
+from app.services.pdf_parser import parse_pdf_file, PARSER_VERSION
+from app.services.session_manager import session_manager, write_atomic, COPY_BUFFER_BYTES, UPLOAD_DIR
+from app.utils.sections import detect_sections
+import gzip
+import hashlib
+import json
+import os
+
+# Parse results, one gzip-compressed JSON file per PDF content hash
+PARSED_DIR = os.path.join(UPLOAD_DIR, "parsed")
+PARSED_SUFFIX = ".json.gz"
+
+
+def content_hash(path: str) -> str:
+    """SHA-256 of a file, read in fixed-size pieces"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            piece = f.read(COPY_BUFFER_BYTES)
+            if not piece:
+                return digest.hexdigest()
+            digest.update(piece)
+
+
+def _cache_path(digest: str, directory: str) -> str:
+    return os.path.join(directory, f"{digest}{PARSED_SUFFIX}")
+
+
+def _read_entry(digest: str, directory: str) -> Optional[dict]:
+    try:
+        with gzip.open(_cache_path(digest, directory), "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, EOFError, ValueError):
+        # Missing, or a corrupt file from before writes were atomic
+        return None
+
+
+def load_parsed(digest: str, directory: str = PARSED_DIR) -> Optional[dict]:
+    """
+    Cached parse result of a PDF
+
+    Args:
+        digest: Content hash of the PDF
+        directory: Cache directory
+
+    Returns:
+        Dictionary with pages, text, sections and metadata, or None if not
+        cached or cached by another parser version
+    """
+    entry = _read_entry(digest, directory)
+    if entry is None or entry.get("parser_version") != PARSER_VERSION:
+        return None
+    raw, offsets = entry["page_text"], entry["page_offsets"]
+    return {
+        "pages": [raw[start:end] for start, end in zip([0] + offsets, offsets)],
+        "text": entry["text"],
+        "sections": [tuple(section) for section in entry["sections"]],
+        "metadata": entry["metadata"],
+        "filename": entry["filename"],
+        "content_hash": digest,
+    }
+
+
+def _store_parsed(digest: str, parsed: dict, filename: str, directory: str):
+    offsets: List[int] = []
+    for page in parsed["pages"]:
+        offsets.append((offsets[-1] if offsets else 0) + len(page))
+    entry = {
+        "parser_version": PARSER_VERSION,
+        "filename": filename,
+        "text": parsed["text"],
+        # Pages are stored joined, with the end offset of each
+        "page_text": "".join(parsed["pages"]),
+        "page_offsets": offsets,
+        "sections": parsed["sections"],
+        "metadata": parsed["metadata"],
+    }
+    data = gzip.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8"), compresslevel=6)
+    os.makedirs(directory, exist_ok=True)
+    write_atomic(BytesIO(data), _cache_path(digest, directory))
+
+
+def parse_pdf_cached(path: str, filename: str, directory: str = PARSED_DIR) -> dict:
+    """
+    Parse a PDF on disk, reusing the stored result for the same content
+    Module-level so it can run in a worker process (batch uploads)
+
+    Args:
+        path: Path of the PDF file
+        filename: Original filename (for arXiv identifiers)
+        directory: Cache directory
+
+    Returns:
+        Dictionary with pages, text, sections, metadata (MetadataExtractor.extract
+        result), content_hash and cached (whether the stored result was used)
+    """
+    digest = content_hash(path)
+    parsed = load_parsed(digest, directory)
+    if parsed is not None:
+        return {**parsed, "cached": True}
+
+    parsed = parse_pdf_file(path, filename)
+    parsed["sections"] = detect_sections(parsed["text"])
+    try:
+        _store_parsed(digest, parsed, filename, directory)
+    except OSError as e:
+        print(f"Warning: Could not cache parse result: {str(e)}")
+    return {**parsed, "filename": filename, "content_hash": digest, "cached": False}
+
+
+def restore_sessions(upload_dir: str = UPLOAD_DIR, directory: str = PARSED_DIR) -> int:
+    """
+    Recreate sessions for stored PDFs
+
+    Sessions are held in memory, so after a restart they come back from
+    uploads/<session_id>.pdf, usually from the cache without parsing again.
+    PDFs without a current cache entry (never cached, or cached by another
+    parser version) are parsed again, keeping the original filename of a
+    stale entry. Their title, authors and year are the locally extracted
+    metadata; summaries and storylines were never persisted. Blocking; run
+    it in a thread.
+
+    Args:
+        upload_dir: Directory of the stored PDFs
+        directory: Cache directory
+
+    Returns:
+        Number of sessions restored
+    """
+    restored = 0
+    for entry in os.scandir(upload_dir):
+        session_id = entry.name[:-4]
+        if not entry.is_file() or not entry.name.endswith(".pdf") \
+                or session_manager.session_exists(session_id, touch=False):
+            continue
+        try:
+            digest = content_hash(entry.path)
+            parsed = load_parsed(digest, directory)
+            if parsed is None:
+                stale = _read_entry(digest, directory)
+                filename = stale.get("filename", entry.name) if stale else entry.name
+                parsed = parse_pdf_cached(entry.path, filename, directory)
+        except Exception as e:
+            # Unreadable or unparseable; the PDF stays on disk
+            print(f"⚠️  Could not restore session {session_id}: {str(e)}")
+            continue
+        session_manager.restore_session(
+            session_id=session_id,
+            filename=parsed["filename"],
+            text=parsed["text"],
+            pdf_path=entry.path,
+            created_at=datetime.fromtimestamp(entry.stat().st_mtime),
+            content_hash=parsed["content_hash"],
+            metadata={key: value for key, value in parsed["metadata"].items() if value != UNKNOWN}
+        )
+        restored += 1
+    return restored
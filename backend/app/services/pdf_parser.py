@@ -1,58 +1,246 @@
 import PyPDF2
+from collections import defaultdict
 from io import BytesIO
+from typing import BinaryIO, List, Set, Union
+from app.services.metadata_extractor import metadata_extractor
+import re
+
+# Bump whenever extraction or cleaning changes: cached parse results of
+# other versions are ignored (see parse_cache)
+PARSER_VERSION = 3
+
+# Only the first and last few lines of a page are considered headers/footers
+EDGE_LINES = 3
+# Longer lines are body text, even if they repeat
+MAX_BOILERPLATE_LENGTH = 120
+# Prefixes of hyphenated compounds ("self-attention"), never split off a plain word
+COMPOUND_PREFIXES = frozenset({"self", "non", "few", "zero", "well"})
+# Punctuation stripped from a word before looking it up as a compound
+WORD_PUNCTUATION = ".,;:!?()[]{}\"'"
+
+def _line_key(line: str) -> str:
+    """Normalize a line so page numbers and spacing don't hide repetition"""
+    return re.sub(r"\d+", "#", " ".join(line.lower().split()))
+
+
+def find_boilerplate(pages: List[str], min_ratio: float = 0.5, min_pages: int = 3) -> Set[str]:
+    """
+    Find header/footer lines that recur across pages
+
+    Args:
+        pages: Page texts
+        min_ratio: Fraction of pages a line must appear on
+        min_pages: Minimum number of pages a line must appear on
+
+    Returns:
+        Set of normalized line keys (see _line_key)
+    """
+    if len(pages) < min_pages:
+        return set()
+    page_counts = defaultdict(int)
+    for page in pages:
+        lines = [line for line in page.splitlines() if line.strip()]
+        edges = lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+        keys = {_line_key(line) for line in edges if len(line.strip()) <= MAX_BOILERPLATE_LENGTH}
+        for key in keys:
+            page_counts[key] += 1
+    threshold = max(min_pages, len(pages) * min_ratio)
+    return {key for key, count in page_counts.items() if count >= threshold}
+
+
+def strip_boilerplate(pages: List[str], boilerplate: Set[str]) -> List[str]:
+    """
+    Remove boilerplate lines from the edges of each page
+
+    Args:
+        pages: Page texts
+        boilerplate: Line keys from find_boilerplate
+
+    Returns:
+        Page texts without those lines
+    """
+    if not boilerplate:
+        return pages
+    stripped = []
+    for page in pages:
+        lines = page.splitlines()
+        edge_positions = set(range(EDGE_LINES)) | set(range(len(lines) - EDGE_LINES, len(lines)))
+        stripped.append("\n".join(
+            line for position, line in enumerate(lines)
+            if not (position in edge_positions and _line_key(line) in boilerplate)
+        ))
+    return stripped
 
 
 class PDFParser:
     """Service for parsing PDF files and extracting text"""
     
     @staticmethod
-    async def extract_text_from_pdf(file_content: bytes) -> str:
+    async def extract_pages(file_content: bytes) -> List[str]:
         """
-        Extract text from PDF file content
+        Extract text from each page of a PDF file
         
         Args:
             file_content: Raw bytes of the PDF file
             
         Returns:
-            Extracted text as a string
+            List of page texts in page order
+            
+        Raises:
+            Exception: If PDF parsing fails
+        """
+        return PDFParser.parse_pages(file_content)
+    
+    @staticmethod
+    def parse_pages(file_content: Union[bytes, BinaryIO]) -> List[str]:
+        """
+        Synchronous extract_pages, for worker processes and threads
+        
+        Args:
+            file_content: Raw bytes of the PDF file, or a seekable binary file
+                (read in place, without a copy in memory)
+            
+        Returns:
+            List of page texts in page order
             
         Raises:
             Exception: If PDF parsing fails
         """
         try:
-            pdf_file = BytesIO(file_content)
+            pdf_file = BytesIO(file_content) if isinstance(file_content, bytes) else file_content
             pdf_reader = PyPDF2.PdfReader(pdf_file)
             
-            text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
+            pages = [page.extract_text() for page in pdf_reader.pages]
             
-            if not text.strip():
+            if not "".join(pages).strip():
                 raise ValueError("No text could be extracted from the PDF")
             
-            return text.strip()
+            return pages
         
         except Exception as e:
             raise Exception(f"Failed to parse PDF: {str(e)}")
     
+    @staticmethod
+    def join_pages(pages: List[str]) -> str:
+        """
+        Join page texts into the full document text
+        
+        Args:
+            pages: Page texts from extract_pages
+            
+        Returns:
+            Document text
+        """
+        return "\n".join(pages).strip()
+    
+    @staticmethod
+    async def extract_text_from_pdf(file_content: bytes) -> str:
+        """
+        Extract text from PDF file content
+        
+        Args:
+            file_content: Raw bytes of the PDF file
+            
+        Returns:
+            Extracted text as a string
+            
+        Raises:
+            Exception: If PDF parsing fails
+        """
+        pages = await PDFParser.extract_pages(file_content)
+        return PDFParser.join_pages(pages)
+    
     @staticmethod
     def clean_text(text: str) -> str:
         """
         Clean extracted text by removing extra whitespace and normalizing
         
+        Runs of spaces and tabs become one space and wrapped lines are joined,
+        while blank lines are kept as paragraph breaks ("\\n\\n") for the
+        chunker. A word hyphenated at a line break is joined when it continues
+        in lower case ("exam-\\nple" -> "example"), unless it is a hyphenated
+        compound: a known prefix ("self-\\nattention"), a fragment that is
+        itself hyphenated ("state-of-\\nthe-art"), or a compound that occurs
+        with its hyphen elsewhere in the text.
+        
         Args:
             text: Raw extracted text
             
         Returns:
             Cleaned text
         """
-        # Remove multiple spaces
-        text = " ".join(text.split())
-        
-        # Remove multiple newlines
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        text = "\n".join(lines)
+        parts: List[str] = []
+        # Hyphenated words seen in the text, and line-break hyphens to decide at the end
+        compounds: Set[str] = set()
+        undecided = []
+        paragraph_break = False
+        # One pass over the lines; splitting and joining words happens in C
+        for line in text.splitlines():
+            words = line.split()
+            if not words:
+                paragraph_break = bool(parts)
+                continue
+            line = " ".join(words)
+            if "-" in line:
+                compounds.update(
+                    word.strip(WORD_PUNCTUATION).lower() for word in words if "-" in word[1:-1]
+                )
+            if parts:
+                previous = parts[-1]
+                if paragraph_break:
+                    parts.append("\n\n")
+                elif previous[-1] == "-" and len(previous) > 1 and previous[-2].isalpha() and line[0].islower():
+                    left = previous[previous.rfind(" ") + 1:-1].lstrip(WORD_PUNCTUATION)
+                    right = words[0].rstrip(WORD_PUNCTUATION)
+                    parts[-1] = previous[:-1]
+                    if "-" in left or "-" in right or left.lower() in COMPOUND_PREFIXES:
+                        parts.append("-")
+                    else:
+                        undecided.append((len(parts), f"{left}-{right}".lower()))
+                        parts.append("")
+                else:
+                    parts.append(" ")
+            parts.append(line)
+            paragraph_break = False
+        for position, compound in undecided:
+            if compound in compounds:
+                parts[position] = "-"
+        return "".join(parts)
+    
+    @staticmethod
+    def clean_pages(pages: List[str]) -> str:
+        """
+        Document text from page texts, without per-page headers and footers
         
-        return text
+        Args:
+            pages: Page texts from extract_pages
+            
+        Returns:
+            Cleaned text (see clean_text)
+        """
+        pages = strip_boilerplate(pages, find_boilerplate(pages))
+        return PDFParser.clean_text(PDFParser.join_pages(pages))
 
+
+def parse_pdf_file(path: str, filename: str) -> dict:
+    """
+    Parse a PDF on disk: page texts, cleaned text and local metadata
+    Module-level so it can run in a worker process (see parse_cache)
+    
+    Args:
+        path: Path of the PDF file
+        filename: Original filename (for arXiv identifiers)
+        
+    Returns:
+        Dictionary with pages, text and metadata (MetadataExtractor.extract result)
+    """
+    # PyPDF2 seeks within the file, so it is never read into memory whole
+    with open(path, "rb") as f:
+        pages = PDFParser.parse_pages(f)
+        f.seek(0)
+        metadata = metadata_extractor.extract(f, filename)
+    return {
+        "pages": pages,
+        "text": PDFParser.clean_pages(pages),
+        "metadata": metadata
+    }
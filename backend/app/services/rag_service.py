@@ -1,37 +1,182 @@
-from typing import List, Tuple
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import Dict, List, Optional, Tuple
 from langchain_openai import OpenAIEmbeddings
 from pinecone import Pinecone, ServerlessSpec
 from app.config import settings
+from app.services.rate_limiter import rate_limiter, Priority
+from app.services.token_budget import count_tokens
+from app.services.metrics import observe_stage
+from app.services.vector_store import InMemoryIndex, QuantizedIndex
+from app.services.section_chunker import SectionChunker, Chunk
+from app.services.index_filter import filter_for_indexing, find_citations, locate_pages
+from app.services.paper_index import PaperIndex, pool_paper_vector
+from app.services.reranker import mmr_select, merge_adjacent
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.parse_cache import parse_pdf_cached
+from app.services.session_manager import session_manager
+import asyncio
+import hashlib
+import json
+import os
+import re
 import time
 
+# Default directory for the local quantized vector index
+VECTOR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "vector_store")
+
+# Bump when SectionChunker or the pre-indexing filter change how text is split
+CHUNKER_VERSION = 2
+
+# Chunks fetched when migrating a session (Pinecone's limit with values included)
+MAX_SESSION_CHUNKS = 1000
+# Sessions whose vectors are deleted with one request
+DELETE_BATCH_SESSIONS = 100
+
+
+class IndexMigrationError(Exception):
+    """Raised when a session cannot be brought to the current index version"""
+
+
+def text_key(text: str) -> str:
+    """Stable hash of a chunk's text, for reusing its embedding"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
 
 class RAGService:
     """Service for RAG (Retrieval-Augmented Generation) using Pinecone"""
     
     def __init__(self):
+        # Retries are handled by the shared rate limiter
         self.embeddings = OpenAIEmbeddings(
-            openai_api_key=settings.openai_api_key
+            openai_api_key=settings.openai_api_key,
+            openai_api_base=settings.openai_base_url,
+            model=settings.embedding_model,
+            check_embedding_ctx_length=settings.embedding_check_ctx_length,
+            max_retries=0
         )
         
-        # Initialize Pinecone
-        self.pc = Pinecone(api_key=settings.pinecone_api_key)
         self.index_name = settings.pinecone_index_name
+        if settings.vector_store == "memory":
+            # Local in-process index (development and benchmarks)
+            self.pc = None
+            self.index = InMemoryIndex()
+        elif settings.vector_store == "quantized":
+            # Local int8 index on disk, rescored in float32
+            self.pc = None
+            self.index = QuantizedIndex(
+                settings.local_vector_dir or VECTOR_DIR,
+                rescore_factor=settings.quantized_rescore_factor
+            )
+        else:
+            # Initialize Pinecone
+            self.pc = Pinecone(api_key=settings.pinecone_api_key)
+            
+            # Create index if it doesn't exist
+            self._ensure_index_exists()
+            
+            # Get the index
+            self.index = self.pc.Index(self.index_name)
         
-        # Create index if it doesn't exist
-        self._ensure_index_exists()
-        
-        # Get the index
-        self.index = self.pc.Index(self.index_name)
-        
-        # Text splitter for chunking
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
+        # Section-aware chunking; chunks never straddle a section header
+        self.chunker = SectionChunker(
+            chunk_size=settings.chunk_size,
+            chunk_overlap=settings.chunk_overlap
+        )
+        self.indexed_tiers = {"body"}
+        if settings.index_references:
+            self.indexed_tiers.add("references")
+        if settings.index_appendix:
+            self.indexed_tiers.add("appendix")
+        # Chunks of tiers that are not embedded, per session
+        self._unindexed_chunks: Dict[str, List[Chunk]] = {}
+        # Bibliography text per session, for citation lookup
+        self._references: Dict[str, str] = {}
+        # Splitter parameters + embedding model; vectors are tagged with it and
+        # queries only ever see the current version
+        self.index_version = self._compute_index_version()
+        # Sessions known to be indexed with index_version, and running migrations
+        self._current_sessions: set = set()
+        # Running migrations by session, with the priority they run at
+        self._migrations: Dict[str, Tuple[asyncio.Task, Priority]] = {}
+        # One pooled vector per paper, for library search and related papers;
+        # persisted next to the local index unless vectors are memory-only
+        self.paper_index = PaperIndex(
+            None if settings.vector_store == "memory"
+            else os.path.join(settings.local_vector_dir or VECTOR_DIR, "papers.jsonl"),
+            version=self.index_version
         )
+        # Shared embedding requests for bulk ingestion
+        self.embedding_batcher = EmbeddingBatcher(
+            self._embed_many,
+            batch_size=settings.embedding_batch_size
+        )
+    
+    def _compute_index_version(self) -> str:
+        """Hash of everything that determines a session's vectors"""
+        parameters = {
+            "chunker": CHUNKER_VERSION,
+            "chunk_size": self.chunker.chunk_size,
+            "chunk_overlap": self.chunker.chunk_overlap,
+            "min_chunk_size": self.chunker.min_chunk_size,
+            "indexed_tiers": sorted(self.indexed_tiers),
+            "embedding_model": self.embeddings.model,
+        }
+        return hashlib.sha256(json.dumps(parameters, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    
+    async def _embed(self, text: str, priority: Priority) -> List[float]:
+        """
+        Embed a single text through the shared rate limiter
+
+        Args:
+            text: Text to embed
+            priority: Scheduling priority for the rate limiter
+
+        Returns:
+            Embedding vector
+        """
+        with observe_stage("embedding_batch"):
+            return await rate_limiter.call(
+                self.embeddings.model,
+                lambda: self.embeddings.aembed_query(text),
+                tokens=count_tokens(text),
+                priority=priority
+            )
+
+    async def _embed_many(self, texts: List[str], priority: Priority) -> List[List[float]]:
+        """
+        Embed several texts in one batched request through the shared rate limiter
+
+        Args:
+            texts: Texts to embed
+            priority: Scheduling priority for the rate limiter
+
+        Returns:
+            Embedding vectors in input order
+        """
+        with observe_stage("embedding_batch"):
+            return await rate_limiter.call(
+                self.embeddings.model,
+                lambda: self.embeddings.aembed_documents(texts),
+                tokens=sum(count_tokens(text) for text in texts),
+                priority=priority
+            )
+
+    async def _index_call(self, method: str, **kwargs):
+        """
+        Call an index method; remote (Pinecone) calls run in a worker thread
+        so they do not block the event loop, local ones run in place
+        """
+        if self.pc is None:
+            return getattr(self.index, method)(**kwargs)
+        return await asyncio.to_thread(getattr(self.index, method), **kwargs)
     
+    async def _query_index(self, **kwargs):
+        """
+        Run a vector query; remote (Pinecone) queries run in a worker thread
+        so several can be in flight at once
+        """
+        with observe_stage("vector_query"):
+            return await self._index_call("query", **kwargs)
+
     def _ensure_index_exists(self):
         """Ensure Pinecone index exists, create if not"""
         try:
@@ -40,7 +185,7 @@ class RAGService:
             if self.index_name not in existing_indexes:
                 self.pc.create_index(
                     name=self.index_name,
-                    dimension=1536,  # OpenAI embeddings dimension
+                    dimension=settings.embedding_dimensions,
                     metric="cosine",
                     spec=ServerlessSpec(
                         cloud="aws",
@@ -52,36 +197,89 @@ class RAGService:
         except Exception as e:
             print(f"Warning: Could not ensure index exists: {str(e)}")
     
-    async def index_document(self, session_id: str, text: str) -> int:
+    async def index_document(
+        self,
+        session_id: str,
+        text: str,
+        pages: Optional[List[str]] = None,
+        shared_batches: bool = False,
+        cached_embeddings: Optional[Dict[str, List[float]]] = None,
+        priority: Optional[Priority] = None
+    ) -> int:
         """
-        Split document into chunks and index them in Pinecone
+        Split document into section-aware chunks and index them in Pinecone
+        Headers/footers repeated across pages are dropped before chunking, and
+        chunks of unindexed tiers (references, optionally appendix) are kept
+        in memory instead of being embedded
         
         Args:
             session_id: Session identifier to namespace the vectors
             text: Full text of the document
+            pages: Raw page texts, used to detect per-page boilerplate (optional)
+            shared_batches: Embed through the shared batcher at background
+                priority, together with other documents being ingested
+            cached_embeddings: Embeddings by text_key(chunk text) to reuse
+                instead of embedding again (re-indexing)
+            priority: Embed all new chunks in one request at this priority
+                (otherwise chunks are embedded one by one)
             
         Returns:
             Number of chunks indexed
         """
-        # Split text into chunks
-        chunks = self.text_splitter.split_text(text)
+        with observe_stage("chunking"):
+            # Pre-indexing filter: per-page boilerplate and the bibliography
+            filtered = filter_for_indexing(text, pages)
+            if filtered.references_start is not None:
+                self._references[session_id] = filtered.text[filtered.references_start:]
+            
+            # Split text into chunks
+            chunks = self.chunker.split(filtered.text, filtered.references_start)
+            pages_of_chunks = locate_pages(filtered.text, [chunk.text for chunk in chunks], filtered.pages)
+            for chunk, page in zip(chunks, pages_of_chunks):
+                chunk.page = page
+        
+        indexed = [chunk for chunk in chunks if chunk.tier in self.indexed_tiers]
+        self._unindexed_chunks[session_id] = [
+            chunk for chunk in chunks if chunk.tier not in self.indexed_tiers
+        ]
         
         # Generate embeddings for each chunk
         vectors_to_upsert = []
+        embeddings = {}
+        for chunk in indexed:
+            cached = (cached_embeddings or {}).get(text_key(chunk.text))
+            if cached is not None:
+                embeddings[chunk.index] = cached
+        missing = [chunk for chunk in indexed if chunk.index not in embeddings]
+        if missing and (shared_batches or priority is not None):
+            texts = [chunk.text for chunk in missing]
+            if shared_batches:
+                vectors = await self.embedding_batcher.embed(texts)
+            else:
+                vectors = await self._embed_many(texts, priority)
+            embeddings.update((chunk.index, vector) for chunk, vector in zip(missing, vectors))
         
-        for i, chunk in enumerate(chunks):
+        for chunk in indexed:
             # Generate embedding
-            embedding = await self.embeddings.aembed_query(chunk)
+            embedding = embeddings.get(chunk.index)
+            if embedding is None:
+                embedding = await self._embed(chunk.text, Priority.DEFAULT)
             
-            # Create vector ID with session prefix
-            vector_id = f"{session_id}_{i}"
+            # Create vector ID with session and index version prefix
+            vector_id = f"{session_id}_{self.index_version}_{chunk.index}"
             
             # Prepare metadata
             metadata = {
                 "session_id": session_id,
-                "chunk_index": i,
-                "text": chunk
+                "chunk_index": chunk.index,
+                "section": chunk.section,
+                "tier": chunk.tier,
+                "text": chunk.text,
+                "index_version": self.index_version,
+                "embedding_model": self.embeddings.model
             }
+            if chunk.page is not None:
+                metadata["page"] = chunk.page
             
             vectors_to_upsert.append({
                 "id": vector_id,
@@ -91,83 +289,471 @@ class RAGService:
         
         # Upsert vectors to Pinecone
         if vectors_to_upsert:
-            self.index.upsert(vectors=vectors_to_upsert)
+            with observe_stage("vector_upsert"):
+                await self._index_call("upsert", vectors=vectors_to_upsert)
         
-        return len(chunks)
+        paper_vector = pool_paper_vector(
+            [vector["values"] for vector in vectors_to_upsert],
+            [chunk.section for chunk in indexed]
+        )
+        if paper_vector is not None:
+            self.paper_index.add(session_id, paper_vector)
+        self._current_sessions.add(session_id)
+        
+        print(f"🧹 Indexed {len(indexed)}/{len(chunks)} chunks "
+              f"({len(filtered.boilerplate)} boilerplate lines removed)")
+        return len(indexed)
     
-    async def query_document(
+    def _version_filter(self, session_filter) -> dict:
+        """Metadata filter for a session (or sessions) at the current index version"""
+        return {"session_id": session_filter, "index_version": self.index_version}
+    
+    def is_current(self, session_id: str) -> bool:
+        """Whether a session is known to be indexed with the current index version"""
+        return session_id in self._current_sessions
+    
+    async def ensure_current(self, session_id: str, priority: Priority = Priority.INTERACTIVE) -> bool:
+        """
+        Make sure a session is indexed with the current index version
+        
+        Sessions indexed with other splitter settings or another embedding
+        model are re-indexed first. Concurrent callers share one migration
+        unless it runs at a lower priority than theirs: an interactive caller
+        starts its own rather than queueing behind the background sweep, and
+        retries at its own priority when the shared migration fails.
+        
+        Args:
+            session_id: Session identifier
+            priority: Scheduling priority for embeddings of changed chunks
+            
+        Returns:
+            True if the session has (or now has) current vectors
+            
+        Raises:
+            IndexMigrationError: If re-indexing at the caller's priority failed
+        """
+        if session_id in self._current_sessions:
+            return True
+        shared = self._migrations.get(session_id)
+        if shared is not None and shared[1] <= priority:
+            try:
+                # A cancelled request must not abort a migration other requests wait on
+                return await asyncio.shield(shared[0])
+            except Exception as e:
+                print(f"Warning: Shared re-index of {session_id} failed, retrying: {str(e)}")
+        
+        migration = asyncio.create_task(self._migrate(session_id, priority))
+        self._migrations[session_id] = (migration, priority)
+        
+        def forget(task: asyncio.Task):
+            # A newer migration at a higher priority may have replaced this one
+            if self._migrations.get(session_id, (None,))[0] is task:
+                del self._migrations[session_id]
+        
+        migration.add_done_callback(forget)
+        try:
+            return await asyncio.shield(migration)
+        except Exception as e:
+            raise IndexMigrationError(f"Could not re-index session {session_id}: {str(e)}") from e
+    
+    async def _migrate(self, session_id: str, priority: Priority) -> bool:
+        """Re-index a session from its PDF (or stored text), reusing unchanged chunk embeddings"""
+        current = await self._query_index(
+            vector=[0.0] * settings.embedding_dimensions,
+            top_k=1,
+            filter=self._version_filter(session_id),
+            include_metadata=False
+        )
+        if current.matches:
+            self._current_sessions.add(session_id)
+            return True
+        
+        session = session_manager.get_session(session_id, touch=False)
+        if not session:
+            return False
+        
+        # Vectors of older versions: embeddings to reuse, then delete
+        previous = await self._query_index(
+            vector=[0.0] * settings.embedding_dimensions,
+            top_k=MAX_SESSION_CHUNKS,
+            filter={"session_id": session_id},
+            include_metadata=True,
+            include_values=True
+        )
+        if not previous.matches and priority == Priority.BACKGROUND:
+            # Never indexed here (e.g. restored after a restart with an in-memory
+            # index): embed on first access rather than every paper at startup
+            return False
+        cached_embeddings = {
+            text_key(match.metadata["text"]): match.values
+            for match in previous.matches
+            if match.metadata and "text" in match.metadata and match.values
+            and match.metadata.get("embedding_model") == self.embeddings.model
+        }
+        
+        pages = None
+        text = session.text
+        pdf_path = session_manager.get_pdf_path(session_id)
+        if pdf_path:
+            try:
+                parsed = await asyncio.to_thread(parse_pdf_cached, pdf_path, session.filename)
+                pages, text = parsed["pages"], parsed["text"]
+            except Exception as e:
+                print(f"Warning: Re-indexing {session_id} from stored text: {str(e)}")
+        
+        count = await self.index_document(
+            session_id,
+            text,
+            pages=pages,
+            shared_batches=priority == Priority.BACKGROUND,
+            cached_embeddings=cached_embeddings,
+            priority=priority
+        )
+        # A concurrent migration may already have written current vectors
+        stale = [
+            match.id for match in previous.matches
+            if (match.metadata or {}).get("index_version") != self.index_version
+        ]
+        if stale:
+            await self._index_call("delete", ids=stale)
+        if not session_manager.session_exists(session_id, touch=False):
+            # Deleted (e.g. evicted) while re-indexing
+            self.forget_sessions([session_id])
+            if self.pc:
+                await asyncio.to_thread(self.delete_index_vectors, [session_id])
+            else:
+                self.delete_index_vectors([session_id])
+            return False
+        print(f"🔁 Re-indexed session {session_id} to index version {self.index_version} "
+              f"({count} chunks, {len(cached_embeddings)} embeddings reused)")
+        return True
+    
+    def get_unindexed_chunks(self, session_id: str, tier: Optional[str] = None) -> List[Chunk]:
+        """
+        Get chunks that were kept out of the vector index
+        
+        Args:
+            session_id: Session identifier
+            tier: Only return chunks of this tier (e.g. "references")
+            
+        Returns:
+            List of chunks in document order
+        """
+        chunks = self._unindexed_chunks.get(session_id, [])
+        return [chunk for chunk in chunks if tier is None or chunk.tier == tier]
+    
+    async def retrieve_chunks(
         self,
         session_id: str,
         question: str,
-        top_k: int = 3
-    ) -> Tuple[str, List[str]]:
+        top_k: Optional[int] = None
+    ) -> Tuple[List[Tuple[int, str]], List[str]]:
         """
-        Query the document using semantic search
+        Retrieve chunks for a question using semantic search with MMR re-ranking
+        
+        Over-fetches candidates and selects a diverse subset that fits the
+        retrieval token budget.
         
         Args:
             session_id: Session identifier to filter vectors
             question: User's question
-            top_k: Number of top chunks to retrieve
+            top_k: Maximum number of chunks to use (defaults to retrieval_max_k)
             
         Returns:
-            Tuple of (combined context, list of source chunks)
+            Tuple of ((chunk index, text) pairs most relevant first,
+            bibliography entries cited in the question)
+        """
+        # Generate embedding for the question
+        question_embedding = await self._embed(question, Priority.INTERACTIVE)
+        results = await self._retrieve_embedded(session_id, [question], [question_embedding], top_k)
+        return results[0]
+    
+    async def retrieve_batch(
+        self,
+        session_id: str,
+        questions: List[str],
+        top_k: Optional[int] = None,
+        priority: Priority = Priority.DEFAULT
+    ) -> List[Tuple[List[Tuple[int, str]], List[str]]]:
+        """
+        Retrieve chunks for several questions about the same document
+        
+        All questions are embedded in one batched request and their vector
+        queries run concurrently; chunks retrieved by several questions are
+        fetched and token-counted once.
+        
+        Args:
+            session_id: Session identifier to filter vectors
+            questions: User's questions
+            top_k: Maximum number of chunks per question (defaults to retrieval_max_k)
+            priority: Scheduling priority for the embedding request
+            
+        Returns:
+            retrieve_chunks results, one per question in input order
         """
-        # Check if question is about metadata (title, author, abstract)
-        metadata_keywords = ['title', 'author', 'abstract', 'introduction', 'name']
-        question_lower = question.lower()
-        is_metadata_question = any(keyword in question_lower for keyword in metadata_keywords)
-        
-        context_chunks = []
-        sources = []
-        chunk_indices_seen = set()
-        
-        # If asking about metadata, include first few chunks
-        if is_metadata_question:
-            # Fetch first 3 chunks by chunk_index
-            for chunk_idx in range(3):
-                results = self.index.query(
-                    vector=[0.0] * 1536,  # Dummy vector
-                    top_k=10,
-                    filter={
-                        "session_id": session_id,
-                        "chunk_index": chunk_idx
-                    },
-                    include_metadata=True
+        if not questions:
+            return []
+        embeddings = await self._embed_many(questions, priority)
+        return await self._retrieve_embedded(session_id, questions, embeddings, top_k)
+    
+    async def _retrieve_embedded(
+        self,
+        session_id: str,
+        questions: List[str],
+        embeddings: List[List[float]],
+        top_k: Optional[int] = None
+    ) -> List[Tuple[List[Tuple[int, str]], List[str]]]:
+        """Query, re-rank and select chunks for already embedded questions"""
+        max_k = top_k or settings.retrieval_max_k
+        if not await self.ensure_current(session_id):
+            raise IndexMigrationError(
+                f"Session {session_id} has no vectors for index version {self.index_version}"
+            )
+        
+        # Over-fetch candidates with their vectors for re-ranking
+        all_results = await asyncio.gather(*(
+            self._query_index(
+                vector=embedding,
+                top_k=max(settings.retrieval_fetch_k, max_k),
+                filter=self._version_filter(session_id),
+                include_metadata=True,
+                include_values=True
+            )
+            for embedding in embeddings
+        ))
+        
+        # Shared across questions: the opening chunks and token counts per chunk
+        opening: Optional[List[Tuple[int, str]]] = None
+        token_counts: Dict[int, int] = {}
+        
+        def tokens_of(index: int, text: str) -> int:
+            if index not in token_counts:
+                token_counts[index] = count_tokens(text)
+            return token_counts[index]
+        
+        retrieved = []
+        for question, question_embedding, results in zip(questions, embeddings, all_results):
+            token_budget = settings.retrieval_context_tokens
+            chunks: List[Tuple[int, str]] = []
+            citations: List[str] = []
+            
+            # Check if question is about metadata (title, author, abstract)
+            metadata_keywords = ['title', 'author', 'abstract', 'introduction', 'name']
+            question_lower = question.lower()
+            is_metadata_question = any(keyword in question_lower for keyword in metadata_keywords)
+            
+            # If asking about metadata, include the first 3 chunks
+            if is_metadata_question:
+                if opening is None:
+                    opening = await self.get_chunks(session_id, [0, 1, 2])
+                chunks = list(opening)
+                token_budget -= sum(tokens_of(index, text) for index, text in chunks)
+            
+            # Cited references ("what is [12]?") come from the unindexed bibliography
+            citation_numbers = re.findall(r"\[(\d{1,3})\]", question)
+            if citation_numbers and session_id in self._references:
+                citations = find_citations(self._references[session_id], citation_numbers)
+            
+            seen = {index for index, _ in chunks}
+            candidates = [
+                match for match in results.matches
+                if match.metadata and "text" in match.metadata
+                and match.metadata.get("chunk_index", -1) not in seen
+                and match.values
+            ]
+            
+            with observe_stage("rerank"):
+                selected = mmr_select(
+                    question_embedding,
+                    [match.values for match in candidates],
+                    [tokens_of(match.metadata.get("chunk_index", -1), match.metadata["text"])
+                     for match in candidates],
+                    token_budget=max(token_budget, 0),
+                    max_k=max(max_k - len(chunks), 0),
+                    lambda_mult=settings.mmr_lambda,
+                    relative_floor=settings.retrieval_relative_floor,
+                    min_k=max(settings.retrieval_min_k - len(chunks), 0)
                 )
-                
-                if results.matches:
-                    match = results.matches[0]
-                    if match.metadata and "text" in match.metadata:
-                        chunk_text = match.metadata["text"]
-                        context_chunks.append(chunk_text)
-                        sources.append(f"Chunk {chunk_idx}")
-                        chunk_indices_seen.add(chunk_idx)
+            chunks += [
+                (candidates[i].metadata.get("chunk_index", -1), candidates[i].metadata["text"])
+                for i in selected
+            ]
+            retrieved.append((chunks, citations))
+        return retrieved
+    
+    async def retrieve_library(
+        self,
+        question: str,
+        session_ids: Optional[List[str]] = None,
+        top_papers: Optional[int] = None,
+        top_k: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Retrieve chunks for a question across many papers
         
-        # Generate embedding for the question
-        question_embedding = await self.embeddings.aembed_query(question)
+        Two stages: the paper-level index shortlists the most similar papers,
+        then chunks are searched (and MMR re-ranked) within the shortlist only,
+        so the chunk search does not grow with the size of the library.
+        
+        Args:
+            question: User's question
+            session_ids: Papers to search (defaults to every indexed paper)
+            top_papers: Papers to shortlist (defaults to library_shortlist_papers)
+            top_k: Maximum number of chunks (defaults to retrieval_max_k)
+            
+        Returns:
+            Chunks most relevant first, as dicts with session_id, chunk_index,
+            page (or None), section and text
+        """
+        max_k = top_k or settings.retrieval_max_k
+        question_embedding = await self._embed(question, Priority.INTERACTIVE)
         
-        # Query Pinecone with semantic search
-        results = self.index.query(
+        with observe_stage("paper_shortlist"):
+            shortlist = self.paper_index.search(
+                question_embedding,
+                top_papers or settings.library_shortlist_papers,
+                allowed=set(session_ids) if session_ids is not None else None
+            )
+        if not shortlist:
+            return []
+        
+        results = await self._query_index(
             vector=question_embedding,
-            top_k=top_k,
-            filter={"session_id": session_id},
+            top_k=max(settings.retrieval_fetch_k, max_k),
+            filter=self._version_filter({"$in": [paper_id for paper_id, _ in shortlist]}),
+            include_metadata=True,
+            include_values=True
+        )
+        candidates = [
+            match for match in results.matches
+            if match.metadata and "text" in match.metadata and match.values
+        ]
+        
+        with observe_stage("rerank"):
+            selected = mmr_select(
+                question_embedding,
+                [match.values for match in candidates],
+                [count_tokens(match.metadata["text"]) for match in candidates],
+                token_budget=settings.retrieval_context_tokens,
+                max_k=max_k,
+                lambda_mult=settings.mmr_lambda,
+                relative_floor=settings.retrieval_relative_floor,
+                min_k=settings.retrieval_min_k
+            )
+        return [
+            {
+                "session_id": candidates[i].metadata["session_id"],
+                "chunk_index": candidates[i].metadata.get("chunk_index", -1),
+                "page": candidates[i].metadata.get("page"),
+                "section": candidates[i].metadata.get("section"),
+                "text": candidates[i].metadata["text"],
+            }
+            for i in selected
+        ]
+    
+    def related_papers(
+        self,
+        session_id: str,
+        limit: int = 5,
+        session_ids: Optional[List[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Papers most similar to a session's paper, from stored paper vectors only
+        
+        Args:
+            session_id: Session identifier
+            limit: Number of papers to return
+            session_ids: Papers that may be returned (defaults to every indexed paper)
+            
+        Returns:
+            (session id, cosine similarity) pairs, most similar first; empty
+            if the session has no paper vector
+        """
+        vector = self.paper_index.get(session_id)
+        if vector is None:
+            return []
+        return self.paper_index.search(
+            vector,
+            limit,
+            allowed=set(session_ids) if session_ids is not None else None,
+            exclude=[session_id]
+        )
+    
+    async def get_chunks(self, session_id: str, chunk_indices: List[int]) -> List[Tuple[int, str]]:
+        """
+        Fetch indexed chunks by chunk index, without embedding anything
+        
+        Args:
+            session_id: Session identifier
+            chunk_indices: Chunk indices to fetch
+            
+        Returns:
+            (chunk index, text) pairs in the order requested
+        """
+        if not chunk_indices:
+            return []
+        results = await self._query_index(
+            vector=[0.0] * settings.embedding_dimensions,  # Dummy vector
+            top_k=len(chunk_indices),
+            filter={
+                **self._version_filter(session_id),
+                "chunk_index": {"$in": list(chunk_indices)}
+            },
             include_metadata=True
         )
+        texts = {
+            match.metadata["chunk_index"]: match.metadata["text"]
+            for match in results.matches
+            if match.metadata and "text" in match.metadata
+        }
+        return [(index, texts[index]) for index in chunk_indices if index in texts]
+    
+    def format_context(
+        self,
+        chunks: List[Tuple[int, str]],
+        citations: Optional[List[str]] = None
+    ) -> Tuple[str, List[str]]:
+        """
+        Merge chunks with adjacent indices into passages and build the context
         
-        # Add semantic search results (avoid duplicates)
-        for match in results.matches:
-            if match.metadata and "text" in match.metadata:
-                chunk_idx = match.metadata.get('chunk_index', -1)
-                if chunk_idx not in chunk_indices_seen:
-                    chunk_text = match.metadata["text"]
-                    context_chunks.append(chunk_text)
-                    sources.append(f"Chunk {chunk_idx}")
-                    chunk_indices_seen.add(chunk_idx)
+        Args:
+            chunks: (chunk index, text) pairs, most relevant first
+            citations: Bibliography entries to put first
+            
+        Returns:
+            Tuple of (combined context, list of source chunks)
+        """
+        passages = merge_adjacent(chunks, max_overlap=settings.chunk_overlap * 2)
+        citations = citations or []
+        context_chunks = citations + [text for _, _, text in passages]
+        sources = ["References"] * len(citations) + [
+            f"Chunk {first}" if first == last else f"Chunks {first}-{last}"
+            for first, last, _ in passages
+        ]
+        return "\n\n".join(context_chunks), sources
+    
+    async def query_document(
+        self,
+        session_id: str,
+        question: str,
+        top_k: Optional[int] = None
+    ) -> Tuple[str, List[str]]:
+        """
+        Query the document using semantic search
         
-        # Combine chunks into context
-        context = "\n\n".join(context_chunks)
+        Chunks are selected by retrieve_chunks and chunks with adjacent
+        indices are merged into contiguous passages.
         
-        return context, sources
+        Args:
+            session_id: Session identifier to filter vectors
+            question: User's question
+            top_k: Maximum number of chunks to use (defaults to retrieval_max_k)
+            
+        Returns:
+            Tuple of (combined context, list of source chunks)
+        """
+        chunks, citations = await self.retrieve_chunks(session_id, question, top_k)
+        return self.format_context(chunks, citations)
     
     def delete_session_vectors(self, session_id: str):
         """
@@ -176,11 +762,64 @@ class RAGService:
         Args:
             session_id: Session identifier
         """
-        # Delete by filter (if supported) or by IDs
-        try:
-            self.index.delete(filter={"session_id": session_id})
-        except Exception as e:
-            print(f"Warning: Could not delete vectors for session {session_id}: {str(e)}")
+        self.delete_sessions_vectors([session_id])
+    
+    def delete_sessions_vectors(self, session_ids: List[str]):
+        """
+        Delete all vectors of several sessions, DELETE_BATCH_SESSIONS per request
+        
+        Args:
+            session_ids: Session identifiers
+        """
+        self.forget_sessions(session_ids)
+        self.delete_index_vectors(session_ids)
+    
+    def forget_sessions(self, session_ids: List[str]):
+        """
+        Drop the in-memory state of sessions (unindexed chunks, references,
+        index version and paper vector)
+        
+        Not thread-safe: call it on the event loop, where searches run.
+        
+        Args:
+            session_ids: Session identifiers
+        """
+        for session_id in session_ids:
+            self._unindexed_chunks.pop(session_id, None)
+            self._references.pop(session_id, None)
+            self._current_sessions.discard(session_id)
+            self.paper_index.remove(session_id)
+    
+    def delete_index_vectors(self, session_ids: List[str]):
+        """
+        Delete the chunk vectors of sessions from the vector index
+        
+        Only touches the index client, so it can run in a worker thread.
+        
+        Args:
+            session_ids: Session identifiers
+        """
+        for start in range(0, len(session_ids), DELETE_BATCH_SESSIONS):
+            batch = session_ids[start:start + DELETE_BATCH_SESSIONS]
+            # Delete by filter (if supported) or by IDs
+            try:
+                self.index.delete(filter={"session_id": {"$in": batch}})
+            except Exception as e:
+                try:
+                    self._delete_by_prefix(batch)
+                except Exception as fallback_error:
+                    print(f"Warning: Could not delete vectors for {len(batch)} sessions: "
+                          f"{str(e)}; {str(fallback_error)}")
+    
+    def _delete_by_prefix(self, session_ids: List[str]):
+        """Delete vectors by id for indexes without delete-by-metadata (Pinecone serverless)"""
+        ids = []
+        for session_id in session_ids:
+            # Vector ids start with the session id (see index_document)
+            for page in self.index.list(prefix=f"{session_id}_"):
+                ids.extend(page)
+        for start in range(0, len(ids), 1000):
+            self.index.delete(ids=ids[start:start + 1000])
 
 
 # Global RAG service instance
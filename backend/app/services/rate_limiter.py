@@ -0,0 +1,365 @@
+from enum import IntEnum
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from app.config import settings
+from app.services.metrics import RATE_LIMIT_QUEUE_DEPTH, RATE_LIMIT_WAIT_SECONDS
+import openai
+import asyncio
+import heapq
+import inspect
+import itertools
+import random
+import time
+
+
+class Priority(IntEnum):
+    """Scheduling priority for queued OpenAI calls (lower runs first)"""
+    INTERACTIVE = 0
+    DEFAULT = 1
+    BACKGROUND = 2
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call is still rate limited after all retries"""
+
+
+class TokenBucket:
+    """Continuously refilling token bucket"""
+
+    def __init__(self, capacity: float, per_minute: float):
+        self.capacity = capacity
+        self.per_minute = per_minute
+        self.available = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, rate_factor: float):
+        now = time.monotonic()
+        self.available = min(
+            self.capacity,
+            self.available + (now - self._updated) * self.per_minute * rate_factor / 60
+        )
+        self._updated = now
+
+    def wait_time(self, amount: float, rate_factor: float = 1.0) -> float:
+        """Seconds until `amount` can be consumed (0 if available now)"""
+        self._refill(rate_factor)
+        # Requests larger than the bucket only wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) * 60 / (self.per_minute * rate_factor)
+
+    def consume(self, amount: float):
+        self.available -= min(amount, self.capacity)
+
+    def refund(self, amount: float):
+        self.available = min(self.capacity, self.available + amount)
+
+
+class ModelLimiter:
+    """
+    Requests/min, tokens/min and concurrency limits for a single model
+
+    Waiters are admitted strictly by priority, then arrival order. The
+    effective rate backs off multiplicatively on 429 responses and recovers
+    additively on successes.
+    """
+
+    MIN_RATE_FACTOR = 0.1
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int,
+                 model: str = "default"):
+        self.model = model
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.rate_factor = 1.0
+        self.active = 0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {
+            "calls": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future, _ in self._waiters if not future.done())
+
+    async def acquire(self, tokens: int, priority: Priority) -> float:
+        """
+        Wait for a concurrency slot and rate budget
+
+        Args:
+            tokens: Estimated tokens (prompt + completion) for the call
+            priority: Scheduling priority
+
+        Returns:
+            Seconds spent waiting
+        """
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), future, tokens))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just before cancellation; give the slot back
+                self.release()
+            raise
+
+        waited = time.monotonic() - start
+        self.stats["calls"] += 1
+        self.stats["wait_seconds_total"] += waited
+        self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], waited)
+        RATE_LIMIT_WAIT_SECONDS.labels(self.model, priority.name.lower()).observe(waited)
+        return waited
+
+    def release(self, unused_tokens: int = 0):
+        """Free a concurrency slot and refund over-estimated tokens"""
+        self.active -= 1
+        if unused_tokens > 0:
+            self.tokens.refund(unused_tokens)
+        elif unused_tokens < 0:
+            self.tokens.consume(-unused_tokens)
+        self._dispatch()
+
+    def on_rate_limited(self):
+        self.stats["rate_limited"] += 1
+        self.rate_factor = max(self.MIN_RATE_FACTOR, self.rate_factor / 2)
+
+    def on_success(self):
+        self.rate_factor = min(1.0, self.rate_factor + 0.05)
+
+    def _dispatch(self):
+        """Admit waiters in priority order while slots and budget allow"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters and self.active < self.max_concurrency:
+            _, _, future, tokens = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = max(
+                self.requests.wait_time(1, self.rate_factor),
+                self.tokens.wait_time(tokens, self.rate_factor)
+            )
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self.active += 1
+            future.set_result(None)
+
+    def get_stats(self) -> dict:
+        calls = self.stats["calls"]
+        return {
+            **self.stats,
+            "queue_depth": self.queue_depth,
+            "active": self.active,
+            "rate_factor": round(self.rate_factor, 3),
+            "wait_seconds_avg": self.stats["wait_seconds_total"] / calls if calls else 0.0,
+        }
+
+
+class RateLimiter:
+    """Shared per-model limiter with jittered exponential retry for OpenAI calls"""
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        model_limits: Optional[Dict[str, Dict[str, int]]] = None
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.model_limits = model_limits or {}
+        self._limiters: Dict[str, ModelLimiter] = {}
+
+    def for_model(self, model: str) -> ModelLimiter:
+        """Get (or create) the limiter for a model"""
+        if model not in self._limiters:
+            limits = self.model_limits.get(model, {})
+            limiter = ModelLimiter(
+                requests_per_minute=limits.get("rpm", self.requests_per_minute),
+                tokens_per_minute=limits.get("tpm", self.tokens_per_minute),
+                max_concurrency=limits.get("concurrency", self.max_concurrency),
+                model=model
+            )
+            # Read at scrape time, so cancelled waiters never leave a stale value
+            RATE_LIMIT_QUEUE_DEPTH.labels(model).set_function(lambda: limiter.queue_depth)
+            self._limiters[model] = limiter
+        return self._limiters[model]
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when given"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.max_delay, float(retry_after)) + random.uniform(0, self.base_delay)
+            except ValueError:
+                pass
+        return random.uniform(delay / 2, delay)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+        status = getattr(error, "status_code", None)
+        return status == 429 or (status is not None and status >= 500)
+
+    def _handle_error(self, limiter: ModelLimiter, model: str, error: Exception, attempt: int) -> float:
+        """
+        Record a failed attempt and decide whether to retry
+
+        Returns:
+            Seconds to wait before the next attempt
+
+        Raises:
+            The original error (or RateLimitExceeded) when not retrying
+        """
+        rate_limited = isinstance(error, openai.RateLimitError) or getattr(error, "status_code", None) == 429
+        if rate_limited:
+            limiter.on_rate_limited()
+        if not self._is_retryable(error) or attempt == self.max_retries:
+            limiter.stats["failures"] += 1
+            if rate_limited:
+                raise RateLimitExceeded(
+                    f"Rate limited by OpenAI after {attempt + 1} attempts: {error}"
+                ) from error
+            raise error
+        limiter.stats["retries"] += 1
+        delay = self._retry_delay(attempt, error)
+        print(f"⏳ Retrying {model} call in {delay:.1f}s (attempt {attempt + 1}): {error}")
+        return delay
+
+    async def call(
+        self,
+        model: str,
+        fn: Callable[[], Awaitable[Any]],
+        tokens: int,
+        priority: Priority = Priority.DEFAULT
+    ) -> Any:
+        """
+        Run an OpenAI call under the model's limits, retrying transient errors
+
+        Args:
+            model: Model the call is made against
+            fn: Zero-argument coroutine factory performing the call
+            tokens: Estimated tokens (prompt + completion) for the call
+            priority: Scheduling priority
+
+        Returns:
+            Result of fn()
+
+        Raises:
+            RateLimitExceeded: If still rate limited after all retries
+        """
+        limiter = self.for_model(model)
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire(tokens, priority)
+            unused_tokens = 0
+            try:
+                result = await fn()
+                usage = getattr(result, "usage", None)
+                if usage is not None and getattr(usage, "total_tokens", None):
+                    unused_tokens = tokens - usage.total_tokens
+                limiter.on_success()
+                return result
+            except Exception as e:
+                delay = self._handle_error(limiter, model, e, attempt)
+            finally:
+                limiter.release(unused_tokens)
+            await asyncio.sleep(delay)
+
+    async def stream(
+        self,
+        model: str,
+        fn: Callable[[], Awaitable[AsyncIterator[Any]]],
+        tokens: int,
+        priority: Priority = Priority.DEFAULT,
+        completion_tokens: int = 0
+    ) -> AsyncIterator[Any]:
+        """
+        Open a streaming call under the model's limits and yield its items
+
+        Opening the stream is retried like `call`; the concurrency slot is held
+        until the stream is exhausted or closed. Closing early also closes the
+        underlying stream. Over-estimated tokens are refunded from the usage
+        item when one arrives, otherwise from the completion tokens that were
+        reserved but never streamed (about one per item).
+
+        Args:
+            model: Model the call is made against
+            fn: Zero-argument coroutine factory returning an async iterator
+            tokens: Estimated tokens (prompt + completion) for the call
+            priority: Scheduling priority
+            completion_tokens: Part of tokens reserved for the completion
+
+        Yields:
+            Items from the stream
+        """
+        limiter = self.for_model(model)
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire(tokens, priority)
+            try:
+                stream = await fn()
+            except Exception as e:
+                limiter.release()
+                delay = self._handle_error(limiter, model, e, attempt)
+                await asyncio.sleep(delay)
+                continue
+
+            streamed = 0
+            unused_tokens = None
+            try:
+                async for item in stream:
+                    usage = getattr(item, "usage", None)
+                    if usage is not None and getattr(usage, "total_tokens", None):
+                        unused_tokens = tokens - usage.total_tokens
+                    streamed += 1
+                    yield item
+                limiter.on_success()
+            finally:
+                if unused_tokens is None:
+                    unused_tokens = max(0, completion_tokens - streamed)
+                limiter.release(unused_tokens)
+                close = getattr(stream, "aclose", None) or getattr(stream, "close", None)
+                if close is not None:
+                    closed = close()
+                    if inspect.isawaitable(closed):
+                        await closed
+            return
+
+    def get_stats(self) -> dict:
+        """Queue depth, wait time and retry counters per model"""
+        return {model: limiter.get_stats() for model, limiter in self._limiters.items()}
+
+
+# Global rate limiter instance shared by all OpenAI calls
+rate_limiter = RateLimiter(
+    requests_per_minute=settings.openai_requests_per_minute,
+    tokens_per_minute=settings.openai_tokens_per_minute,
+    max_concurrency=settings.openai_max_concurrency,
+    max_retries=settings.openai_max_retries,
+    model_limits=settings.openai_model_rate_limits
+)
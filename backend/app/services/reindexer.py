@@ -0,0 +1,62 @@
+from typing import Optional
+from app.config import settings
+from app.services.rag_service import rag_service
+from app.services.rate_limiter import Priority
+from app.services.session_manager import session_manager
+import asyncio
+
+
+class Reindexer:
+    """
+    Background sweep migrating sessions to the current index version
+
+    Sessions are otherwise migrated on first access; the sweep walks all
+    sessions in small batches with pauses in between, at background priority,
+    so a settings change does not flood the embeddings API.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"checked": 0, "failed": 0}
+
+    def start(self):
+        """Start the sweep if enabled and not already running"""
+        if settings.reindex_interval_seconds <= 0 or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self.run())
+
+    async def run(self):
+        """Check every session once, reindex_batch_size at a time"""
+        session_ids = [
+            session_id for session_id in session_manager.session_ids()
+            if not rag_service.is_current(session_id)
+        ]
+        batch_size = max(1, settings.reindex_batch_size)
+        for start in range(0, len(session_ids), batch_size):
+            batch = session_ids[start:start + batch_size]
+            results = await asyncio.gather(
+                *(rag_service.ensure_current(session_id, Priority.BACKGROUND) for session_id in batch),
+                return_exceptions=True
+            )
+            for result in results:
+                self.stats["checked"] += 1
+                if isinstance(result, Exception):
+                    print(f"⚠️  Re-indexing failed (retried on next access): {result}")
+                    self.stats["failed"] += 1
+            if start + batch_size < len(session_ids):
+                await asyncio.sleep(settings.reindex_interval_seconds)
+        if session_ids:
+            print(f"🔁 Index version {rag_service.index_version}: checked {len(session_ids)} sessions "
+                  f"({self.stats['failed']} failed)")
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+# Global re-indexer instance
+reindexer = Reindexer()
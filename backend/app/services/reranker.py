@@ -0,0 +1,132 @@
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+
+def _rescale(values: np.ndarray) -> np.ndarray:
+    """Min-max rescale to [0, 1]; constant input maps to zeros"""
+    low, high = float(values.min()), float(values.max())
+    if high - low < 1e-12:
+        return np.zeros_like(values)
+    return (values - low) / (high - low)
+
+
+def mmr_select(
+    query_vector: Sequence[float],
+    vectors: Sequence[Sequence[float]],
+    token_counts: Sequence[int],
+    token_budget: int,
+    max_k: int,
+    lambda_mult: float = 0.7,
+    relative_floor: float = 0.5,
+    min_k: int = 3
+) -> List[int]:
+    """
+    Pick candidates by maximal marginal relevance under a token budget
+
+    Each step takes the candidate maximizing
+    lambda * sim(query, c) - (1 - lambda) * max sim(c, already selected),
+    skipping candidates that no longer fit the budget. Selection stops at
+    max_k or when nothing fits. After min_k picks, candidates in the lower
+    relative_floor part of the candidates' relevance range are no longer
+    considered, so k adapts to how many chunks are actually relevant.
+    (Measured on the range rather than as a fraction of the best score:
+    embedding cosines of one paper's chunks are all of similar size.)
+
+    Args:
+        query_vector: Query embedding
+        vectors: Candidate embeddings
+        token_counts: Tokens of each candidate's text
+        token_budget: Maximum total tokens of selected candidates
+        max_k: Maximum number of candidates to select
+        lambda_mult: Relevance/diversity trade-off (1 = relevance only)
+        relative_floor: Minimum relevance on the min-max scale of the
+            candidates' relevance (0 = least, 1 = most relevant candidate)
+        min_k: Picks made regardless of relative_floor
+
+    Returns:
+        Indices into vectors, in selection order
+    """
+    if not len(vectors):
+        return []
+    # Copies, so the caller's arrays are not normalized in place
+    matrix = np.array(vectors, dtype=np.float32)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    query = np.array(query_vector, dtype=np.float32)
+    query /= max(float(np.linalg.norm(query)), 1e-12)
+
+    relevance = matrix @ query
+    similarity = matrix @ matrix.T
+    low, best = float(relevance.min()), float(relevance.max())
+    floor = low + relative_floor * (best - low) if best - low > 1e-6 else -np.inf
+    tokens = np.asarray(token_counts)
+
+    # Chunks of one paper are all fairly similar to each other and only mildly
+    # similar to a short question, so both terms are rescaled to [0, 1] over
+    # the candidate set before they are traded off
+    gain = _rescale(relevance)
+    overlap = _rescale(similarity)
+
+    available = np.ones(len(matrix), dtype=bool)
+    redundancy = np.zeros(len(matrix), dtype=np.float32)
+    selected: List[int] = []
+    used = 0
+    while len(selected) < max_k:
+        available &= tokens <= token_budget - used
+        if len(selected) >= min_k:
+            available &= relevance >= floor
+        if not available.any():
+            break
+        scores = np.where(available, lambda_mult * gain - (1 - lambda_mult) * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        selected.append(best)
+        used += int(tokens[best])
+        available[best] = False
+        redundancy = np.maximum(redundancy, overlap[best])
+    return selected
+
+
+def _strip_overlap(previous: str, following: str, max_overlap: int) -> str:
+    """Drop the start of `following` that repeats the end of `previous`"""
+    for size in range(min(max_overlap, len(previous), len(following)), 0, -1):
+        if previous.endswith(following[:size]):
+            return following[size:]
+    return following
+
+
+def merge_adjacent(
+    chunks: Sequence[Tuple[int, str]],
+    max_overlap: int = 400
+) -> List[Tuple[int, int, str]]:
+    """
+    Merge chunks with consecutive indices into contiguous passages
+
+    Passages keep the order of their earliest chunk in the input, so callers
+    can pass chunks most-relevant first.
+
+    Args:
+        chunks: (chunk index, text) pairs
+        max_overlap: Longest repeated text to remove between neighbours
+
+    Returns:
+        List of (first chunk index, last chunk index, passage text)
+    """
+    rank = {}
+    for position, (index, _) in enumerate(chunks):
+        rank.setdefault(index, position)
+    texts = dict(chunks)
+
+    passages: List[Tuple[int, int, str]] = []
+    current: Optional[List] = None
+    for index in sorted(texts):
+        if current and index == current[1] + 1:
+            current[1] = index
+            current[2] += " " + _strip_overlap(current[2], texts[index], max_overlap).lstrip()
+        else:
+            if current:
+                passages.append(tuple(current))
+            current = [index, index, texts[index]]
+    if current:
+        passages.append(tuple(current))
+
+    passages.sort(key=lambda passage: min(rank[i] for i in range(passage[0], passage[1] + 1)))
+    return passages
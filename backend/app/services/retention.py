@@ -0,0 +1,202 @@
+from typing import List, Optional
+from app.config import settings
+from app.services.batch_ingestor import batch_ingestor
+from app.services.conversation import conversation_manager
+from app.services.rag_service import rag_service
+from app.services.parse_cache import PARSED_SUFFIX
+from app.services.session_manager import session_manager, UPLOAD_DIR, PARTIAL_SUFFIX
+import asyncio
+import os
+import shutil
+import time
+
+# Sessions used this recently are never evicted, so in-flight uploads and
+# answers are not cut off (the limits may be exceeded by this window's sessions)
+RECENT_ACCESS_GRACE_SECONDS = 60
+# Interrupted writes, staged uploads and unused cache entries are removed after this long
+ORPHAN_GRACE_SECONDS = 600
+
+
+async def delete_sessions(session_ids: List[str]) -> int:
+    """
+    Delete sessions with everything stored for them
+
+    Removes the session record (text and PDF file), conversation threads,
+    cached chunks, the paper vector and the chunk vectors, the latter in
+    batched deletes.
+
+    Args:
+        session_ids: Session identifiers
+
+    Returns:
+        Number of sessions that existed
+    """
+    deleted = []
+    for session_id in session_ids:
+        conversation_manager.delete_session_threads(session_id)
+        if session_manager.delete_session(session_id):
+            deleted.append(session_id)
+    if session_ids:
+        # In-memory state on the event loop, where searches read it
+        rag_service.forget_sessions(list(session_ids))
+        if rag_service.pc:
+            await asyncio.to_thread(rag_service.delete_index_vectors, list(session_ids))
+        else:
+            rag_service.delete_index_vectors(list(session_ids))
+    return len(deleted)
+
+
+class RetentionSweeper:
+    """
+    Periodically evicts sessions beyond the retention limits
+
+    Each sweep evicts sessions idle for longer than session_ttl_seconds, then
+    the least recently used sessions until at most max_sessions remain and
+    their PDFs take at most max_upload_bytes. When any limit is set,
+    interrupted writes, staged uploads and cached parse results no session
+    refers to are removed as well. Stored PDFs are only ever deleted with
+    their session: a PDF without one (e.g. one a restart could not restore)
+    is kept, as it may be the only copy of a paper.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"sweeps": 0, "evicted": 0, "orphan_files": 0, "freed_bytes": 0}
+
+    def start(self):
+        """Start sweeping if enabled and not already running"""
+        if settings.retention_sweep_interval_seconds <= 0 or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"⚠️  Retention sweep failed: {e}")
+            await asyncio.sleep(settings.retention_sweep_interval_seconds)
+
+    def select_evictions(self, now: Optional[float] = None) -> List[str]:
+        """
+        Sessions to evict under the current limits
+
+        Args:
+            now: Current epoch time (defaults to time.time())
+
+        Returns:
+            Session IDs, least recently used first
+        """
+        now = time.time() if now is None else now
+        candidates = session_manager.least_recently_used()
+        evict = []
+        if settings.session_ttl_seconds > 0:
+            evict = [s for s in candidates if now - s.last_access > settings.session_ttl_seconds]
+            candidates = candidates[len(evict):]
+
+        count = len(candidates)
+        stored_bytes = sum(s.pdf_bytes for s in candidates)
+        for session in candidates:
+            over_count = 0 < settings.max_sessions < count
+            over_bytes = 0 < settings.max_upload_bytes < stored_bytes
+            if not (over_count or over_bytes) or now - session.last_access < RECENT_ACCESS_GRACE_SECONDS:
+                # Everything after this one was used more recently
+                break
+            evict.append(session)
+            count -= 1
+            stored_bytes -= session.pdf_bytes
+        return [session.session_id for session in evict]
+
+    async def sweep(self) -> dict:
+        """
+        Run one sweep
+
+        Returns:
+            {"evicted": sessions evicted, "orphan_files": files removed,
+             "freed_bytes": bytes of PDFs and files removed}
+        """
+        victims = self.select_evictions()
+        freed = 0
+        for session_id in victims:
+            session = session_manager.get_session(session_id, touch=False)
+            if session:
+                freed += session.pdf_bytes
+        evicted = await delete_sessions(victims)
+        orphans, orphan_bytes = 0, 0
+        if settings.session_ttl_seconds > 0 or settings.max_sessions > 0 or settings.max_upload_bytes > 0:
+            orphans, orphan_bytes = await asyncio.to_thread(self._remove_orphans)
+
+        result = {"evicted": evicted, "orphan_files": orphans, "freed_bytes": freed + orphan_bytes}
+        self.stats["sweeps"] += 1
+        for key, value in result.items():
+            self.stats[key] += value
+        if evicted or orphans:
+            print(f"🧹 Retention sweep: {evicted} sessions evicted, {orphans} orphaned files removed, "
+                  f"{result['freed_bytes'] / 2**20:.1f} MiB freed")
+        return result
+
+    @staticmethod
+    def _remove_orphans(upload_dir: str = UPLOAD_DIR) -> tuple:
+        """
+        Remove leftovers no session or job refers to: interrupted writes,
+        cached parse results, staged uploads and batch staging directories
+
+        Stored PDFs without a session are never removed here.
+
+        Returns:
+            (files and directories removed, bytes of files removed)
+        """
+        cutoff = time.time() - ORPHAN_GRACE_SECONDS
+        removed, freed = 0, 0
+        for entry in os.scandir(upload_dir):
+            try:
+                if not entry.is_file() or entry.stat().st_mtime >= cutoff:
+                    continue
+                # Writes interrupted by a crash
+                if entry.name.endswith(PARTIAL_SUFFIX):
+                    size = entry.stat().st_size
+                    os.remove(entry.path)
+                    removed, freed = removed + 1, freed + size
+            except OSError:
+                continue
+        parsed = os.path.join(upload_dir, "parsed")
+        if os.path.isdir(parsed):
+            # Cached parse results of PDFs no session holds any more
+            hashes = {session.content_hash for session in session_manager.least_recently_used()}
+            for entry in os.scandir(parsed):
+                try:
+                    if entry.name.endswith(PARSED_SUFFIX) and entry.name[:-len(PARSED_SUFFIX)] not in hashes \
+                            and entry.stat().st_mtime < cutoff:
+                        size = entry.stat().st_size
+                        os.remove(entry.path)
+                        removed, freed = removed + 1, freed + size
+                except OSError:
+                    continue
+        incoming = os.path.join(upload_dir, "incoming")
+        if os.path.isdir(incoming):
+            # Staged single uploads (files) and batch job staging directories
+            for entry in os.scandir(incoming):
+                job = batch_ingestor.get_job(entry.name)
+                try:
+                    if entry.stat().st_mtime >= cutoff or (job and not job.finished_at):
+                        continue
+                    if entry.is_dir():
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                    else:
+                        os.remove(entry.path)
+                    removed += 1
+                except OSError:
+                    continue
+        return removed, freed
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+# Global retention sweeper instance
+retention_sweeper = RetentionSweeper()
@@ -0,0 +1,183 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.services.metrics import TELEMETRY_EVENTS, observe_stage
+import asyncio
+import httpx
+import uuid
+
+
+class ScoreExporter:
+    """
+    In-process, non-blocking exporter for Langfuse scores
+
+    Scores are put on a bounded queue and sent in batches to the Langfuse
+    ingestion API by a background task, flushing when a batch is full or
+    the flush interval elapses. When the queue is full new scores are
+    dropped and counted instead of blocking the caller, so observability
+    never adds latency to the request path.
+    """
+
+    def __init__(
+        self,
+        host: Optional[str],
+        public_key: Optional[str],
+        secret_key: Optional[str],
+        batch_size: int = 50,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 1000,
+        timeout: float = 10.0
+    ):
+        self.enabled = bool(host and public_key and secret_key)
+        self.endpoint = f"{(host or '').rstrip('/')}/api/public/ingestion"
+        self.auth = (public_key or "", secret_key or "")
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.timeout = timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self.stats = {"queued": 0, "exported": 0, "dropped": 0, "failed": 0, "batches": 0}
+
+    def _ensure_worker(self):
+        """Start the background sender on the running event loop"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = asyncio.create_task(self._run())
+
+    def create_score(
+        self,
+        name: str,
+        value: float,
+        trace_id: str,
+        observation_id: Optional[str] = None,
+        comment: Optional[str] = None,
+        data_type: str = "NUMERIC"
+    ) -> bool:
+        """
+        Queue a score for export without waiting for the network
+
+        Args:
+            name: Score name (e.g. "overall_quality")
+            value: Score value
+            trace_id: Langfuse trace the score belongs to
+            observation_id: Observation within the trace (optional)
+            comment: Free-text comment (optional)
+            data_type: Langfuse score data type
+
+        Returns:
+            True if queued, False if exporting is disabled or the score was dropped
+        """
+        if not self.enabled:
+            return False
+        body: Dict[str, Any] = {
+            "id": str(uuid.uuid4()),
+            "traceId": trace_id,
+            "name": name,
+            "value": value,
+            "dataType": data_type,
+        }
+        if observation_id:
+            body["observationId"] = observation_id
+        if comment:
+            body["comment"] = comment
+        return self._enqueue({
+            "id": str(uuid.uuid4()),
+            "type": "score-create",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "body": body,
+        })
+
+    def _enqueue(self, event: dict) -> bool:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            TELEMETRY_EVENTS.labels("dropped").inc()
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    async def _run(self):
+        """Collect events into batches and send them until cancelled"""
+        loop = asyncio.get_running_loop()
+        if self._client is None:
+            # Building the client loads the TLS context (~0.2s), so not on the loop
+            self._client = await asyncio.to_thread(httpx.AsyncClient, timeout=self.timeout, auth=self.auth)
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._send(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _send(self, batch: List[dict]):
+        """
+        Send one batch to the ingestion API
+        Failures are counted and logged; the batch is not retried
+        """
+        try:
+            with observe_stage("langfuse_flush"):
+                response = await self._client.post(self.endpoint, json={"batch": batch})
+                response.raise_for_status()
+            self.stats["exported"] += len(batch)
+            self.stats["batches"] += 1
+            TELEMETRY_EVENTS.labels("exported").inc(len(batch))
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            TELEMETRY_EVENTS.labels("failed").inc(len(batch))
+            print(f"⚠️  Failed to export {len(batch)} Langfuse events: {e}")
+
+    async def shutdown(self, timeout: float = 10.0):
+        """
+        Send everything still queued, then stop the background sender
+
+        Args:
+            timeout: Seconds to wait for the queue to drain before dropping the rest
+        """
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            remaining = self._queue.qsize()
+            self.stats["dropped"] += remaining
+            TELEMETRY_EVENTS.labels("dropped").inc(remaining)
+            print(f"⚠️  Dropped {remaining} Langfuse events on shutdown")
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        if self._client is not None:
+            await self._client.aclose()
+        self._worker = None
+        self._client = None
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+        }
+
+
+# Global score exporter instance
+score_exporter = ScoreExporter(
+    host=settings.langfuse_host,
+    public_key=settings.langfuse_public_key,
+    secret_key=settings.langfuse_secret_key,
+    batch_size=settings.langfuse_export_batch_size,
+    flush_interval=settings.langfuse_export_interval_seconds,
+    max_queue_size=settings.langfuse_export_queue_size
+)
@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from app.utils.sections import detect_sections
+import re
+
+# Label for text before the first detected heading (title, authors, affiliations)
+FRONT_MATTER = "front matter"
+
+# Sections kept out of the main body tier
+TIER_BY_SECTION = {
+    "references": "references",
+    "appendix": "appendix",
+}
+
+# Section number right before a heading word ("3 ", "4.1 ", "III. ")
+_HEADING_NUMBER = re.compile(r"(?:\d{1,2}(?:\.\d{1,2})*\.?|[IVX]{1,4}\.)[ \t]+$")
+
+
+@dataclass
+class Chunk:
+    index: int
+    text: str
+    section: str
+    tier: str  # "body", "references" or "appendix"
+    page: Optional[int] = None  # 1-based page the chunk starts on, when known
+
+
+class SectionChunker:
+    """
+    Splits paper text into chunks that never cross a section boundary
+
+    Sections are detected with detect_sections; each section is split on
+    paragraph, line and sentence boundaries. Overlap only applies within a
+    section, and a short trailing piece is folded into the previous chunk
+    instead of becoming a chunk of its own.
+    """
+
+    def __init__(self, chunk_size: int = 1200, chunk_overlap: int = 100, min_chunk_size: int = 200):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.min_chunk_size = min_chunk_size
+        self.splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+            separators=["\n\n", "\n", ". ", " ", ""],
+            keep_separator="end"
+        )
+
+    def _split_sections(self, text: str, references_start: Optional[int] = None) -> List[tuple]:
+        """Split text into (label, section text) in document order"""
+        headings = []
+        for start, label in detect_sections(text):
+            # Keep a heading's number with its section, not the previous one
+            number = _HEADING_NUMBER.search(text[max(0, start - 12):start])
+            headings.append((start - len(number.group(0)) if number else start, label))
+        if references_start is not None and all(label != "references" for _, label in headings):
+            headings = sorted(headings + [(references_start, "references")])
+        boundaries = [(0, FRONT_MATTER)] + headings
+        sections = []
+        for i, (start, label) in enumerate(boundaries):
+            end = boundaries[i + 1][0] if i + 1 < len(boundaries) else len(text)
+            section_text = text[start:end].strip()
+            if section_text:
+                sections.append((label, section_text))
+        return sections
+
+    def _split_section(self, text: str) -> List[str]:
+        pieces = self.splitter.split_text(text)
+        if len(pieces) > 1 and len(pieces[-1]) < self.min_chunk_size:
+            # The pieces overlap, so take the merged chunk from the section text
+            start = -1
+            for piece in pieces[:-1]:
+                start = text.find(piece, start + 1)
+                if start < 0:
+                    return pieces
+            merged = text[start:].strip()
+            if len(merged) <= self.chunk_size + self.min_chunk_size:
+                pieces[-2:] = [merged]
+        return pieces
+
+    def split(self, text: str, references_start: Optional[int] = None) -> List[Chunk]:
+        """
+        Split paper text into section-labelled chunks
+
+        Args:
+            text: Full text of the paper
+            references_start: Offset of a bibliography found without a heading
+
+        Returns:
+            Chunks in document order; chunk indices are contiguous across tiers
+        """
+        chunks = []
+        tier = "body"
+        for label, section_text in self._split_sections(text, references_start):
+            # Unrecognised headings after references/appendix stay in that tier
+            tier = TIER_BY_SECTION.get(label, tier)
+            for piece in self._split_section(section_text):
+                chunks.append(Chunk(index=len(chunks), text=piece, section=label, tier=tier))
+        return chunks
@@ -1,22 +1,142 @@
+import asyncio
 import uuid
 import os
+import sys
+import time
+import zlib
 from datetime import datetime
-from typing import Dict, Optional
-from app.models.schemas import SessionData
+from io import BytesIO
+from typing import Any, BinaryIO, Dict, List, Optional
 
 # Upload directory for PDF files
 UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads")
+# Staging area for uploaded files waiting to be parsed (same filesystem as
+# UPLOAD_DIR, so accepted PDFs are moved rather than copied)
+INCOMING_DIR = os.path.join(UPLOAD_DIR, "incoming")
+
+MAX_PDF_BYTES = 100 * 1024 * 1024
+COPY_BUFFER_BYTES = 1024 * 1024
+# Suffix of files being written; they are renamed once complete
+PARTIAL_SUFFIX = ".part"
+
+
+def write_atomic(source: BinaryIO, path: str, limit: Optional[int] = None) -> Optional[int]:
+    """
+    Stream a file object to disk in fixed-size pieces, atomically
+    
+    Data goes to a temporary file next to path that is fsynced and then
+    renamed, so a crash mid-write never leaves a truncated file at path.
+    Blocking; call it in a thread from async code.
+    
+    Args:
+        source: Readable binary file object
+        path: Destination path
+        limit: Maximum number of bytes (optional)
+        
+    Returns:
+        Bytes written, or None (and nothing written) if more than limit bytes were read
+    """
+    temporary = f"{path}{PARTIAL_SUFFIX}"
+    written = 0
+    try:
+        with open(temporary, "wb") as f:
+            while True:
+                piece = source.read(COPY_BUFFER_BYTES)
+                if not piece:
+                    break
+                written += len(piece)
+                if limit is not None and written > limit:
+                    break
+                f.write(piece)
+            f.flush()
+            os.fsync(f.fileno())
+        if limit is not None and written > limit:
+            os.remove(temporary)
+            return None
+        os.replace(temporary, path)
+        return written
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+class SessionRecord:
+    """
+    Compact in-memory record of one paper session
+
+    The paper text is kept zlib-compressed (papers compress 3-4x) and only
+    decompressed when a handler reads it; its length is stored so listings
+    never touch it. Pydantic models are built from records only at the API
+    boundary. version is bumped whenever a field shown to users changes, so
+    responses can be validated with an ETag. last_access (epoch seconds) and
+    pdf_bytes drive the retention sweep.
+    """
+
+    __slots__ = (
+        "session_id", "filename", "pdf_path", "title", "authors", "year",
+        "summary", "storyline", "rating", "evaluations", "created_at",
+        "text_length", "_text", "version", "last_access", "pdf_bytes", "content_hash"
+    )
+
+    def __init__(self, session_id: str, filename: str, text: str,
+                 pdf_path: Optional[str] = None, created_at: Optional[datetime] = None,
+                 content_hash: Optional[str] = None):
+        self.session_id = session_id
+        self.filename = filename
+        self.pdf_path = pdf_path
+        self.title: Optional[str] = None
+        self.authors: Optional[str] = None
+        self.year: Optional[str] = None
+        self.summary: Optional[str] = None
+        self.storyline: Optional[str] = None
+        self.rating: Optional[str] = None
+        # Judge results keyed by "summary hash:prompt version:judge model"
+        self.evaluations: Dict[str, Dict[str, Any]] = {}
+        self.created_at = created_at or datetime.now()
+        self.version = 0
+        self.last_access = time.time()
+        self.pdf_bytes = os.path.getsize(pdf_path) if pdf_path and os.path.exists(pdf_path) else 0
+        # SHA-256 of the PDF, the key of its cached parse result
+        self.content_hash = content_hash
+        self.text = text
+
+    @property
+    def text(self) -> str:
+        return zlib.decompress(self._text).decode("utf-8")
+
+    @text.setter
+    def text(self, text: str):
+        self.text_length = len(text)
+        self._text = zlib.compress(text.encode("utf-8"))
+        self.version += 1
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by this record (shared interned strings excluded)"""
+        size = sys.getsizeof(self) + sys.getsizeof(self._text) + sys.getsizeof(self.evaluations)
+        for value in (self.session_id, self.filename, self.pdf_path, self.title,
+                      self.authors, self.summary, self.storyline):
+            if value is not None:
+                size += sys.getsizeof(value)
+        return size
 
 
 class SessionManager:
     """In-memory session manager for storing paper data"""
     
     def __init__(self):
-        self._sessions: Dict[str, SessionData] = {}
-        # Ensure upload directory exists
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        self._sessions: Dict[str, SessionRecord] = {}
+        # Ensure upload directories exist
+        os.makedirs(INCOMING_DIR, exist_ok=True)
     
-    def create_session(self, filename: str, text: str, pdf_content: Optional[bytes] = None) -> str:
+    def create_session(
+        self,
+        filename: str,
+        text: str,
+        pdf_content: Optional[bytes] = None,
+        pdf_file: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ) -> str:
         """
         Create a new session
         
@@ -24,6 +144,9 @@ class SessionManager:
             filename: Name of the uploaded PDF file
             text: Extracted text from the PDF
             pdf_content: Raw PDF file content (optional)
+            pdf_file: Path of a PDF already on disk, moved into the upload
+                directory instead of writing pdf_content (optional)
+            content_hash: SHA-256 of the PDF (optional)
             
         Returns:
             Generated session ID
@@ -32,19 +155,59 @@ class SessionManager:
         
         # Save PDF file if content provided
         pdf_path = None
-        if pdf_content:
+        if pdf_file:
+            pdf_path = os.path.join(UPLOAD_DIR, f"{session_id}.pdf")
+            os.replace(pdf_file, pdf_path)
+        elif pdf_content:
             pdf_path = self._save_pdf(session_id, pdf_content)
         
-        session_data = SessionData(
+        self._sessions[session_id] = SessionRecord(
             session_id=session_id,
             filename=filename,
             text=text,
             pdf_path=pdf_path,
-            created_at=datetime.now()
+            created_at=datetime.now(),
+            content_hash=content_hash
         )
-        self._sessions[session_id] = session_data
         return session_id
     
+    def restore_session(
+        self,
+        session_id: str,
+        filename: str,
+        text: str,
+        pdf_path: str,
+        created_at: datetime,
+        content_hash: Optional[str] = None,
+        metadata: Optional[dict] = None
+    ):
+        """
+        Recreate a session for a stored PDF (e.g. after a restart)
+        
+        Args:
+            session_id: Identifier the PDF is stored under
+            filename: Original filename
+            text: Extracted text
+            pdf_path: Path of the stored PDF
+            created_at: Original creation time
+            content_hash: SHA-256 of the PDF (optional)
+            metadata: Locally extracted title, authors and year (optional)
+        """
+        session = SessionRecord(
+            session_id=session_id,
+            filename=filename,
+            text=text,
+            pdf_path=pdf_path,
+            created_at=created_at,
+            content_hash=content_hash
+        )
+        for field in ("title", "authors", "year"):
+            if metadata and metadata.get(field):
+                setattr(session, field, metadata[field])
+        # Restored sessions are least recently used until someone opens them
+        session.last_access = created_at.timestamp()
+        self._sessions[session_id] = session
+    
     def _save_pdf(self, session_id: str, content: bytes) -> str:
         """
         Save PDF file to disk
@@ -58,35 +221,71 @@ class SessionManager:
         """
         pdf_filename = f"{session_id}.pdf"
         pdf_path = os.path.join(UPLOAD_DIR, pdf_filename)
+        write_atomic(BytesIO(content), pdf_path)
+        return pdf_path
+    
+    async def stage_upload(self, source: BinaryIO) -> Optional[str]:
+        """
+        Stream an uploaded PDF to the staging area without blocking the event loop
         
-        with open(pdf_path, "wb") as f:
-            f.write(content)
+        Pass the result to create_session(pdf_file=...) to keep it, or remove it.
         
-        return pdf_path
+        Args:
+            source: Uploaded file object (e.g. UploadFile.file)
+            
+        Returns:
+            Path of the staged file, or None if it is larger than MAX_PDF_BYTES
+        """
+        path = os.path.join(INCOMING_DIR, f"{uuid.uuid4()}.pdf")
+        if await asyncio.to_thread(write_atomic, source, path, MAX_PDF_BYTES) is None:
+            return None
+        return path
     
-    def get_session(self, session_id: str) -> Optional[SessionData]:
+    def get_session(self, session_id: str, touch: bool = True) -> Optional[SessionRecord]:
         """
         Get session data by ID
         
         Args:
             session_id: Session identifier
+            touch: Count this as an access for retention (False for background work)
             
         Returns:
-            SessionData if found, None otherwise
+            SessionRecord if found, None otherwise
         """
-        return self._sessions.get(session_id)
+        session = self._sessions.get(session_id)
+        if session and touch:
+            session.last_access = time.time()
+        return session
     
-    def get_all_sessions(self) -> list[SessionData]:
+    def get_all_sessions(self) -> list[SessionRecord]:
         """
         Get all sessions sorted by creation date (newest first)
         
         Returns:
-            List of all SessionData objects
+            List of all SessionRecord objects
         """
         sessions = list(self._sessions.values())
         sessions.sort(key=lambda x: x.created_at, reverse=True)
         return sessions
     
+    def least_recently_used(self) -> List[SessionRecord]:
+        """
+        Get all sessions, least recently accessed first
+        
+        Returns:
+            List of all SessionRecord objects
+        """
+        return sorted(self._sessions.values(), key=lambda x: x.last_access)
+    
+    def session_ids(self) -> List[str]:
+        """
+        Get the ids of all sessions (unordered, without sorting)
+        
+        Returns:
+            List of session IDs
+        """
+        return list(self._sessions)
+    
     def get_pdf_path(self, session_id: str) -> Optional[str]:
         """
         Get PDF file path for a session
@@ -115,6 +314,10 @@ class SessionManager:
         """
         session = self._sessions.get(session_id)
         if session:
+            if session.summary != summary:
+                # Evaluations of the previous summary can never be reused
+                session.evaluations = {}
+                session.version += 1
             session.summary = summary
             return True
         return False
@@ -132,6 +335,8 @@ class SessionManager:
         """
         session = self._sessions.get(session_id)
         if session:
+            if session.storyline != storyline:
+                session.version += 1
             session.storyline = storyline
             return True
         return False
@@ -153,7 +358,43 @@ class SessionManager:
         if session:
             session.title = title
             session.authors = authors
-            session.year = year
+            # Years repeat across papers; share one string object per value
+            session.year = sys.intern(year) if year else year
+            session.version += 1
+            return True
+        return False
+    
+    def get_evaluation(self, session_id: str, key: str) -> Optional[dict]:
+        """
+        Get a stored summary evaluation
+        
+        Args:
+            session_id: Session identifier
+            key: Evaluation key (summary hash, judge prompt version, judge model)
+            
+        Returns:
+            Evaluation dict if stored, None otherwise
+        """
+        session = self._sessions.get(session_id)
+        if session:
+            return session.evaluations.get(key)
+        return None
+    
+    def save_evaluation(self, session_id: str, key: str, evaluation: dict) -> bool:
+        """
+        Store a summary evaluation for a session
+        
+        Args:
+            session_id: Session identifier
+            key: Evaluation key (summary hash, judge prompt version, judge model)
+            evaluation: Evaluation scores from the judge
+            
+        Returns:
+            True if successful, False if session not found
+        """
+        session = self._sessions.get(session_id)
+        if session:
+            session.evaluations[key] = evaluation
             return True
         return False
     
@@ -170,21 +411,24 @@ class SessionManager:
         """
         session = self._sessions.get(session_id)
         if session:
-            session.rating = rating
+            if session.rating != rating:
+                session.version += 1
+            session.rating = sys.intern(rating) if rating else rating
             return True
         return False
     
-    def session_exists(self, session_id: str) -> bool:
+    def session_exists(self, session_id: str, touch: bool = True) -> bool:
         """
         Check if session exists
         
         Args:
             session_id: Session identifier
+            touch: Count this as an access for retention (False for background work)
             
         Returns:
             True if session exists, False otherwise
         """
-        return session_id in self._sessions
+        return self.get_session(session_id, touch=touch) is not None
     
     def delete_session(self, session_id: str) -> bool:
         """
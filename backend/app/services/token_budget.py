@@ -0,0 +1,286 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from app.utils.sections import detect_sections
+import re
+
+# Context windows (input + output tokens) for supported models
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-5": 400000,
+    "gpt-5-mini": 400000,
+    "gpt-5-nano": 400000,
+    "gpt-4.1": 1047576,
+    "gpt-4.1-mini": 1047576,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+DEFAULT_CONTEXT_WINDOW = 128000
+
+# Tokens reserved for chat formatting overhead and the user message wrapper
+MESSAGE_OVERHEAD_TOKENS = 64
+
+# Size of the windows the paper is cut into when it does not fit the budget
+SEGMENT_TOKENS = 400
+# Upper bound on characters per token, to tokenize only a window's worth of text
+MAX_CHARS_PER_TOKEN = 8
+
+# Counts are cached for chunk-sized texts only, so whole papers and long
+# prompts are not kept alive by the cache
+CACHED_TEXT_CHARS = 4096
+TOKEN_CACHE_SIZE = 4096
+
+# Marker inserted where segments were dropped
+GAP_MARKER = " [...] "
+
+# Relative informativeness of paper sections when choosing what to keep
+SECTION_WEIGHTS = {
+    "abstract": 1.0,
+    "introduction": 0.9,
+    "conclusion": 0.9,
+    "method": 0.8,
+    "results": 0.75,
+    "experiments": 0.7,
+    "discussion": 0.65,
+    "related work": 0.4,
+    "appendix": 0.2,
+    "acknowledgments": 0.05,
+    "references": 0.0,
+}
+
+_CJK_PATTERN = re.compile(r"[ᄀ-ᇿ　-鿿가-힯豈-﫿]")
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """Load the tiktoken encoding once; fall back to estimation if unavailable"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            print(f"ℹ️ tiktoken unavailable, using token estimates: {e}")
+            _encoding = None
+    return _encoding
+
+
+def _estimate_tokens(text: str) -> int:
+    """
+    Estimate token count without a tokenizer
+
+    CJK characters (including Hangul) are roughly one token each, while
+    Latin text averages about four characters per token.
+    """
+    cjk_chars = len(_CJK_PATTERN.findall(text))
+    other_chars = len(text) - cjk_chars
+    return cjk_chars + (other_chars + 3) // 4
+
+
+def _count(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        return _estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+_count_cached = lru_cache(maxsize=TOKEN_CACHE_SIZE)(_count)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens in a piece of text (cached per distinct chunk)
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Number of tokens
+    """
+    if not text:
+        return 0
+    if len(text) <= CACHED_TEXT_CHARS:
+        return _count_cached(text)
+    return _count(text)
+
+
+def _prefix_length(text: str, max_tokens: int) -> int:
+    """Length in characters of the longest prefix of text within max_tokens"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return len(text)
+        # Start of the first token that does not fit
+        _, offsets = encoding.decode_with_offsets(tokens[:max_tokens + 1])
+        return offsets[max_tokens]
+    # Binary search on the estimate when no tokenizer is available
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if _estimate_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def get_context_window(model: str) -> int:
+    """
+    Get the context window of a model
+
+    Args:
+        model: Model identifier (dated snapshots resolve to their base model)
+
+    Returns:
+        Context window size in tokens
+    """
+    if model in MODEL_CONTEXT_WINDOWS:
+        return MODEL_CONTEXT_WINDOWS[model]
+    # Longest matching prefix, e.g. "gpt-4o-mini-2024-07-18" -> "gpt-4o-mini"
+    for name in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_CONTEXT_WINDOWS[name]
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def available_input_tokens(
+    model: str,
+    max_completion_tokens: int,
+    prompt_text: str = ""
+) -> int:
+    """
+    Tokens left for document text once the prompt and completion are reserved
+
+    Args:
+        model: Model identifier
+        max_completion_tokens: Completion tokens requested for the call
+        prompt_text: System prompt and any fixed message text
+
+    Returns:
+        Remaining token budget (never negative)
+    """
+    remaining = (
+        get_context_window(model)
+        - max_completion_tokens
+        - count_tokens(prompt_text)
+        - MESSAGE_OVERHEAD_TOKENS
+    )
+    return max(remaining, 0)
+
+
+def _segment(text: str) -> List[Tuple[str, int, str]]:
+    """
+    Cut text into windows of at most SEGMENT_TOKENS tokens labeled with their section
+
+    Returns:
+        List of (section label, position within section, segment text)
+        in document order
+    """
+    # Split at detected section headings first; the front matter counts as abstract
+    sections = detect_sections(text)
+    boundaries = [0] + [offset for offset, _ in sections] + [len(text)]
+    labels = ["abstract"] + [label for _, label in sections]
+
+    segments = []
+    for i, label in enumerate(labels):
+        section_text = text[boundaries[i]:boundaries[i + 1]]
+        if not section_text.strip():
+            continue
+        # Then cut long sections into windows on sentence boundaries
+        start = 0
+        position = 0
+        while start < len(section_text):
+            window = section_text[start:start + SEGMENT_TOKENS * MAX_CHARS_PER_TOKEN]
+            end = start + max(_prefix_length(window, SEGMENT_TOKENS), 1)
+            if end < len(section_text):
+                sentence_end = section_text.rfind(". ", start + (end - start) // 2, end)
+                if sentence_end != -1:
+                    end = sentence_end + 2
+            segments.append((label, position, section_text[start:end]))
+            start = end
+            position += 1
+    return segments
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncate text to at most max_tokens tokens
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token limit
+
+    Returns:
+        Prefix of text that fits within the limit
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    return text[:_prefix_length(text, max_tokens)]
+
+
+def fit_text(
+    text: str,
+    model: str,
+    max_completion_tokens: int,
+    prompt_text: str = "",
+    max_input_tokens: Optional[int] = None,
+    strategy: str = "informative"
+) -> str:
+    """
+    Fit document text into a model's token budget
+
+    Args:
+        text: Document text
+        model: Model the text will be sent to
+        max_completion_tokens: Completion tokens requested for the call
+        prompt_text: System prompt and fixed message text sharing the window
+        max_input_tokens: Optional cap on document tokens (to limit cost)
+        strategy: "head" keeps the beginning of the document,
+            "informative" keeps the highest-value sections in document order
+
+    Returns:
+        Text that fits within the budget
+    """
+    budget = available_input_tokens(model, max_completion_tokens, prompt_text)
+    if max_input_tokens is not None:
+        budget = min(budget, max_input_tokens)
+
+    if count_tokens(text) <= budget:
+        return text
+    if strategy == "head":
+        return truncate_to_tokens(text, budget)
+
+    segments = _segment(text)
+    # Earlier segments within a section tend to carry the key statements
+    ranked = sorted(
+        range(len(segments)),
+        key=lambda i: SECTION_WEIGHTS[segments[i][0]] - 0.05 * segments[i][1],
+        reverse=True
+    )
+
+    selected = set()
+    used = 0
+    for i in ranked:
+        if SECTION_WEIGHTS[segments[i][0]] == 0.0:
+            continue
+        tokens = count_tokens(segments[i][2]) + count_tokens(GAP_MARKER)
+        if used + tokens <= budget:
+            selected.add(i)
+            used += tokens
+
+    if not selected:
+        return truncate_to_tokens(text, budget)
+
+    # Preserve document order and mark the gaps
+    parts = []
+    previous = -1
+    for i in sorted(selected):
+        if previous != -1 and i != previous + 1:
+            parts.append(GAP_MARKER)
+        parts.append(segments[i][2])
+        previous = i
+    return "".join(parts)
@@ -0,0 +1,473 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import shutil
+import numpy as np
+
+
+@dataclass
+class VectorMatch:
+    id: str
+    score: float
+    metadata: Optional[Dict[str, Any]] = None
+    values: List[float] = field(default_factory=list)
+
+
+@dataclass
+class QueryResponse:
+    matches: List[VectorMatch]
+
+
+def _matches_filter(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Pinecone-style metadata filter ($eq, $ne, $in, $nin, $and)"""
+    if not filter:
+        return True
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(_matches_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for operator, operand in condition.items():
+            if operator == "$eq" and value != operand:
+                return False
+            if operator == "$ne" and value == operand:
+                return False
+            if operator == "$in" and value not in operand:
+                return False
+            if operator == "$nin" and value in operand:
+                return False
+    return True
+
+
+class InMemoryIndex:
+    """
+    In-process vector index with the subset of the Pinecone Index API used by
+    RAGService (upsert, query, delete). Used for local development and for
+    benchmarks that must not touch Pinecone.
+    """
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._metadata: List[Dict[str, Any]] = []
+        self._vectors: List[np.ndarray] = []
+
+    def upsert(self, vectors: List[Dict[str, Any]]):
+        """
+        Insert or replace vectors
+
+        Args:
+            vectors: List of {"id", "values", "metadata"} dictionaries
+        """
+        for vector in vectors:
+            values = np.asarray(vector["values"], dtype=np.float32)
+            norm = np.linalg.norm(values)
+            normalized = values / norm if norm > 0 else values
+            metadata = dict(vector.get("metadata") or {})
+            position = self._positions.get(vector["id"])
+            if position is None:
+                self._positions[vector["id"]] = len(self._ids)
+                self._ids.append(vector["id"])
+                self._vectors.append(normalized)
+                self._metadata.append(metadata)
+            else:
+                self._vectors[position] = normalized
+                self._metadata[position] = metadata
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = False,
+        include_values: bool = False
+    ) -> QueryResponse:
+        """
+        Cosine-similarity search over vectors matching the filter
+
+        Args:
+            vector: Query vector
+            top_k: Number of matches to return
+            filter: Pinecone-style metadata filter
+            include_metadata: Whether to return metadata
+            include_values: Whether to return vector values
+
+        Returns:
+            QueryResponse with matches sorted by descending score
+        """
+        candidates = [
+            position for position, metadata in enumerate(self._metadata)
+            if _matches_filter(metadata, filter)
+        ]
+        if not candidates:
+            return QueryResponse(matches=[])
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        matrix = np.stack([self._vectors[position] for position in candidates])
+        scores = matrix @ (query / norm) if norm > 0 else np.zeros(len(candidates), dtype=np.float32)
+
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return QueryResponse(matches=[
+            VectorMatch(
+                id=self._ids[candidates[i]],
+                score=float(scores[i]),
+                metadata=dict(self._metadata[candidates[i]]) if include_metadata else None,
+                values=self._vectors[candidates[i]].tolist() if include_values else []
+            )
+            for i in order
+        ])
+
+    def delete(self, ids: Optional[List[str]] = None, filter: Optional[Dict[str, Any]] = None):
+        """
+        Delete vectors by id or metadata filter
+
+        Args:
+            ids: Vector ids to delete
+            filter: Pinecone-style metadata filter
+        """
+        remove = set(ids or [])
+        if filter:
+            remove.update(
+                vector_id for vector_id, metadata in zip(self._ids, self._metadata)
+                if _matches_filter(metadata, filter)
+            )
+        if not remove:
+            return
+        keep = [i for i, vector_id in enumerate(self._ids) if vector_id not in remove]
+        self._ids = [self._ids[i] for i in keep]
+        self._vectors = [self._vectors[i] for i in keep]
+        self._metadata = [self._metadata[i] for i in keep]
+        self._positions = {vector_id: i for i, vector_id in enumerate(self._ids)}
+
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric int8 scalar quantization with one scale per vector
+
+    Args:
+        vectors: (n, dimension) float32 array
+
+    Returns:
+        Tuple of (int8 codes, float32 scales) with vectors ≈ codes * scales[:, None]
+    """
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+# Rows of int8 codes widened to float32 at a time when scoring
+SCORE_BLOCK_ROWS = 2048
+
+
+class QuantizedIndex:
+    """
+    Disk-backed vector index storing int8 codes with per-vector scales
+
+    Candidates are scored against the int8 codes, then the best
+    rescore_factor * top_k are rescored with the float32 vectors, which
+    stay on disk (memory-mapped) so only those rows are read. Files live in
+    a generation directory named by `directory`/CURRENT:
+      codes.i8     int8 codes, one row per vector
+      scales.f32   per-vector scales
+      vectors.f32  normalized float32 vectors, for rescoring
+      records.jsonl  append-only log of upserts and deletes (ids, metadata)
+    Compaction writes a new generation and switches CURRENT atomically.
+    Same upsert/query/delete API as InMemoryIndex.
+    """
+
+    def __init__(self, directory: str, rescore_factor: int = 4):
+        self.directory = directory
+        self.rescore_factor = max(1, rescore_factor)
+        self.dimension: Optional[int] = None
+        self._rows = 0
+        self._ids: List[Optional[str]] = []  # per row; None once replaced or deleted
+        self._positions: Dict[str, int] = {}
+        self._metadata: List[Optional[Dict[str, Any]]] = []
+        # Live rows per session, so session-filtered queries skip other papers
+        self._session_rows: Dict[str, set] = {}
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._generation = 0
+        current = os.path.join(directory, "CURRENT")
+        if os.path.exists(current):
+            with open(current) as f:
+                self._generation = int(f.read().strip() or 0)
+        os.makedirs(self._generation_dir(self._generation), exist_ok=True)
+        self._load()
+
+    def _generation_dir(self, generation: int) -> str:
+        return os.path.join(self.directory, f"gen-{generation}")
+
+    def _path(self, name: str, generation: Optional[int] = None) -> str:
+        return os.path.join(self._generation_dir(self._generation if generation is None else generation), name)
+
+    def _load(self):
+        """Replay the record log and map the vector files"""
+        if not os.path.exists(self._path("records.jsonl")):
+            return
+        with open(self._path("records.jsonl"), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A write interrupted mid-line; later rows were never committed
+                    break
+                if record["op"] == "upsert":
+                    self.dimension = record["dimension"]
+                    self._add_row(record["id"], record["metadata"])
+                else:
+                    self._remove(record["id"])
+        # Drop rows written by an upsert whose log entries never made it
+        for name, row_bytes in self._row_bytes().items():
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > self._rows * row_bytes:
+                os.truncate(path, self._rows * row_bytes)
+        self._map()
+
+    def _row_bytes(self) -> Dict[str, int]:
+        dimension = self.dimension or 0
+        return {"codes.i8": dimension, "scales.f32": 4, "vectors.f32": dimension * 4}
+
+    def _map(self):
+        """(Re)open the memory maps after rows were appended"""
+        if not self._rows:
+            self._codes = self._scales = self._vectors = None
+            return
+        shape = (self._rows, self.dimension)
+        self._codes = np.memmap(self._path("codes.i8"), dtype=np.int8, mode="r", shape=shape)
+        self._scales = np.memmap(self._path("scales.f32"), dtype=np.float32, mode="r", shape=(self._rows,))
+        self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r", shape=shape)
+
+    def _add_row(self, vector_id: str, metadata: Dict[str, Any]):
+        self._remove(vector_id)
+        self._positions[vector_id] = self._rows
+        self._ids.append(vector_id)
+        self._metadata.append(metadata)
+        self._session_rows.setdefault(metadata.get("session_id"), set()).add(self._rows)
+        self._rows += 1
+
+    def _remove(self, vector_id: str):
+        position = self._positions.pop(vector_id, None)
+        if position is not None:
+            session_rows = self._session_rows.get(self._metadata[position].get("session_id"))
+            if session_rows is not None:
+                session_rows.discard(position)
+            self._ids[position] = None
+            self._metadata[position] = None
+
+    def _candidate_rows(self, filter: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Live rows matching the filter, narrowed by session first when possible"""
+        session_id = (filter or {}).get("session_id")
+        if isinstance(session_id, dict) and list(session_id) == ["$in"]:
+            # Shortlisted sessions (library search)
+            rows = set().union(*(self._session_rows.get(s, ()) for s in session_id["$in"]))
+            rows = np.fromiter(sorted(rows), dtype=np.int64)
+            filter = {key: value for key, value in filter.items() if key != "session_id"}
+            if not filter:
+                return rows
+        elif isinstance(session_id, str):
+            rows = np.fromiter(sorted(self._session_rows.get(session_id, ())), dtype=np.int64)
+            filter = {key: value for key, value in filter.items() if key != "session_id"}
+            if not filter:
+                return rows
+        else:
+            rows = range(self._rows)
+        return np.fromiter(
+            (
+                row for row in rows
+                if self._metadata[row] is not None and _matches_filter(self._metadata[row], filter)
+            ),
+            dtype=np.int64
+        )
+
+    def _approximate_scores(self, candidates: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """
+        Dot products of the query with the int8 codes of candidate rows
+
+        Codes are widened to float32 one cache-sized block at a time instead
+        of materializing a float32 copy of every candidate.
+        """
+        scores = np.empty(len(candidates), dtype=np.float32)
+        contiguous = candidates[-1] - candidates[0] + 1 == len(candidates)
+        buffer = np.empty((min(SCORE_BLOCK_ROWS, len(candidates)), self.dimension), dtype=np.float32)
+        for start in range(0, len(candidates), SCORE_BLOCK_ROWS):
+            end = min(start + SCORE_BLOCK_ROWS, len(candidates))
+            if contiguous:
+                codes = self._codes[candidates[start]:candidates[start] + end - start]
+            else:
+                codes = self._codes[candidates[start:end]]
+            block = buffer[:end - start]
+            np.copyto(block, codes)
+            scores[start:end] = block @ query
+        return scores * self._scales[candidates]
+
+    def upsert(self, vectors: List[Dict[str, Any]]):
+        """
+        Insert or replace vectors; replaced rows become dead space
+
+        Args:
+            vectors: List of {"id", "values", "metadata"} dictionaries
+        """
+        if not vectors:
+            return
+        matrix = np.asarray([vector["values"] for vector in vectors], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms > 0, norms, 1.0)
+        if self.dimension is None:
+            self.dimension = matrix.shape[1]
+        elif matrix.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-dimensional vectors, got {matrix.shape[1]}")
+        codes, scales = quantize(matrix)
+
+        # Vector files first, so the log never references rows that aren't on disk
+        for name, array in (("codes.i8", codes), ("scales.f32", scales), ("vectors.f32", matrix)):
+            with open(self._path(name), "ab") as f:
+                f.write(array.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        with open(self._path("records.jsonl"), "a", encoding="utf-8") as f:
+            for vector in vectors:
+                metadata = dict(vector.get("metadata") or {})
+                f.write(json.dumps({
+                    "op": "upsert", "id": vector["id"], "dimension": self.dimension, "metadata": metadata
+                }, ensure_ascii=False) + "\n")
+                self._add_row(vector["id"], metadata)
+        self._map()
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = False,
+        include_values: bool = False
+    ) -> QueryResponse:
+        """
+        Approximate cosine search on int8 codes, rescored in float32
+
+        Args:
+            vector: Query vector
+            top_k: Number of matches to return
+            filter: Pinecone-style metadata filter
+            include_metadata: Whether to return metadata
+            include_values: Whether to return (float32) vector values
+
+        Returns:
+            QueryResponse with matches sorted by descending score
+        """
+        candidates = self._candidate_rows(filter)
+        if not len(candidates):
+            return QueryResponse(matches=[])
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+            # Approximate scores from the int8 codes
+            approximate = self._approximate_scores(candidates, query)
+            shortlist_size = min(len(candidates), top_k * self.rescore_factor)
+            shortlist = candidates[np.argpartition(-approximate, shortlist_size - 1)[:shortlist_size]]
+        else:
+            # Metadata-only lookups pass a zero vector; every score is 0
+            shortlist = candidates[:top_k]
+
+        # Exact scores for the shortlist from the memory-mapped float32 vectors
+        rows = np.sort(shortlist)
+        full = np.asarray(self._vectors[rows])
+        scores = full @ query
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return QueryResponse(matches=[
+            VectorMatch(
+                id=self._ids[rows[i]],
+                score=float(scores[i]),
+                metadata=dict(self._metadata[rows[i]]) if include_metadata else None,
+                values=full[i].tolist() if include_values else []
+            )
+            for i in order
+        ])
+
+    def delete(self, ids: Optional[List[str]] = None, filter: Optional[Dict[str, Any]] = None):
+        """
+        Delete vectors by id or metadata filter
+
+        Args:
+            ids: Vector ids to delete
+            filter: Pinecone-style metadata filter
+        """
+        remove = {vector_id for vector_id in (ids or []) if vector_id in self._positions}
+        if filter:
+            remove.update(self._ids[row] for row in self._candidate_rows(filter))
+        if not remove:
+            return
+        with open(self._path("records.jsonl"), "a", encoding="utf-8") as f:
+            for vector_id in remove:
+                f.write(json.dumps({"op": "delete", "id": vector_id}) + "\n")
+                self._remove(vector_id)
+        if self._rows >= 1000 and len(self._positions) < self._rows // 2:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the files without replaced or deleted rows"""
+        live = np.asarray(sorted(self._positions.values()), dtype=np.int64)
+        arrays = {}
+        if len(live):
+            arrays = {
+                "codes.i8": np.asarray(self._codes[live]),
+                "scales.f32": np.asarray(self._scales[live]),
+                "vectors.f32": np.asarray(self._vectors[live]),
+            }
+        records = [(self._ids[row], self._metadata[row]) for row in live]
+        self._codes = self._scales = self._vectors = None
+
+        # Write the next generation, then switch CURRENT to it atomically
+        generation = self._generation + 1
+        shutil.rmtree(self._generation_dir(generation), ignore_errors=True)
+        os.makedirs(self._generation_dir(generation))
+        for name in self._row_bytes():
+            with open(self._path(name, generation), "wb") as f:
+                if name in arrays:
+                    f.write(arrays[name].tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        with open(self._path("records.jsonl", generation), "w", encoding="utf-8") as f:
+            for vector_id, metadata in records:
+                f.write(json.dumps({
+                    "op": "upsert", "id": vector_id, "dimension": self.dimension, "metadata": metadata
+                }, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        current = os.path.join(self.directory, "CURRENT")
+        with open(current + ".tmp", "w") as f:
+            f.write(str(generation))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(current + ".tmp", current)
+        shutil.rmtree(self._generation_dir(self._generation), ignore_errors=True)
+        self._generation = generation
+
+        self._rows = 0
+        self._ids, self._metadata = [], []
+        self._positions, self._session_rows = {}, {}
+        for vector_id, metadata in records:
+            self._add_row(vector_id, metadata)
+        self._map()
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """
+        Bytes of vector data read on the search path versus full precision
+
+        Returns:
+            {"quantized": codes + scales, "float32": equivalent float32 vectors}
+        """
+        dimension = self.dimension or 0
+        return {
+            "quantized": self._rows * (dimension + 4),
+            "float32": self._rows * dimension * 4,
+        }
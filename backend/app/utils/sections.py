@@ -0,0 +1,123 @@
+from typing import List, Tuple
+import re
+
+# Canonical section labels used across the backend
+SECTION_LABELS = [
+    "abstract",
+    "introduction",
+    "related work",
+    "method",
+    "experiments",
+    "results",
+    "discussion",
+    "conclusion",
+    "acknowledgments",
+    "references",
+    "appendix",
+]
+
+_HEADING_WORDS = (
+    r"Abstract|Introduction|Related Work|Background|Methods?|Methodology|Approach|"
+    r"Experiments?|Experimental Setup|Evaluation|Results|Discussion|Conclusions?|"
+    r"Acknowledge?ments?|References|Bibliography|Appendix"
+)
+
+# Headings on their own line, numbered headings ("3 Method", "III. Results"),
+# upper-case headings, and the few headings that are rarely used in prose
+_HEADING_PATTERN = re.compile(
+    rf"(?:^|\n)[ \t]*(?:(?:\d{{1,2}}(?:\.\d{{1,2}})*\.?|[IVX]{{1,4}}\.)[ \t]+)?(?P<line>{_HEADING_WORDS})[ \t]*(?=\n)"
+    rf"|(?:^|(?<=\s))(?:\d{{1,2}}\.?|[IVX]{{1,4}}\.)[ \t]+(?P<numbered>{_HEADING_WORDS})\b"
+    rf"|\b(?P<upper>{_HEADING_WORDS.upper()})\b"
+    r"|\b(?P<plain>Abstract|References|Acknowledge?ments?)\b(?=\s*[:.\-—]?\s*[A-Z\[\d])"
+)
+
+# Sections that move everything after them out of the main body; their
+# heading must lie in the last part of the paper
+TRAILING_SECTIONS = {"references", "appendix"}
+TRAILING_SECTION_MIN_POSITION = 0.5
+# A references heading on its own line, possibly numbered ("7 References")
+_REFERENCES_LINE = re.compile(
+    r"(?:\d{1,2}\.?|[IVX]{1,4}\.)?\s*(?:references|bibliography)", re.IGNORECASE
+)
+# Bibliography entries: "[12]", "(2020)", ", 2020."
+_REFERENCE_ENTRY = re.compile(r"\[\d{1,3}\]|\(\d{4}[a-z]?\)|,\s\d{4}[a-z]?\.")
+REFERENCE_ENTRIES_WINDOW = 2000
+MIN_REFERENCE_ENTRIES = 3
+
+_ALIASES = {
+    "background": "related work",
+    "methods": "method",
+    "methodology": "method",
+    "approach": "method",
+    "experiment": "experiments",
+    "experimental setup": "experiments",
+    "evaluation": "experiments",
+    "conclusions": "conclusion",
+    "acknowledgment": "acknowledgments",
+    "acknowledgement": "acknowledgments",
+    "acknowledgements": "acknowledgments",
+    "bibliography": "references",
+}
+
+
+def normalize_section(name: str) -> str:
+    """
+    Map a heading to its canonical section label
+
+    Args:
+        name: Heading text as found in the paper
+
+    Returns:
+        Canonical label from SECTION_LABELS
+    """
+    name = " ".join(name.lower().split())
+    return _ALIASES.get(name, name)
+
+
+def _is_trailing_heading(text: str, offset: int, label: str) -> bool:
+    """
+    Whether a references/appendix heading match really starts that section
+
+    Both must be in the last part of the paper; a references heading must
+    also be on its own line or be followed by bibliography entries, so a
+    "References" in body prose does not end the searchable text.
+    """
+    if offset < len(text) * TRAILING_SECTION_MIN_POSITION:
+        return False
+    if label != "references":
+        return True
+    line_start = text.rfind("\n", 0, offset) + 1
+    line_end = text.find("\n", offset)
+    line = text[line_start:line_end if line_end != -1 else len(text)]
+    if _REFERENCES_LINE.fullmatch(line.strip()):
+        return True
+    following = text[offset:offset + REFERENCE_ENTRIES_WINDOW]
+    return len(_REFERENCE_ENTRY.findall(following)) >= MIN_REFERENCE_ENTRIES
+
+
+def detect_sections(text: str) -> List[Tuple[int, str]]:
+    """
+    Detect academic section headings in paper text
+
+    Works on both line-structured text and text whose newlines were collapsed.
+    Repeated headings of the same section (e.g. running headers) are ignored,
+    as are references/appendix headings that fail _is_trailing_heading.
+
+    Args:
+        text: Paper text
+
+    Returns:
+        List of (character offset, canonical label) in document order
+    """
+    sections = []
+    seen = set()
+    for match in _HEADING_PATTERN.finditer(text):
+        group = next(name for name in ("line", "numbered", "upper", "plain") if match.group(name))
+        label = normalize_section(match.group(group))
+        if label in seen:
+            continue
+        if label in TRAILING_SECTIONS and not _is_trailing_heading(text, match.start(group), label):
+            continue
+        seen.add(label)
+        sections.append((match.start(group), label))
+    return sections
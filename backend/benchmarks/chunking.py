@@ -0,0 +1,151 @@
+"""
+Chunk count and retrieval hit rate: fixed-size splitter vs section-aware chunker
+
+Usage:
+    python -m benchmarks.chunking --papers 10 --pages 8 --top-k 3
+
+Builds sample papers with known facts placed inside specific sections and
+a running header/footer on every page, then chunks them three ways:
+  baseline  RecursiveCharacterTextSplitter(1000, 200) over everything
+  section   SectionChunker, references kept out of the index
+  filtered  SectionChunker after the pre-indexing filter (boilerplate removed)
+Each fact's question is retrieved with a local bag-of-words embedding; a
+hit means one of the top-k chunks contains the whole fact sentence.
+Reports indexed chunks (= embedding calls), embedded characters and hit
+rate per strategy. No API keys or network access are required.
+"""
+
+from typing import Callable, Dict, List, Tuple
+import argparse
+import asyncio
+import re
+import zlib
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from benchmarks.sample_pdf import build_sample_paper
+from app.config import settings
+from app.services.pdf_parser import PDFParser
+from app.services.section_chunker import SectionChunker
+from app.services.index_filter import filter_for_indexing
+
+# (section, fact sentence, question asking for it)
+FACTS = [
+    ("Method", "The warmup schedule runs for 4000 steps followed by cosine decay.",
+     "How many warmup steps does the schedule use before cosine decay?"),
+    ("Method", "Sparse routing sends each token to exactly two experts.",
+     "How many experts does sparse routing send each token to?"),
+    ("Experiments", "All runs use eight nodes with four GPUs per node.",
+     "How many GPUs per node and nodes do the runs use?"),
+    ("Experiments", "The Wikipedia corpus snapshot is from March 2021.",
+     "Which Wikipedia corpus snapshot is used?"),
+    ("Results", "Latency drops from 120 milliseconds to 45 milliseconds.",
+     "How much does latency drop in milliseconds?"),
+    ("Conclusion", "Future work will study multilingual transfer to Korean.",
+     "What language will future work study for multilingual transfer?"),
+]
+
+RUNNING_HEADER = "Preprint. Under review at the Conference on Efficient Retrieval."
+
+DIMENSION = 4096
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def embed(text: str) -> np.ndarray:
+    """Hashed bag-of-words vector, L2-normalized"""
+    vector = np.zeros(DIMENSION, dtype=np.float32)
+    for word in _WORD.findall(text.lower()):
+        vector[zlib.crc32(word.encode()) % DIMENSION] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+# (cleaned text, raw page texts)
+Paper = Tuple[str, List[str]]
+
+
+def baseline_chunks(text: str, pages: List[str]) -> List[str]:
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=200,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""]
+    )
+    return splitter.split_text(text)
+
+
+def _indexed_tiers() -> set:
+    indexed_tiers = {"body"}
+    if settings.index_references:
+        indexed_tiers.add("references")
+    if settings.index_appendix:
+        indexed_tiers.add("appendix")
+    return indexed_tiers
+
+
+def section_chunks(text: str, pages: List[str]) -> List[str]:
+    chunker = SectionChunker(chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap)
+    return [chunk.text for chunk in chunker.split(text) if chunk.tier in _indexed_tiers()]
+
+
+def filtered_chunks(text: str, pages: List[str]) -> List[str]:
+    filtered = filter_for_indexing(text, pages)
+    chunker = SectionChunker(chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap)
+    return [
+        chunk.text for chunk in chunker.split(filtered.text, filtered.references_start)
+        if chunk.tier in _indexed_tiers()
+    ]
+
+
+def evaluate(papers: List[Paper], chunk: Callable[[str, List[str]], List[str]], top_k: int) -> Dict[str, float]:
+    chunks_total = 0
+    characters = 0
+    hits = 0
+    for text, pages in papers:
+        chunks = chunk(text, pages)
+        chunks_total += len(chunks)
+        characters += sum(len(c) for c in chunks)
+        matrix = np.stack([embed(c) for c in chunks])
+        for _, fact, question in FACTS:
+            scores = matrix @ embed(question)
+            top = np.argsort(-scores)[:top_k]
+            if any(fact in chunks[i] for i in top):
+                hits += 1
+    questions = len(papers) * len(FACTS)
+    return {
+        "chunks_per_paper": round(chunks_total / len(papers), 1),
+        "embedded_chars_per_paper": round(characters / len(papers)),
+        "hit_rate": round(hits / questions, 3),
+    }
+
+
+async def load_papers(papers: int, pages: int) -> List[Paper]:
+    facts: Dict[str, List[str]] = {}
+    for section, fact, _ in FACTS:
+        facts.setdefault(section, []).append(fact)
+    loaded = []
+    for seed in range(papers):
+        pdf = build_sample_paper(pages=pages, seed=seed, facts=facts, running_header=RUNNING_HEADER)
+        page_texts = await PDFParser.extract_pages(pdf)
+        loaded.append((PDFParser.clean_text(PDFParser.join_pages(page_texts)), page_texts))
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunking benchmark")
+    parser.add_argument("--papers", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    papers = asyncio.run(load_papers(args.papers, args.pages))
+    print(f"{'strategy':10s} {'chunks/paper':>13s} {'chars/paper':>12s} {'hit@' + str(args.top_k):>7s}")
+    strategies = (("baseline", baseline_chunks), ("section", section_chunks), ("filtered", filtered_chunks))
+    for name, chunk in strategies:
+        result = evaluate(papers, chunk, args.top_k)
+        print(f"{name:10s} {result['chunks_per_paper']:13.1f} "
+              f"{result['embedded_chars_per_paper']:12d} {result['hit_rate']:7.3f}")
+
+
+if __name__ == "__main__":
+    main()
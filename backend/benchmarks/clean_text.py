@@ -0,0 +1,103 @@
+"""
+Throughput of text cleaning on large extracted text
+
+Usage:
+    python -m benchmarks.clean_text --megabytes 20 --repeat 3
+
+Builds synthetic extractor output with the quirks of real PDFs (wrapped
+lines, words hyphenated at line ends, blank lines between paragraphs,
+tabs, runs of spaces, CRLF pages) and times three cleaners:
+  legacy      the previous clean_text: " ".join(text.split()), which also
+              drops paragraph breaks and leaves hyphenated words split
+  multi-pass  the same normalization as clean_text as a chain of re.sub
+              passes, one per rule (without clean_text's check for
+              hyphenated compounds, which the synthetic text lacks)
+  clean_text  PDFParser.clean_text, one pass over the lines with the
+              word splitting and joining done by str methods
+Reports MB/s per cleaner and whether the outputs of multi-pass and
+clean_text agree. A single regex with one alternative per rule was also
+tried and ran slower than the multi-pass chain. No API keys or network
+access are required.
+"""
+
+from typing import Callable, Dict
+import argparse
+import random
+import re
+import time
+
+from app.services.pdf_parser import PDFParser
+
+WORDS = (
+    "the model attention layer training data results transformer gradient "
+    "sequence baseline evaluation objective representation retrieval corpus"
+).split()
+
+
+def legacy_clean(text: str) -> str:
+    text = " ".join(text.split())
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    return "\n".join(lines)
+
+
+def multi_pass_clean(text: str) -> str:
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"(?<=[^\W\d_])-[^\S\n]*\n[^\S\n]*(?=[a-z])", "", text)
+    text = re.sub(r"[^\S\n]+", " ", text)
+    text = re.sub(r" ?\n(?: ?\n)+ ?", "\n\n", text)
+    text = re.sub(r"(?<!\n) ?\n ?(?!\n)", " ", text)
+    return text.strip()
+
+
+def synthetic_text(megabytes: float, seed: int = 0) -> str:
+    """Extractor-like text of roughly the given size"""
+    rng = random.Random(seed)
+    lines, size = [], 0
+    while size < megabytes * 1_000_000:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 14))]
+        if rng.random() < 0.1:
+            words[rng.randrange(len(words))] += "  "
+        if rng.random() < 0.05:
+            words.insert(rng.randrange(len(words)), "\t")
+        line = " ".join(words)
+        if rng.random() < 0.08:
+            word = rng.choice(WORDS)
+            line += f" {word[:3]}-\n{word[3:]}"
+        if rng.random() < 0.06:
+            line += "\n"  # blank line: paragraph break
+        lines.append(line)
+        size += len(line) + 1
+    text = "\n".join(lines)
+    # Some extractors emit Windows line endings
+    half = len(text) // 2
+    return text[:half] + text[half:].replace("\n", "\r\n")
+
+
+def measure(clean: Callable[[str], str], text: str, repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = clean(text)
+        best = min(best, time.perf_counter() - start)
+    return {"seconds": best, "mb_per_s": len(text) / 1_000_000 / best, "result": result}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text cleaning benchmark")
+    parser.add_argument("--megabytes", type=float, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = synthetic_text(args.megabytes)
+    cleaners = (("legacy", legacy_clean), ("multi-pass", multi_pass_clean), ("clean_text", PDFParser.clean_text))
+    results = {name: measure(clean, text, args.repeat) for name, clean in cleaners}
+
+    print(f"input={len(text) / 1_000_000:.1f} MB")
+    for name, result in results.items():
+        print(f"{name:12s} {result['seconds'] * 1000:9.1f} ms {result['mb_per_s']:8.1f} MB/s "
+              f"paragraphs={result['result'].count(chr(10) * 2)}")
+    print(f"multi-pass == clean_text: {results['multi-pass']['result'] == results['clean_text']['result']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Local stand-in for the OpenAI chat completion and embedding APIs
+
+Usage:
+    python -m benchmarks.fake_openai --port 9100 --latency 0.2 --tokens-per-second 200
+
+Responses have configurable time-to-first-token, generation speed and
+embedding latency. Embeddings are deterministic per input, so repeated
+runs retrieve the same chunks.
+"""
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+import numpy as np
+import uvicorn
+
+WORDS = (
+    "the proposed method improves accuracy on standard benchmarks while reducing "
+    "training cost and the analysis shows consistent gains across model sizes"
+).split()
+
+config = {
+    "latency": 0.2,
+    "tokens_per_second": 200.0,
+    "completion_tokens": 300,
+    "embedding_latency": 0.05,
+    "dimension": 1536,
+}
+
+app = FastAPI(title="Fake OpenAI")
+
+
+def _completion_words(max_tokens: int):
+    count = min(config["completion_tokens"], max_tokens or config["completion_tokens"])
+    return [WORDS[i % len(WORDS)] for i in range(count)]
+
+
+def _usage(messages, completion_tokens: int) -> dict:
+    prompt_tokens = sum(len(str(message.get("content", ""))) for message in messages) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "gpt-5-mini")
+    messages = body.get("messages", [])
+    words = _completion_words(body.get("max_completion_tokens") or body.get("max_tokens"))
+    created = int(time.time())
+
+    if body.get("stream"):
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        async def generate():
+            await asyncio.sleep(config["latency"])
+            for word in words:
+                chunk = {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(1 / config["tokens_per_second"])
+            if include_usage:
+                chunk = {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": _usage(messages, len(words))
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    await asyncio.sleep(config["latency"] + len(words) / config["tokens_per_second"])
+    content = " ".join(words)
+    # Metadata and evaluation prompts expect JSON answers
+    system_prompt = str(messages[0].get("content", "")) if messages else ""
+    if '"faithfulness"' in system_prompt:
+        content = json.dumps({
+            "faithfulness": 8, "completeness": 7, "conciseness": 8, "coherence": 8, "clarity": 8,
+            "overall_score": 7.8, "reasoning": content, "strengths": [], "weaknesses": []
+        })
+    elif '"title"' in system_prompt:
+        content = json.dumps({"title": "Fake Paper", "authors": "A. Author", "year": "2024"})
+
+    return JSONResponse({
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": _usage(messages, len(words))
+    })
+
+
+def _embed(text) -> list:
+    seed = int.from_bytes(hashlib.sha256(json.dumps(text).encode()).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(config["dimension"]).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+    await asyncio.sleep(config["embedding_latency"])
+    return JSONResponse({
+        "object": "list",
+        "model": body.get("model", "text-embedding-ada-002"),
+        "data": [
+            {"object": "embedding", "index": i, "embedding": _embed(text)}
+            for i, text in enumerate(inputs)
+        ],
+        "usage": {"prompt_tokens": 0, "total_tokens": 0}
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI server")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=config["latency"],
+                        help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=config["tokens_per_second"])
+    parser.add_argument("--completion-tokens", type=int, default=config["completion_tokens"])
+    parser.add_argument("--embedding-latency", type=float, default=config["embedding_latency"])
+    args = parser.parse_args()
+
+    config.update(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        embedding_latency=args.embedding_latency
+    )
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
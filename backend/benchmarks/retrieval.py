@@ -0,0 +1,92 @@
+"""
+Prompt tokens and fact coverage: fixed top-3 retrieval vs MMR re-ranking
+
+Usage:
+    python -m benchmarks.retrieval --papers 5 --pages 8
+
+Indexes sample papers (from benchmarks.chunking, with known facts) into the
+in-memory vector store using the local bag-of-words embedding, then answers
+single-fact and multi-fact questions two ways:
+  top3  the previous behaviour: the 3 nearest chunks, concatenated
+  mmr   RAGService.query_document (over-fetch, MMR, token budget, merging)
+Reports context tokens per question and the fraction of target facts that
+appear whole in the context. No API keys or network access are required.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("PINECONE_API_KEY", "benchmark")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "benchmark")
+os.environ["VECTOR_STORE"] = "memory"
+
+from benchmarks.chunking import FACTS, embed, load_papers
+from app.services.rag_service import RAGService
+from app.services.token_budget import count_tokens
+
+
+def questions():
+    """(question, facts it needs): every fact alone, then pairs and triples from different sections"""
+    single = [(question, [fact]) for _, fact, question in FACTS]
+    combined = []
+    for size in (2, 3):
+        for group in itertools.combinations(FACTS, size):
+            if len({section for section, _, _ in group}) < size:
+                continue
+            combined.append((" Also, ".join(q for _, _, q in group), [fact for _, fact, _ in group]))
+    return single + combined
+
+
+async def run(args) -> dict:
+    service = RAGService()
+
+    async def local_embed(text, priority):
+        return embed(text).tolist()
+
+    service._embed = local_embed
+    papers = await load_papers(args.papers, args.pages)
+    results = {name: {"tokens": 0, "covered": 0, "needed": 0} for name in ("top3", "mmr")}
+    asked = 0
+    for number, (text, pages) in enumerate(papers):
+        session_id = f"paper-{number}"
+        await service.index_document(session_id, text, pages=pages)
+        for question, facts in questions():
+            asked += 1
+            top = service.index.query(
+                vector=embed(question).tolist(), top_k=3,
+                filter={"session_id": session_id}, include_metadata=True
+            )
+            contexts = {
+                "top3": "\n\n".join(match.metadata["text"] for match in top.matches),
+                "mmr": (await service.query_document(session_id, question))[0],
+            }
+            for name, context in contexts.items():
+                results[name]["tokens"] += count_tokens(context)
+                results[name]["covered"] += sum(fact in context for fact in facts)
+                results[name]["needed"] += len(facts)
+    return {
+        name: {
+            "context_tokens": round(result["tokens"] / asked, 1),
+            "fact_coverage": round(result["covered"] / result["needed"], 3),
+        }
+        for name, result in results.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval re-ranking benchmark")
+    parser.add_argument("--papers", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=8)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(f"{'strategy':8s} {'tokens/question':>16s} {'fact coverage':>14s}")
+    for name, result in results.items():
+        print(f"{name:8s} {result['context_tokens']:16.1f} {result['fact_coverage']:14.3f}")
+
+
+if __name__ == "__main__":
+    main()
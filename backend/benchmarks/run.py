@@ -0,0 +1,311 @@
+"""
+Offline end-to-end benchmark for the FastAPI backend
+
+Usage:
+    python -m benchmarks.run --concurrency 8 --requests 40 --output results.json
+    python -m benchmarks.run --compare baseline.json --output results.json
+
+Starts a fake OpenAI server (chat + embeddings) and the backend with the
+in-memory vector store, then drives upload / summarize / summarize_stream /
+ask / ask_stream workloads at a fixed concurrency. Reports throughput,
+p50/p95/p99 latency and time-to-first-token per workload, and writes the
+results as JSON so runs can be compared between commits. No API keys or
+network access are required.
+"""
+
+from typing import Awaitable, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import httpx
+
+from benchmarks.sample_pdf import build_sample_paper
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKLOADS = ["upload", "summarize", "summarize_stream", "ask", "ask_stream"]
+QUESTIONS = [
+    "What is the main contribution?",
+    "Which datasets are used in the experiments?",
+    "How does the method compare to the baseline?",
+    "What are the limitations?",
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentiles(values: List[float]) -> Optional[Dict[str, float]]:
+    """Nearest-rank percentiles in milliseconds"""
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+        return round(ordered[index] * 1000, 2)
+
+    return {
+        "p50": rank(50),
+        "p95": rank(95),
+        "p99": rank(99),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2),
+    }
+
+
+def _start(command: List[str], env: dict) -> subprocess.Popen:
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+
+async def _wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+async def _run_workload(
+    name: str,
+    requests: int,
+    concurrency: int,
+    make_request: Callable[[int], Awaitable[Optional[float]]]
+) -> dict:
+    """
+    Run `requests` calls of make_request at the given concurrency
+
+    make_request returns time-to-first-token in seconds for streaming
+    workloads and None otherwise; exceptions count as errors.
+    """
+    latencies: List[float] = []
+    ttfts: List[float] = []
+    errors: List[str] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ttft = await make_request(i)
+                latencies.append(time.perf_counter() - start)
+                if ttft is not None:
+                    ttfts.append(ttft)
+            except Exception as e:
+                errors.append(str(e))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    duration = time.perf_counter() - start
+
+    result = {
+        "requests": requests,
+        "errors": len(errors),
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration > 0 else 0.0,
+        "latency_ms": _percentiles(latencies),
+        "ttft_ms": _percentiles(ttfts),
+    }
+    if errors:
+        result["first_error"] = errors[0][:300]
+    print(f"{name:18s} {result['throughput_rps']:8.2f} req/s  "
+          f"latency={result['latency_ms']}  ttft={result['ttft_ms']}  errors={len(errors)}")
+    return result
+
+
+async def _stream_ttft(client: httpx.AsyncClient, path: str, payload: dict) -> float:
+    """POST to an SSE endpoint, read it to the end, return time to first content event"""
+    start = time.perf_counter()
+    ttft = None
+    async with client.stream("POST", path, json=payload) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[6:])
+            if event["type"] == "error":
+                raise RuntimeError(event["error"])
+            if event["type"] == "content" and ttft is None:
+                ttft = time.perf_counter() - start
+    if ttft is None:
+        raise RuntimeError("Stream produced no content")
+    return ttft
+
+
+async def run_benchmark(args) -> dict:
+    fake_port = _free_port()
+    app_port = _free_port()
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "benchmark",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{fake_port}/v1",
+        "EMBEDDING_CHECK_CTX_LENGTH": "false",
+        "PINECONE_API_KEY": "benchmark",
+        "PINECONE_ENVIRONMENT": "benchmark",
+        "VECTOR_STORE": "memory",
+        "LANGFUSE_SECRET_KEY": "",
+        "LANGFUSE_PUBLIC_KEY": "",
+    }
+    processes = [
+        _start([
+            sys.executable, "-m", "benchmarks.fake_openai",
+            "--port", str(fake_port),
+            "--latency", str(args.llm_latency),
+            "--tokens-per-second", str(args.tokens_per_second),
+            "--completion-tokens", str(args.completion_tokens),
+            "--embedding-latency", str(args.embedding_latency),
+        ], env),
+        _start([
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(app_port), "--log-level", "warning",
+        ], env),
+    ]
+
+    try:
+        await _wait_ready(f"http://127.0.0.1:{fake_port}/docs")
+        await _wait_ready(f"http://127.0.0.1:{app_port}/health")
+
+        pdf = build_sample_paper(pages=args.pages)
+        session_ids: List[str] = []
+        results = {}
+        limits = httpx.Limits(max_connections=args.concurrency * 2)
+
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{app_port}/api", timeout=300, limits=limits
+        ) as client:
+            async def upload(i: int):
+                response = await client.post(
+                    "/upload", files={"file": (f"paper-{i}.pdf", pdf, "application/pdf")}
+                )
+                response.raise_for_status()
+                session_ids.append(response.json()["session_id"])
+
+            # Uploads always run so the other workloads have sessions
+            results["upload"] = await _run_workload(
+                "upload", max(args.requests if "upload" in args.workloads else 0, args.concurrency),
+                args.concurrency, upload
+            )
+            if not session_ids:
+                raise RuntimeError(f"No uploads succeeded: {results['upload'].get('first_error')}")
+
+            def session(i: int) -> str:
+                return session_ids[i % len(session_ids)]
+
+            async def summarize(i: int):
+                # A custom prompt bypasses the summary cache
+                response = await client.post("/summarize", json={
+                    "session_id": session(i), "custom_prompt": f"Summarize the paper ({i})."
+                })
+                response.raise_for_status()
+
+            async def summarize_stream(i: int) -> float:
+                return await _stream_ttft(client, "/summarize/stream", {
+                    "session_id": session(i), "custom_prompt": f"Summarize the paper ({i})."
+                })
+
+            async def ask(i: int):
+                response = await client.post("/ask", json={
+                    "session_id": session(i), "question": QUESTIONS[i % len(QUESTIONS)]
+                })
+                response.raise_for_status()
+
+            async def ask_stream(i: int) -> float:
+                return await _stream_ttft(client, "/ask/stream", {
+                    "session_id": session(i), "question": QUESTIONS[i % len(QUESTIONS)]
+                })
+
+            workloads = {
+                "summarize": summarize,
+                "summarize_stream": summarize_stream,
+                "ask": ask,
+                "ask_stream": ask_stream,
+            }
+            for name, make_request in workloads.items():
+                if name in args.workloads:
+                    results[name] = await _run_workload(name, args.requests, args.concurrency, make_request)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = None
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "pages": args.pages,
+            "llm_latency_s": args.llm_latency,
+            "tokens_per_second": args.tokens_per_second,
+            "completion_tokens": args.completion_tokens,
+            "embedding_latency_s": args.embedding_latency,
+        },
+        "workloads": results,
+    }
+
+
+def compare(baseline: dict, current: dict):
+    """Print p50/p95/p99 latency and TTFT changes against a baseline run"""
+    print(f"\nComparison against {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    for name, result in current["workloads"].items():
+        previous = baseline.get("workloads", {}).get(name)
+        if not previous:
+            continue
+        for metric in ("latency_ms", "ttft_ms"):
+            if not result.get(metric) or not previous.get(metric):
+                continue
+            deltas = []
+            for p in ("p50", "p95", "p99"):
+                before, after = previous[metric][p], result[metric][p]
+                change = (after - before) / before * 100 if before else 0.0
+                deltas.append(f"{p} {before:.0f}->{after:.0f}ms ({change:+.1f}%)")
+            print(f"  {name:18s} {metric:10s} " + "  ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=40, help="Requests per workload")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS),
+                        help=f"Comma-separated subset of {WORKLOADS}")
+    parser.add_argument("--pages", type=int, default=8, help="Pages per sample paper")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--completion-tokens", type=int, default=200)
+    parser.add_argument("--embedding-latency", type=float, default=0.02)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    args = parser.parse_args()
+    args.workloads = [name.strip() for name in args.workloads.split(",") if name.strip()]
+
+    results = asyncio.run(run_benchmark(args))
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Synthetic academic papers as PDF bytes, for offline benchmarks
+"""
+
+from typing import Dict, List, Optional, Tuple
+import random
+
+SECTIONS = ["Introduction", "Related Work", "Method", "Experiments", "Results", "Conclusion"]
+
+VOCABULARY = (
+    "model training data attention layer network loss gradient benchmark accuracy "
+    "transformer encoder decoder embedding retrieval dataset baseline ablation "
+    "performance evaluation parameter optimization representation contrastive"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(VOCABULARY) for _ in range(rng.randint(8, 16))]
+    return " ".join(words).capitalize() + "."
+
+
+def _paper_lines(
+    title: str,
+    pages: int,
+    seed: int,
+    facts: Optional[Dict[str, List[str]]] = None,
+    running_header: Optional[str] = None
+) -> List[List[Tuple[int, str]]]:
+    """Lay out a paper as pages of (font size, line) pairs"""
+    facts = facts or {}
+    rng = random.Random(seed)
+    lines: List[Tuple[int, str]] = [
+        (17, title),
+        (11, "Alice Kim, Bob Lee, Carol Park"),
+        (12, "Abstract"),
+    ]
+    lines += [(10, _sentence(rng)) for _ in range(6)]
+    body_pages = max(pages - 1, 1)
+    for number, section in enumerate(SECTIONS, start=1):
+        lines.append((12, f"{number} {section}"))
+        body = [(10, _sentence(rng)) for _ in range(body_pages * 40 // len(SECTIONS))]
+        # Facts go mid-section so retrieval has to find them among filler
+        middle = len(body) // 2
+        body[middle:middle] = [(10, fact) for fact in facts.get(section, [])]
+        lines += body
+    lines.append((12, "References"))
+    lines += [(9, f"[{i}] A. Author. {_sentence(rng)} In Proceedings, 2020.") for i in range(1, 25)]
+
+    per_page = 48
+    page_lines = [lines[i:i + per_page] for i in range(0, len(lines), per_page)]
+    if running_header:
+        # Header and page-number footer on every page, as conference templates add
+        page_lines = [
+            [(8, running_header)] + page + [(8, f"Page {number} of {len(page_lines)}")]
+            for number, page in enumerate(page_lines, start=1)
+        ]
+    return page_lines
+
+
+def build_sample_paper(
+    title: str = "A Study of Efficient Retrieval",
+    pages: int = 8,
+    seed: int = 0,
+    facts: Optional[Dict[str, List[str]]] = None,
+    running_header: Optional[str] = None
+) -> bytes:
+    """
+    Build a multi-page paper PDF with title, abstract, sections and references
+
+    Args:
+        title: Paper title
+        pages: Approximate number of pages
+        seed: Random seed for the body text
+        facts: Sentences to place in the middle of named sections (from SECTIONS)
+        running_header: Header line repeated on every page, with a page-number footer
+
+    Returns:
+        PDF file content
+    """
+    page_lines = _paper_lines(title, pages, seed, facts, running_header)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_numbers = []
+    for lines in page_lines:
+        y = 760
+        content = []
+        for size, text in lines:
+            content.append(f"BT /F1 {size} Tf 72 {y} Td ({_escape(text)}) Tj ET")
+            y -= 15
+        stream = "\n".join(content).encode("latin-1")
+        objects.append(b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream")
+        content_number = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_number} 0 R >>".encode()
+        )
+        page_numbers.append(len(objects))
+    kids = " ".join(f"{number} 0 R" for number in page_numbers)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_numbers)} >>".encode()
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        pdf += f"{offset:010d} 00000 n \n".encode()
+    pdf += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return pdf
@@ -0,0 +1,110 @@
+"""
+Memory held by in-memory paper sessions
+
+Usage:
+    python -m benchmarks.sessions --sessions 5000 --pages 12
+
+Creates thousands of sessions in one process, once as the previous Pydantic
+SessionData model holding the full text and once as the compact
+SessionRecord with compressed text, and reports the traced memory per
+session and the cost of reading a session's text back. The synthetic
+sample text has a small vocabulary and compresses better than real papers
+(typically 3-4x). No API keys or network access are required.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+from pydantic import BaseModel
+
+from benchmarks.sample_pdf import build_sample_paper
+from app.services.pdf_parser import PDFParser
+from app.services.session_manager import SessionRecord
+
+
+class LegacySessionData(BaseModel):
+    """The session model used before SessionRecord"""
+    session_id: str
+    filename: str
+    text: str
+    pdf_path: Optional[str] = None
+    title: Optional[str] = None
+    authors: Optional[str] = None
+    year: Optional[str] = None
+    summary: Optional[str] = None
+    storyline: Optional[str] = None
+    rating: Optional[str] = None
+    evaluations: Dict[str, Dict[str, Any]] = {}
+    created_at: datetime
+
+
+def sample_texts(count: int, pages: int):
+    texts = []
+    for seed in range(count):
+        extracted = asyncio.run(PDFParser.extract_pages(build_sample_paper(pages=pages, seed=seed)))
+        texts.append(PDFParser.clean_text(PDFParser.join_pages(extracted)))
+    return texts
+
+
+def measure(factory, texts, sessions: int) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    records = {}
+    start = time.perf_counter()
+    for number in range(sessions):
+        # A fresh string per session, as every upload has its own text
+        text = f"{number}\n" + texts[number % len(texts)]
+        session_id = f"{number:08d}"
+        records[session_id] = factory(session_id, text)
+        del text
+    create_ms = (time.perf_counter() - start) / sessions * 1000
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for record in list(records.values())[:200]:
+        record.text
+    read_ms = (time.perf_counter() - start) / min(sessions, 200) * 1000
+    return {
+        "bytes": current,
+        "peak_bytes": peak,
+        "create_ms": round(create_ms, 3),
+        "read_text_ms": round(read_ms, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session memory benchmark")
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--pages", type=int, default=12)
+    parser.add_argument("--distinct-papers", type=int, default=8)
+    args = parser.parse_args()
+
+    texts = sample_texts(args.distinct_papers, args.pages)
+    average = sum(len(text) for text in texts) / len(texts)
+    results = {
+        "SessionData (pydantic)": measure(
+            lambda session_id, text: LegacySessionData(
+                session_id=session_id, filename="paper.pdf", text=text, created_at=datetime.now()
+            ),
+            texts, args.sessions
+        ),
+        "SessionRecord": measure(
+            lambda session_id, text: SessionRecord(session_id=session_id, filename="paper.pdf", text=text),
+            texts, args.sessions
+        ),
+    }
+
+    print(f"sessions={args.sessions} average text={average / 1024:.1f} KiB")
+    for name, result in results.items():
+        print(f"{name:24s} {result['bytes'] / 2**20:8.1f} MiB "
+              f"({result['bytes'] / args.sessions / 1024:6.1f} KiB/session)  "
+              f"create {result['create_ms']:.3f} ms  read text {result['read_text_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Batched question retrieval test
+
+Usage:
+    python test_ask_batch.py
+
+This script verifies that:
+1. RAGService.retrieve_batch embeds all questions in one request
+2. Its results match retrieving each question on its own
+No API keys are required (a local bag-of-words embedding is used).
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from benchmarks.chunking import FACTS, embed, load_papers
+from app.services.rag_service import RAGService
+
+QUESTIONS = [question for _, _, question in FACTS] + ["What is the title of the paper?"]
+
+
+def test_retrieve_batch_matches_single():
+    async def run():
+        service = RAGService()
+        calls = {"single": 0, "batch": 0}
+
+        async def local_embed(text, priority):
+            calls["single"] += 1
+            return embed(text).tolist()
+
+        async def local_embed_many(texts, priority):
+            calls["batch"] += 1
+            return [embed(text).tolist() for text in texts]
+
+        service._embed = local_embed
+        service._embed_many = local_embed_many
+        (text, pages), = await load_papers(1, 8)
+        await service.index_document("s1", text, pages=pages)
+        calls["single"] = 0
+
+        batch = await service.retrieve_batch("s1", QUESTIONS)
+        assert calls == {"single": 0, "batch": 1}, calls
+        single = [await service.retrieve_chunks("s1", question) for question in QUESTIONS]
+        assert batch == single
+
+    asyncio.run(run())
+    print(f"✅ {len(QUESTIONS)} questions retrieved with one embedding request")
+
+
+if __name__ == "__main__":
+    test_retrieve_batch_matches_single()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Batch upload test
+
+Usage:
+    python test_batch_upload.py
+
+This script verifies that:
+1. Zip archives are staged as their PDF members only, never at member paths
+2. Extraction stops at batch_upload_max_files PDF members
+3. Embedding requests from concurrent papers are coalesced into shared batches
+No API keys are required.
+"""
+
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from app.config import settings
+from app.services.batch_ingestor import BatchIngestor, BatchUploadJob
+from app.services.embedding_batcher import EmbeddingBatcher
+
+
+def test_zip_staging():
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("proceedings/a.pdf", b"%PDF-a")
+        zf.writestr("../../escape.pdf", b"%PDF-b")
+        zf.writestr("__MACOSX/proceedings/._a.pdf", b"junk")
+        zf.writestr("proceedings/README.txt", b"text")
+
+    async def run():
+        job = BatchUploadJob()
+        with tempfile.TemporaryDirectory() as directory:
+            job.staging_dir = directory
+            archive.seek(0)
+            await BatchIngestor()._stage_zip(job, "batch.zip", archive)
+            names = [entry["filename"] for entry in job.files]
+            assert names == ["batch.zip/proceedings/a.pdf", "batch.zip/../../escape.pdf"], names
+            for entry in job.files:
+                assert os.path.dirname(entry["path"]) == directory
+                assert entry["status"] == "queued"
+            assert sorted(os.listdir(directory)) == ["00000.pdf", "00001.pdf"]
+
+    asyncio.run(run())
+    print("✅ Zip members staged inside the staging directory")
+
+
+def test_zip_extraction_capped():
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for number in range(10):
+            zf.writestr(f"paper{number}.pdf", b"%PDF-" + bytes([number]))
+
+    async def run():
+        job = BatchUploadJob()
+        with tempfile.TemporaryDirectory() as directory:
+            job.staging_dir = directory
+            archive.seek(0)
+            await BatchIngestor()._stage_zip(job, "batch.zip", archive)
+            assert len(os.listdir(directory)) == 3
+            assert job.count("queued") == 3 and job.count("skipped") == 1
+            assert "7 PDF files not extracted" in job.files[-1]["error"]
+
+    previous = settings.batch_upload_max_files
+    settings.batch_upload_max_files = 3
+    try:
+        asyncio.run(run())
+    finally:
+        settings.batch_upload_max_files = previous
+    print("✅ Zip extraction stopped at batch_upload_max_files")
+
+
+def test_embedding_batches_are_shared():
+    requests = []
+
+    async def embed_many(texts, priority):
+        requests.append(len(texts))
+        return [[float(len(text))] for text in texts]
+
+    async def run():
+        batcher = EmbeddingBatcher(embed_many, batch_size=50, linger=0.01)
+        papers = [[f"paper {p} chunk {c}" for c in range(30)] for p in range(5)]
+        results = await asyncio.gather(*(batcher.embed(texts) for texts in papers))
+        for texts, vectors in zip(papers, results):
+            assert vectors == [[float(len(text))] for text in texts]
+
+    asyncio.run(run())
+    assert requests == [50, 50, 50], requests
+    print(f"✅ 150 chunks from 5 papers embedded in {len(requests)} requests")
+
+
+if __name__ == "__main__":
+    test_zip_staging()
+    test_zip_extraction_capped()
+    test_embedding_batches_are_shared()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Text cleaning test
+
+Usage:
+    python test_clean_text.py
+
+This script verifies that:
+1. Whitespace is collapsed, paragraph breaks are kept and words hyphenated
+   at line breaks are joined; cleaning is idempotent
+2. Running headers and page-number footers are stripped from parsed text
+3. The section chunker cuts on paragraph breaks instead of mid-paragraph
+4. Page citations still line up after hyphenated words are joined
+5. Hyphenated compounds broken across lines keep their hyphen
+6. Cleaning keeps up with the previous split/join implementation
+No API keys are required.
+"""
+
+import asyncio
+import os
+import sys
+import textwrap
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from benchmarks.clean_text import legacy_clean, synthetic_text
+from benchmarks.sample_pdf import build_sample_paper
+from app.services.index_filter import locate_pages
+from app.services.pdf_parser import PDFParser
+from app.services.section_chunker import SectionChunker
+
+
+def test_normalization():
+    clean = PDFParser.clean_text
+    assert clean("  a  b\t c\n   d  ") == "a b c d"
+    assert clean("First line\nwraps here.\n \n\t\nSecond paragraph.") == "First line wraps here.\n\nSecond paragraph."
+    assert clean("exam-\nple, Foo-\nBar, 2-\n3") == "example, Foo- Bar, 2- 3"
+    assert clean("one\r\ntwo\r\n\r\nthree\rfour") == "one two\n\nthree four"
+    assert clean("") == "" and clean("\n \n") == ""
+    text = synthetic_text(0.2)
+    assert clean(clean(text)) == clean(text)
+    print("✅ Whitespace collapsed, paragraphs kept, hyphenation joined")
+
+
+def test_headers_stripped():
+    pdf = build_sample_paper(pages=6, running_header="Preprint under review at ExampleConf")
+    pages = asyncio.run(PDFParser.extract_pages(pdf))
+    text = PDFParser.clean_pages(pages)
+    assert "ExampleConf" not in text and "Page 3 of" not in text
+    assert "ExampleConf" in PDFParser.clean_text(PDFParser.join_pages(pages))
+    print("✅ Running headers and footers stripped")
+
+
+def test_chunks_end_on_paragraphs():
+    paragraphs = [
+        " ".join(f"Paragraph {number} sentence {sentence} about retrieval." for sentence in range(12))
+        for number in range(12)
+    ]
+    # Extractor output: wrapped lines, blank lines between paragraphs
+    raw = "\n\n".join("\n".join(textwrap.wrap(paragraph, 70)) for paragraph in paragraphs)
+    text = PDFParser.clean_text(raw)
+    assert text.split("\n\n") == paragraphs
+
+    chunks = SectionChunker(chunk_size=1200, chunk_overlap=100).split(text)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.text.startswith("Paragraph") and chunk.text.endswith("retrieval."), chunk.text[-40:]
+    print(f"✅ {len(chunks)} chunks, all cut on paragraph breaks")
+
+
+def test_pages_located_after_dehyphenation():
+    pages = [
+        "Introduction\nThe first page ends with a hyphen-\nated word and a long sen-",
+        "tence continues on the second page.\n\nA new paragraph starts here.",
+        "The third page closes the paper.",
+    ]
+    text = PDFParser.clean_text(PDFParser.join_pages(pages))
+    assert "hyphenated" in text and "sentence continues" in text
+    pieces = ["The first page", "continues on the second", "A new paragraph", "third page closes"]
+    assert locate_pages(text, pieces, pages) == [1, 2, 2, 3]
+    print("✅ Page citations survive de-hyphenation")
+
+
+def test_compounds_keep_hyphen():
+    clean = PDFParser.clean_text
+    assert clean("We use self-\nattention.") == "We use self-attention."
+    assert clean("a state-of-\nthe-art model") == "a state-of-the-art model"
+    assert clean("a state-\nof-the-art model") == "a state-of-the-art model"
+    assert clean("end-to-\nend training") == "end-to-end training"
+    assert clean("(non-\nlinear) and zero-\nshot") == "(non-linear) and zero-shot"
+    # Hyphenated elsewhere in the text: a compound, not a word split by the line break
+    assert clean("Multi-head attention.\nEach multi-\nhead layer") == "Multi-head attention. Each multi-head layer"
+    assert clean("Each multi-\nhead layer") == "Each multihead layer"
+    assert clean("the hyphen-\nated word, pre-\nsent") == "the hyphenated word, present"
+    print("✅ Hyphenated compounds keep their hyphen")
+
+
+def test_throughput():
+    text = synthetic_text(4)
+    timings = {}
+    for name, clean in (("legacy", legacy_clean), ("clean_text", PDFParser.clean_text)):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            clean(text)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    # Same order of cost as a C-level split/join, despite keeping paragraphs
+    assert timings["clean_text"] < 3 * timings["legacy"], timings
+    print(f"✅ clean_text {len(text) / 1e6 / timings['clean_text']:.0f} MB/s "
+          f"(legacy {len(text) / 1e6 / timings['legacy']:.0f} MB/s)")
+
+
+if __name__ == "__main__":
+    test_normalization()
+    test_headers_stripped()
+    test_chunks_end_on_paragraphs()
+    test_pages_located_after_dehyphenation()
+    test_compounds_keep_hyphen()
+    test_throughput()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Conversation thread test
+
+Usage:
+    python test_conversation.py
+
+This script verifies that:
+1. Questions referring back without a topic of their own count as follow-ups;
+   short questions about a new topic do not
+2. Follow-ups reuse the previous turn's chunks without any retrieval call;
+   new topics get their own chunks
+3. Threads expire after the TTL and are bounded in number; invalid
+   WebSocket messages get an error frame instead of closing the socket
+4. Turns beyond the recent window are folded into the rolling summary
+No API keys are required (retrieval and the summary call are replaced locally).
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.services import conversation
+from app.services.conversation import ConversationManager, is_follow_up
+from app.services.session_manager import session_manager
+
+
+def test_is_follow_up():
+    assert is_follow_up("Why?")
+    assert is_follow_up("Can you explain that in more detail?")
+    assert is_follow_up("Why is that?")
+    assert not is_follow_up("What datasets were used in the experiments?")
+    for question in (
+        "What is the main contribution of this paper?",
+        "What datasets do they evaluate on?",
+        "Why did the authors choose ResNet-50 as backbone?",
+        "Explain the loss function",
+        "How does it compare to BERT on GLUE?",
+    ):
+        assert not is_follow_up(question), question
+    assert not is_follow_up(
+        "How does this method compare with the transformer baselines on the "
+        "three long-document benchmarks reported in the evaluation section?"
+    )
+    print("✅ Follow-up detection")
+
+
+class _FakeRAG:
+    """Questions about the method hit chunks 3 and 4, anything else 8 and 9"""
+
+    def __init__(self):
+        self.queries = []
+
+    async def retrieve_chunks(self, session_id, question, top_k=None):
+        self.queries.append(question)
+        indices = (3, 4) if "method" in question else (8, 9)
+        return [(index, f"chunk {index}") for index in indices], []
+
+    async def get_chunks(self, session_id, chunk_indices):
+        raise AssertionError("reused chunks must not be fetched from the index")
+
+    def format_context(self, chunks, citations=None):
+        return "\n\n".join(text for _, text in chunks), [f"Chunk {index}" for index, _ in chunks]
+
+
+class _FakeLLM:
+    async def summarize_conversation(self, previous_summary, exchanges, model=None):
+        return (previous_summary + " " + " ".join(q for q, _ in exchanges)).strip()
+
+
+def test_follow_up_reuses_chunks():
+    async def run():
+        rag = _FakeRAG()
+        conversation.rag_service = rag
+        manager = ConversationManager()
+        thread = manager.create_thread("s1")
+
+        first = await manager.prepare_turn(thread, "What method does the paper propose?")
+        manager.record_turn(thread, "What method does the paper propose?", "A retriever.", first.chunks)
+        second = await manager.prepare_turn(thread, "Why is that?")
+
+        assert not first.reused and second.reused
+        assert second.chunks == ((3, "chunk 3"), (4, "chunk 4")) and len(rag.queries) == 1
+        assert [m["role"] for m in second.history] == ["user", "assistant"]
+        manager.record_turn(thread, "Why is that?", "Because.", second.chunks)
+
+        # Short questions about a new topic are retrieved on their own
+        for question in ("What datasets do they evaluate on?", "Explain the loss function"):
+            turn = await manager.prepare_turn(thread, question)
+            assert not turn.reused and turn.chunks[0][0] == 8 and rag.queries[-1] == question
+            manager.record_turn(thread, question, "Answer.", turn.chunks)
+        turn = await manager.prepare_turn(thread, "Can you explain that in more detail?")
+        assert turn.reused and turn.chunks[0][0] == 8 and len(rag.queries) == 3
+
+    original = conversation.rag_service
+    try:
+        asyncio.run(run())
+    finally:
+        conversation.rag_service = original
+    print("✅ Follow-ups reuse the previous chunks without retrieval; new topics are retrieved")
+
+
+def test_thread_limits():
+    previous = settings.conversation_max_threads, settings.conversation_thread_ttl_seconds
+    settings.conversation_max_threads, settings.conversation_thread_ttl_seconds = 3, 60
+    try:
+        manager = ConversationManager()
+        threads = [manager.create_thread("s1") for _ in range(3)]
+        manager.get_thread(threads[0].thread_id)  # most recently used now
+        manager.create_thread("s1")
+        assert manager.get_thread(threads[1].thread_id) is None
+        assert manager.get_thread(threads[0].thread_id) is threads[0]
+
+        threads[2].last_used -= 120
+        assert manager.get_thread(threads[2].thread_id) is None
+        assert len(manager._threads) == 2
+    finally:
+        settings.conversation_max_threads, settings.conversation_thread_ttl_seconds = previous
+    print("✅ Threads expire and are bounded")
+
+
+def test_websocket_rejects_bad_messages():
+    session_id = session_manager.create_session("paper.pdf", "text")
+    try:
+        with TestClient(app).websocket_connect(f"/api/ask/ws/{session_id}") as websocket:
+            assert websocket.receive_json()["type"] == "thread"
+            for send in (
+                lambda: websocket.send_text("not json"),
+                lambda: websocket.send_json(["a", "list"]),
+                lambda: websocket.send_json({"question": 42}),
+                lambda: websocket.send_json({"question": "Why?", "model": ["x"]}),
+            ):
+                send()
+                assert websocket.receive_json()["type"] == "error"
+    finally:
+        session_manager.delete_session(session_id)
+    print("✅ Invalid WebSocket messages answered with error frames")
+
+
+def test_rolling_summary():
+    async def run():
+        conversation.rag_service = _FakeRAG()
+        conversation.llm_service = _FakeLLM()
+        manager = ConversationManager()
+        thread = manager.create_thread("s1")
+        total = settings.conversation_recent_turns + 2
+        for number in range(total):
+            manager.record_turn(thread, f"q{number}", f"a{number}", ((number, f"chunk {number}"),))
+        await asyncio.gather(*manager._tasks)
+
+        assert len(thread.turns) == settings.conversation_recent_turns
+        assert thread.summarized_turns == 2 and thread.summary == "q0 q1"
+        history = manager._history(thread)
+        assert history[0]["role"] == "system" and "q0 q1" in history[0]["content"]
+        assert len(history) == 1 + 2 * settings.conversation_recent_turns
+
+    originals = conversation.rag_service, conversation.llm_service
+    try:
+        asyncio.run(run())
+    finally:
+        conversation.rag_service, conversation.llm_service = originals
+    print("✅ Old turns folded into the rolling summary")
+
+
+if __name__ == "__main__":
+    test_is_follow_up()
+    test_follow_up_reuses_chunks()
+    test_thread_limits()
+    test_websocket_rejects_bad_messages()
+    test_rolling_summary()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Library-wide search test
+
+Usage:
+    python test_library_search.py
+
+This script verifies that:
+1. Chunks carry the page they start on
+2. Library search shortlists the right paper and cites the fact's page
+3. Deleting a session removes it from the paper-level index
+4. Paper vectors survive a restart and related papers need no embedding calls
+No API keys are required (a local bag-of-words embedding is used).
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from benchmarks.chunking import embed
+from benchmarks.sample_pdf import build_sample_paper
+from app.services.paper_index import PaperIndex
+from app.services.pdf_parser import PDFParser
+from app.services.rag_service import RAGService
+
+TOPICS = ["holography", "seismology", "ornithology", "viticulture", "glaciology", "numismatics"]
+
+
+def _fact(topic: str) -> str:
+    return f"The {topic} objective uses a temperature of {len(topic) / 10} in every {topic} experiment."
+
+
+async def _library():
+    service = RAGService()
+
+    async def local_embed(text, priority):
+        return embed(text).tolist()
+
+    service._embed = local_embed
+    pages_by_session = {}
+    for number, topic in enumerate(TOPICS):
+        pdf = build_sample_paper(
+            title=f"Scaling {topic.title()} Models",
+            seed=number,
+            facts={"Experiments": [_fact(topic)]}
+        )
+        pages = await PDFParser.extract_pages(pdf)
+        text = PDFParser.clean_text(PDFParser.join_pages(pages))
+        await service.index_document(topic, text, pages=pages)
+        pages_by_session[topic] = pages
+    return service, pages_by_session
+
+
+def test_library_search_cites_paper_and_page():
+    async def run():
+        service, pages_by_session = await _library()
+        assert len(service.paper_index) == len(TOPICS)
+
+        for topic in TOPICS:
+            chunks = await service.retrieve_library(
+                f"What temperature does the {topic} objective use in {topic} experiments?",
+                top_papers=2
+            )
+            hit = next(chunk for chunk in chunks if _fact(topic) in chunk["text"])
+            assert hit["session_id"] == topic
+            page_text = " ".join(pages_by_session[topic][hit["page"] - 1].split())
+            assert " ".join(hit["text"].split())[:40] in page_text
+
+        service.delete_session_vectors("seismology")
+        assert "seismology" not in service.paper_index and len(service.paper_index) == len(TOPICS) - 1
+        chunks = await service.retrieve_library("seismology objective temperature", top_papers=len(TOPICS))
+        assert all(chunk["session_id"] != "seismology" for chunk in chunks)
+
+    asyncio.run(run())
+    print("✅ Library search cites the right paper and page")
+
+
+def test_scope_to_sessions():
+    async def run():
+        service, _ = await _library()
+        chunks = await service.retrieve_library(
+            "What temperature does the glaciology objective use?", session_ids=["holography", "seismology"]
+        )
+        assert chunks and {chunk["session_id"] for chunk in chunks} <= {"holography", "seismology"}
+
+    asyncio.run(run())
+    print("✅ Library search respects the session scope")
+
+
+def test_paper_index_persistence():
+    vectors = np.random.default_rng(0).standard_normal((300, 64)).astype(np.float32)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "papers.jsonl")
+        index = PaperIndex(path)
+        for number, vector in enumerate(vectors):
+            index.add(f"p{number}", vector)
+        for number in range(0, 300, 2):
+            index.remove(f"p{number}")
+        index.add("p1", -vectors[1])  # replaces p1
+        expected = index.search(vectors[7], 5, exclude=["p7"])
+
+        reopened = PaperIndex(path)
+        assert len(reopened) == 150 and "p0" not in reopened
+        assert np.allclose(reopened.get("p1"), -vectors[1] / np.linalg.norm(vectors[1]), atol=1e-6)
+        assert reopened.search(vectors[7], 5, exclude=["p7"]) == expected
+        # Replaying 452 records for 150 papers compacts the log
+        with open(path) as f:
+            assert sum(1 for _ in f) == 150
+
+        start = time.perf_counter()
+        for number in range(1, 300, 2):
+            reopened.search(reopened.get(f"p{number}"), 5, exclude=[f"p{number}"])
+        elapsed_ms = (time.perf_counter() - start) / 150 * 1000
+    assert elapsed_ms < 5, elapsed_ms
+    print(f"✅ Paper vectors persisted; related-paper lookup {elapsed_ms:.3f} ms")
+
+
+def test_related_papers():
+    async def run():
+        service, _ = await _library()
+        calls = []
+
+        async def no_embed(text, priority):
+            calls.append(text)
+            raise AssertionError("related papers must not embed")
+
+        service._embed = no_embed
+        related = service.related_papers("holography", limit=3)
+        assert len(related) == 3 and all(paper != "holography" for paper, _ in related)
+        assert [score for _, score in related] == sorted((score for _, score in related), reverse=True)
+        assert service.related_papers("holography", session_ids=["glaciology"])[0][0] == "glaciology"
+        assert service.related_papers("missing") == [] and not calls
+
+    asyncio.run(run())
+    print("✅ Related papers from stored vectors")
+
+
+if __name__ == "__main__":
+    test_library_search_cites_paper_and_page()
+    test_scope_to_sessions()
+    test_paper_index_persistence()
+    test_related_papers()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Accuracy and speed check for local (heuristic) metadata extraction
+
+Usage:
+    python test_metadata_extraction.py
+
+Builds small PDFs from the labeled cases in fixtures/metadata/cases.json,
+runs MetadataExtractor on each, and reports per-field accuracy, how many
+uploads would still need the LLM fallback, and extraction time per document.
+Author lists must match exactly, and layout authors guessed from names set
+side by side or from stray name-like lines stay below the LLM threshold.
+No API keys are required.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.metadata_extractor import metadata_extractor
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "metadata", "cases.json")
+
+# Matches the default Settings.metadata_confidence_threshold
+THRESHOLD = 0.6
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(lines, info) -> bytes:
+    """Build a one-page PDF with one text line per (font size, text) pair"""
+    y = 760
+    content = []
+    for size, text in lines:
+        content.append(f"BT /F1 {size} Tf 72 {y} Td ({_escape(text)}) Tj ET")
+        y -= int(size * 1.6)
+    stream = "\n".join(content).encode("latin-1")
+
+    info_entries = " ".join(f"{key} ({_escape(value)})" for key, value in info.items())
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+        f"<< {info_entries} >>".encode("latin-1"),
+    ]
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        pdf += f"{offset:010d} 00000 n \n".encode()
+    pdf += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info 6 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return pdf
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def test_metadata_extraction():
+    """Local extraction is accurate when confident and fast enough to skip the LLM"""
+    with open(FIXTURES) as f:
+        cases = json.load(f)
+
+    correct = {"title": 0, "authors": 0, "year": 0}
+    labeled = {"title": 0, "authors": 0, "year": 0}
+    wrong_but_confident = []
+    llm_fallbacks = 0
+    elapsed = 0.0
+
+    for case in cases:
+        pdf = build_pdf(case["lines"], case["info"])
+        start = time.perf_counter()
+        result = metadata_extractor.extract(pdf, case["filename"])
+        elapsed += time.perf_counter() - start
+
+        confidence = result["confidence"]
+        if any(confidence[field] < THRESHOLD for field in correct):
+            llm_fallbacks += 1
+
+        for field, expected in case["expected"].items():
+            if expected is None:
+                # Unlabeled fields must not be reported with high confidence
+                if confidence[field] >= THRESHOLD:
+                    wrong_but_confident.append((case["name"], field, result[field]))
+                continue
+            labeled[field] += 1
+            if field == "authors":
+                ok = result["authors"] == ", ".join(expected)
+            else:
+                ok = _normalize(result[field]) == _normalize(expected)
+            if ok:
+                correct[field] += 1
+            elif confidence[field] >= THRESHOLD:
+                wrong_but_confident.append((case["name"], field, result[field]))
+
+        print(f"{case['name']:45s} {result['title'][:40]!r:45s} {result['year']:8s} {confidence}")
+
+    print()
+    for field in correct:
+        print(f"{field:8s} accuracy: {correct[field]}/{labeled[field]}")
+    print(f"LLM fallbacks: {llm_fallbacks}/{len(cases)}")
+    print(f"Average extraction time: {elapsed / len(cases) * 1000:.2f} ms/document")
+
+    assert not wrong_but_confident, f"Confident but wrong: {wrong_but_confident}"
+    for field in correct:
+        assert correct[field] >= 0.8 * labeled[field], f"{field} accuracy too low"
+
+
+def test_author_confidence():
+    """Layout authors are only confident when the evidence supports them"""
+    with open(FIXTURES) as f:
+        cases = {case["name"]: case for case in json.load(f)}
+
+    confident = ["arxiv_filename_and_layout", "venue_line_year", "creation_date_year_with_affiliation_lines"]
+    for name in confident:
+        case = cases[name]
+        result = metadata_extractor.extract(build_pdf(case["lines"], case["info"]), case["filename"])
+        assert result["confidence"]["authors"] >= THRESHOLD, (name, result["confidence"])
+
+    case = cases["names_side_by_side_without_separators"]
+    result = metadata_extractor.extract(build_pdf(case["lines"], case["info"]), case["filename"])
+    assert result["authors"] == "Dzmitry Bahdanau, Kyunghyun Cho, Yoshua Bengio"
+    assert result["confidence"]["authors"] < THRESHOLD
+
+    case = cases["unknown_institution_on_its_own_line"]
+    result = metadata_extractor.extract(build_pdf(case["lines"], case["info"]), case["filename"])
+    assert result["confidence"]["authors"] < THRESHOLD
+    print("✅ Guessed author lists fall back to the LLM")
+
+
+if __name__ == "__main__":
+    test_metadata_extraction()
+    test_author_confidence()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Metrics labelling test
+
+Usage:
+    python test_metrics.py
+
+This script verifies that:
+1. Requests are labelled with their route template, ids collapsed
+2. Paths no route matches share one endpoint label
+No API keys are required.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from app.main import app
+from app.services.metrics import MetricsMiddleware, UNMATCHED_ENDPOINT
+
+
+def _label(path: str, method: str = "GET") -> str:
+    scope = {"type": "http", "app": app, "path": path, "method": method, "root_path": "", "headers": []}
+    return MetricsMiddleware._route_template(scope)
+
+
+def test_endpoint_labels():
+    assert _label("/api/session/0b1c2d3e-4f50-4a6b-8c9d-0e1f2a3b4c5d") == "/api/session/{session_id}"
+    # Wrong method: still the route's template
+    assert _label("/api/session/0b1c2d3e-4f50-4a6b-8c9d-0e1f2a3b4c5d", "PATCH") == "/api/session/{session_id}"
+    labels = {_label(path) for path in ("/wp-login.php", "/.env", "/api/nope/123", "/x" * 50)}
+    assert labels == {UNMATCHED_ENDPOINT}
+    print("✅ Route templates as labels; unmatched paths share one label")
+
+
+if __name__ == "__main__":
+    test_endpoint_labels()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Parse cache test
+
+Usage:
+    python test_parse_cache.py
+
+This script verifies that:
+1. A PDF is parsed once; the cached result matches and loads much faster
+2. A parser version change invalidates cached results
+3. Sessions are restored from stored PDFs and their cached parse results;
+   PDFs without a current cache entry are parsed again
+No API keys are required.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from benchmarks.sample_pdf import build_sample_paper
+from app.services import parse_cache
+from app.services.parse_cache import parse_pdf_cached, restore_sessions
+from app.services.session_manager import session_manager
+
+
+def _write(path: str, content: bytes):
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def test_parse_once():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "paper.pdf")
+        _write(path, build_sample_paper(pages=24, seed=2))
+        cache = os.path.join(directory, "parsed")
+
+        start = time.perf_counter()
+        parsed = parse_pdf_cached(path, "paper.pdf", cache)
+        parse_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        cached = parse_pdf_cached(path, "paper.pdf", cache)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        assert not parsed["cached"] and cached["cached"]
+        for key in ("pages", "text", "sections", "metadata", "content_hash"):
+            assert cached[key] == parsed[key], key
+        assert parsed["sections"] and len(os.listdir(cache)) == 1
+        stored = os.path.getsize(os.path.join(cache, os.listdir(cache)[0]))
+        assert stored < len(parsed["text"]) / 2
+        assert load_ms < parse_ms / 5, (load_ms, parse_ms)
+
+        original = parse_cache.PARSER_VERSION
+        parse_cache.PARSER_VERSION = original + 1
+        try:
+            assert not parse_pdf_cached(path, "paper.pdf", cache)["cached"]
+        finally:
+            parse_cache.PARSER_VERSION = original
+    print(f"✅ Parsed in {parse_ms:.0f} ms, loaded from cache in {load_ms:.1f} ms ({stored} bytes)")
+
+
+def test_restore_sessions():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = os.path.join(directory, "parsed")
+        session_id, stale_id, uncached_id = str(uuid.uuid4()), str(uuid.uuid4()), str(uuid.uuid4())
+        source = os.path.join(directory, "upload.pdf")
+        _write(source, build_sample_paper(title="Restorable Paper", seed=4))
+        parsed = parse_pdf_cached(source, "restorable.pdf", cache)
+        shutil.move(source, os.path.join(directory, f"{session_id}.pdf"))
+        _write(os.path.join(directory, f"{uncached_id}.pdf"), build_sample_paper(seed=5))
+
+        # Cached by an older parser version
+        source = os.path.join(directory, "stale.pdf")
+        _write(source, build_sample_paper(title="Stale Paper", seed=6))
+        original = parse_cache.PARSER_VERSION
+        parse_cache.PARSER_VERSION = original - 1
+        try:
+            parse_pdf_cached(source, "stale.pdf", cache)
+        finally:
+            parse_cache.PARSER_VERSION = original
+        shutil.move(source, os.path.join(directory, f"{stale_id}.pdf"))
+
+        try:
+            assert restore_sessions(directory, cache) == 3
+            session = session_manager.get_session(session_id, touch=False)
+            assert session.text == parsed["text"] and session.filename == "restorable.pdf"
+            assert session.title == "Restorable Paper" and session.content_hash == parsed["content_hash"]
+            assert session_manager.get_pdf_path(session_id)
+            stale = session_manager.get_session(stale_id, touch=False)
+            assert stale.title == "Stale Paper" and stale.filename == "stale.pdf"
+            assert parse_cache.load_parsed(stale.content_hash, cache) is not None
+            assert session_manager.get_session(uncached_id, touch=False).filename == f"{uncached_id}.pdf"
+            assert restore_sessions(directory, cache) == 0
+        finally:
+            for restored_id in (session_id, stale_id, uncached_id):
+                session_manager.delete_session(restored_id)
+    print("✅ Sessions restored from stored PDFs, stale cache entries re-parsed")
+
+
+if __name__ == "__main__":
+    test_parse_once()
+    test_restore_sessions()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Quantized (int8) vector index test
+
+Usage:
+    python test_quantized_index.py
+
+This script verifies that:
+1. Quantized search with float32 rescoring matches exact search
+2. Vectors, metadata and deletes survive reopening the index
+3. Compaction drops deleted rows and keeps results unchanged
+4. Zero-vector metadata lookups return matching rows, as with InMemoryIndex
+No API keys are required.
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.vector_store import InMemoryIndex, QuantizedIndex, quantize
+
+
+def _vectors(count: int, dimension: int = 64, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+
+
+def _upsert(index, vectors: np.ndarray, session_id: str = "s1", offset: int = 0):
+    index.upsert([
+        {
+            "id": f"{session_id}_{offset + i}",
+            "values": vector.tolist(),
+            "metadata": {"session_id": session_id, "chunk_index": offset + i}
+        }
+        for i, vector in enumerate(vectors)
+    ])
+
+
+def test_quantization_error_is_small():
+    """Dequantized vectors stay within half a quantization step"""
+    vectors = _vectors(100)
+    codes, scales = quantize(vectors)
+    error = np.abs(codes * scales[:, None] - vectors).max(axis=1)
+    assert np.all(error <= scales / 2 + 1e-6)
+    print(f"✅ Max quantization error: {error.max():.5f}")
+
+
+def test_matches_exact_search():
+    """Top-k ids and scores agree with the full-precision in-memory index"""
+    vectors = _vectors(500)
+    queries = _vectors(20, seed=1)
+    with tempfile.TemporaryDirectory() as directory:
+        quantized = QuantizedIndex(directory)
+        exact = InMemoryIndex()
+        _upsert(quantized, vectors)
+        _upsert(exact, vectors)
+        for query in queries:
+            expected = exact.query(query.tolist(), top_k=5, filter={"session_id": "s1"})
+            actual = quantized.query(query.tolist(), top_k=5, filter={"session_id": "s1"})
+            assert [m.id for m in actual.matches] == [m.id for m in expected.matches]
+            assert np.allclose(
+                [m.score for m in actual.matches], [m.score for m in expected.matches], atol=1e-5
+            )
+        memory = quantized.memory_bytes()
+        assert memory["float32"] / memory["quantized"] > 3.5, memory
+    print("✅ Quantized top-5 matches exact search")
+
+
+def test_persistence_and_deletes():
+    """Reopening replays upserts, replacements and deletes"""
+    vectors = _vectors(50)
+    with tempfile.TemporaryDirectory() as directory:
+        index = QuantizedIndex(directory)
+        _upsert(index, vectors[:30], "s1")
+        _upsert(index, vectors[30:], "s2")
+        _upsert(index, vectors[:1] * -1, "s1")  # replaces s1_0
+        index.delete(filter={"session_id": "s2"})
+
+        reopened = QuantizedIndex(directory)
+        results = reopened.query(vectors[30].tolist(), top_k=50)
+        ids = {match.id for match in results.matches}
+        assert len(ids) == 30 and not any(i.startswith("s2_") for i in ids), ids
+        best = reopened.query((vectors[0] * -1).tolist(), top_k=1, include_metadata=True)
+        assert best.matches[0].id == "s1_0" and best.matches[0].metadata["chunk_index"] == 0
+    print("✅ Reopened index reflects replacements and deletes")
+
+
+def test_compaction():
+    """Compaction shrinks the files and keeps query results"""
+    vectors = _vectors(200)
+    query = _vectors(1, seed=2)[0].tolist()
+    with tempfile.TemporaryDirectory() as directory:
+        index = QuantizedIndex(directory)
+        _upsert(index, vectors[:100], "s1")
+        _upsert(index, vectors[100:], "s2")
+        index.delete(filter={"session_id": "s1"})
+        before = [m.id for m in index.query(query, top_k=10).matches]
+        index.compact()
+        after = [m.id for m in index.query(query, top_k=10).matches]
+        assert before == after
+        assert index.memory_bytes()["quantized"] == 100 * (64 + 4)
+        assert [m.id for m in QuantizedIndex(directory).query(query, top_k=10).matches] == before
+    print("✅ Compaction keeps results")
+
+
+def test_zero_vector_lookup():
+    """A zero query vector returns rows matching the filter"""
+    with tempfile.TemporaryDirectory() as directory:
+        index = QuantizedIndex(directory)
+        _upsert(index, _vectors(10))
+        results = index.query([0.0] * 64, top_k=10, filter={"session_id": "s1", "chunk_index": 3},
+                              include_metadata=True)
+        assert [m.id for m in results.matches] == ["s1_3"]
+    print("✅ Zero-vector lookup by metadata")
+
+
+if __name__ == "__main__":
+    test_quantization_error_is_small()
+    test_matches_exact_search()
+    test_persistence_and_deletes()
+    test_compaction()
+    test_zero_vector_lookup()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Rate limiter test against a local fake OpenAI server that returns 429s
+
+Usage:
+    python test_rate_limiter.py
+
+This script verifies that:
+1. Calls are retried with backoff after 429 responses and eventually succeed
+2. Persistent 429s surface as RateLimitExceeded after max_retries
+3. Interactive calls are admitted before queued background calls
+4. A stream stopped early is closed and its unused tokens are refunded
+No API keys are required.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Settings require these; the fake server never checks them
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+
+from openai import AsyncOpenAI
+from app.services.rate_limiter import RateLimiter, RateLimitExceeded, Priority
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Returns 429 for the first `failures` requests, then a completion"""
+
+    failures = 0
+    requests = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        cls = type(self)
+        cls.requests += 1
+        if cls.requests <= cls.failures:
+            body = json.dumps({"error": {"message": "Rate limit reached", "type": "requests"}})
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+        else:
+            body = json.dumps({
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-5-mini",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "ok"},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6}
+            })
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(failures: int):
+    FakeOpenAIHandler.failures = failures
+    FakeOpenAIHandler.requests = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = AsyncOpenAI(
+        api_key="test",
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+        max_retries=0
+    )
+    return server, client
+
+
+def make_limiter(max_retries: int = 4, max_concurrency: int = 4) -> RateLimiter:
+    return RateLimiter(
+        requests_per_minute=6000,
+        tokens_per_minute=1000000,
+        max_concurrency=max_concurrency,
+        max_retries=max_retries,
+        base_delay=0.01
+    )
+
+
+def _complete(client):
+    return lambda: client.chat.completions.create(
+        model="gpt-5-mini",
+        messages=[{"role": "user", "content": "hi"}],
+        max_completion_tokens=10
+    )
+
+
+def test_retries_after_429():
+    """Two 429s followed by success: the call succeeds after two retries"""
+    async def run():
+        server, client = start_server(failures=2)
+        try:
+            limiter = make_limiter()
+            response = await limiter.call("gpt-5-mini", _complete(client), tokens=20)
+            stats = limiter.get_stats()["gpt-5-mini"]
+            assert response.choices[0].message.content == "ok"
+            assert stats["retries"] == 2, stats
+            assert stats["rate_limited"] == 2, stats
+            assert stats["rate_factor"] < 1.0, stats
+            print(f"✅ Retried after 429s: {stats}")
+        finally:
+            server.shutdown()
+
+    asyncio.run(run())
+
+
+def test_persistent_429_raises():
+    """A server that always returns 429 surfaces RateLimitExceeded"""
+    async def run():
+        server, client = start_server(failures=1000)
+        try:
+            limiter = make_limiter(max_retries=2)
+            try:
+                await limiter.call("gpt-5-mini", _complete(client), tokens=20)
+                raise AssertionError("Expected RateLimitExceeded")
+            except RateLimitExceeded as e:
+                print(f"✅ Gave up after retries: {e}")
+            assert FakeOpenAIHandler.requests == 3
+        finally:
+            server.shutdown()
+
+    asyncio.run(run())
+
+
+def test_interactive_before_background():
+    """With one slot busy, a later interactive call is admitted before queued background calls"""
+    async def run():
+        limiter = make_limiter(max_concurrency=1)
+        order = []
+        release = asyncio.Event()
+
+        async def job(name, priority, hold=False):
+            async def fn():
+                order.append(name)
+                if hold:
+                    await release.wait()
+            await limiter.call("gpt-5-mini", fn, tokens=1, priority=priority)
+
+        first = asyncio.create_task(job("first", Priority.DEFAULT, hold=True))
+        await asyncio.sleep(0.01)
+        background = [asyncio.create_task(job(f"background{i}", Priority.BACKGROUND)) for i in range(2)]
+        await asyncio.sleep(0.01)
+        interactive = asyncio.create_task(job("interactive", Priority.INTERACTIVE))
+        await asyncio.sleep(0.01)
+
+        assert limiter.get_stats()["gpt-5-mini"]["queue_depth"] == 3
+        release.set()
+        await asyncio.gather(first, interactive, *background)
+        assert order == ["first", "interactive", "background0", "background1"], order
+        print(f"✅ Admission order: {order}")
+
+    asyncio.run(run())
+
+
+class FakeStream:
+    """Async iterator of chunks that records whether it was closed"""
+
+    def __init__(self, items):
+        self.items = iter(items)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        self.closed = True
+
+
+class Usage:
+    total_tokens = 20
+
+
+class UsageChunk:
+    usage = Usage()
+
+
+def test_stream_closed_and_refunded():
+    """Stopping a stream early closes it and refunds the completion tokens not streamed"""
+    async def run():
+        limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=600, max_concurrency=1)
+        model = limiter.for_model("gpt-5-mini")
+
+        opened = FakeStream([f"token {i}" for i in range(50)])
+
+        async def open_stream():
+            return opened
+
+        stream = limiter.stream("gpt-5-mini", open_stream, tokens=150, completion_tokens=100)
+        async for item in stream:
+            if item == "token 2":
+                break
+        await stream.aclose()
+        assert opened.closed and model.active == 0
+        # 150 reserved, 3 of the 100 completion tokens streamed: 97 refunded
+        assert 545 <= model.tokens.available <= 552, model.tokens.available
+
+        finished = FakeStream(["token", UsageChunk()])
+
+        async def open_finished():
+            return finished
+
+        items = [item async for item in limiter.stream("gpt-5-mini", open_finished, tokens=150,
+                                                       completion_tokens=100)]
+        assert len(items) == 2 and finished.closed and model.active == 0
+        # Usage reported 20 of the 150 reserved tokens
+        assert 524 <= model.tokens.available <= 532, model.tokens.available
+        print("✅ Early-stopped stream closed, unused tokens refunded")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_retries_after_429()
+    test_persistent_429_raises()
+    test_interactive_before_background()
+    test_stream_closed_and_refunded()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Index versioning and re-indexing test
+
+Usage:
+    python test_reindexing.py
+
+This script verifies that:
+1. A session indexed with other chunking settings is re-indexed on first access,
+   reusing the embeddings of unchanged chunks
+2. Concurrent queries share one migration and never see the old version
+3. A new embedding model re-embeds every chunk
+4. A question does not wait behind a background migration of its session,
+   and a failed migration surfaces as an error instead of empty retrieval
+No API keys are required (a local bag-of-words embedding is used).
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from benchmarks.chunking import embed
+from benchmarks.sample_pdf import build_sample_paper
+from app.services.pdf_parser import PDFParser
+from app.services.rag_service import RAGService, IndexMigrationError
+from app.services.rate_limiter import Priority
+from app.services.session_manager import session_manager
+
+
+def _service(calls: dict, index=None) -> RAGService:
+    service = RAGService()
+    if index is not None:
+        service.index = index
+
+    async def local_embed(text, priority):
+        calls["single"] = calls.get("single", 0) + 1
+        return embed(text).tolist()
+
+    async def local_embed_many(texts, priority):
+        calls["batch"] = calls.get("batch", 0) + 1
+        calls["texts"] = calls.get("texts", 0) + len(texts)
+        return [embed(text).tolist() for text in texts]
+
+    service._embed = local_embed
+    service._embed_many = local_embed_many
+    return service
+
+
+async def _indexed_session(calls: dict):
+    pdf = build_sample_paper(seed=3)
+    pages = await PDFParser.extract_pages(pdf)
+    text = PDFParser.clean_text(PDFParser.join_pages(pages))
+    session_id = session_manager.create_session("paper.pdf", text, pdf_content=pdf)
+    old = _service(calls)
+    await old.index_document(session_id, text, pages=pages)
+    return old, session_id
+
+
+def _versions(index, session_id):
+    matches = index.query([0.0] * 4096, top_k=1000, filter={"session_id": session_id},
+                          include_metadata=True).matches
+    return [match.metadata["index_version"] for match in matches]
+
+
+def test_lazy_migration_reuses_embeddings():
+    async def run():
+        calls = {}
+        old, session_id = await _indexed_session(calls)
+        body_chunks = len(_versions(old.index, session_id))
+
+        # Now also embed references: a new index version
+        new = _service(calls, index=old.index)
+        new.indexed_tiers.add("references")
+        new.index_version = new._compute_index_version()
+        assert new.index_version != old.index_version
+        calls.clear()
+
+        results = await asyncio.gather(*(
+            new.retrieve_chunks(session_id, "What does the method improve?") for _ in range(3)
+        ))
+        # One migration, embedding only the reference chunks in one request
+        assert calls["batch"] == 1 and calls["single"] == 3, calls
+        versions = _versions(new.index, session_id)
+        assert set(versions) == {new.index_version}
+        assert len(versions) == body_chunks + calls["texts"]
+        assert all(chunks for chunks, _ in results)
+        assert new.is_current(session_id)
+        session_manager.delete_session(session_id)
+
+    asyncio.run(run())
+    print("✅ Session re-indexed on first access, unchanged chunks not re-embedded")
+
+
+def test_new_embedding_model_reembeds():
+    async def run():
+        calls = {}
+        old, session_id = await _indexed_session(calls)
+        chunks = len(_versions(old.index, session_id))
+
+        new = _service(calls, index=old.index)
+        new.embeddings.model = "text-embedding-3-small"
+        new.index_version = new._compute_index_version()
+        calls.clear()
+        assert await new.ensure_current(session_id)
+        assert calls["texts"] == chunks, calls
+        assert set(_versions(new.index, session_id)) == {new.index_version}
+        session_manager.delete_session(session_id)
+
+    asyncio.run(run())
+    print("✅ New embedding model re-embeds every chunk")
+
+
+def test_interactive_does_not_wait_for_background():
+    async def run():
+        calls = {}
+        old, session_id = await _indexed_session(calls)
+        new = _service(calls, index=old.index)
+        new.embeddings.model = "text-embedding-3-small"
+        new.index_version = new._compute_index_version()
+
+        release = asyncio.Event()
+
+        async def queued_embed(texts):
+            # Background embeddings wait behind other work
+            await release.wait()
+            return [embed(text).tolist() for text in texts]
+
+        new.embedding_batcher.embed = queued_embed
+        background = asyncio.create_task(new.ensure_current(session_id, Priority.BACKGROUND))
+        while session_id not in new._migrations:
+            await asyncio.sleep(0)
+
+        chunks, _ = await asyncio.wait_for(new.retrieve_chunks(session_id, "What does the method improve?"), 5)
+        assert chunks and not background.done()
+        release.set()
+        assert await background
+        assert set(_versions(new.index, session_id)) == {new.index_version}
+        assert len(_versions(new.index, session_id)) == len(_versions(old.index, session_id))
+
+        # Failed migrations and unknown sessions raise rather than returning nothing
+        failing = _service(calls, index=old.index)
+        failing.embeddings.model = "text-embedding-3-large-v2"
+        failing.index_version = failing._compute_index_version()
+
+        async def broken_embed_many(texts, priority):
+            raise RuntimeError("embeddings unavailable")
+
+        failing._embed_many = broken_embed_many
+        for missing in (session_id, "no-such-session"):
+            try:
+                await failing.retrieve_chunks(missing, "What does the method improve?")
+            except IndexMigrationError as e:
+                assert missing in str(e)
+            else:
+                raise AssertionError("expected IndexMigrationError")
+        assert not failing._migrations
+        session_manager.delete_session(session_id)
+
+    asyncio.run(run())
+    print("✅ Questions skip the background queue; failed migrations raise a clear error")
+
+
+if __name__ == "__main__":
+    test_lazy_migration_reuses_embeddings()
+    test_new_embedding_model_reembeds()
+    test_interactive_does_not_wait_for_background()
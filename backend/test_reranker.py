@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Re-ranking test
+
+Usage:
+    python test_reranker.py
+
+This script verifies that:
+1. With embedding-like cosines (all between 0.6 and 0.85), a clearly less
+   relevant tail is dropped once min_k chunks are selected
+2. The caller's vectors are not modified
+No API keys are required.
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from app.services.reranker import mmr_select
+
+
+def _with_cosine(cosine: float, axis: int, dimension: int) -> np.ndarray:
+    """Vector at the given cosine to the first axis, off towards another axis"""
+    vector = np.zeros(dimension, dtype=np.float32)
+    vector[0], vector[axis] = cosine, np.sqrt(1 - cosine ** 2)
+    return vector * 3  # not normalized
+
+
+def test_irrelevant_tail_dropped():
+    dimension = 32
+    query = np.zeros(dimension, dtype=np.float32)
+    query[0] = 2.0
+    relevant = [_with_cosine(0.85 - 0.01 * i, 1 + i, dimension) for i in range(4)]
+    tail = [_with_cosine(0.62 + 0.01 * i, 10 + i, dimension) for i in range(8)]
+    vectors = np.stack(tail[:4] + relevant + tail[4:])
+    original_vectors, original_query = vectors.copy(), query.copy()
+
+    selected = mmr_select(query, vectors, [100] * len(vectors), token_budget=10000, max_k=8, min_k=3)
+    assert sorted(selected) == [4, 5, 6, 7], selected
+    assert np.array_equal(vectors, original_vectors) and np.array_equal(query, original_query)
+
+    # Without a floor the budget and max_k are the only limits
+    assert len(mmr_select(query, vectors, [100] * len(vectors), 10000, 8, relative_floor=0.0)) == 8
+    print("✅ Irrelevant tail dropped; inputs left unmodified")
+
+
+if __name__ == "__main__":
+    test_irrelevant_tail_dropped()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Session retention test
+
+Usage:
+    python test_retention.py
+
+This script verifies that:
+1. Sessions are selected for eviction by TTL, then least recently used
+   beyond the session count and disk limits, sparing recently used ones
+2. A sweep deletes the PDF, text, vectors, paper vector and threads together;
+   with a remote index only the index calls leave the event loop
+3. Interrupted writes and staging files are reclaimed after a grace period,
+   while stored PDFs without a session (e.g. not restored) are kept
+No API keys are required (a local bag-of-words embedding is used).
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from benchmarks.chunking import embed
+from benchmarks.sample_pdf import build_sample_paper
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+from app.services.conversation import conversation_manager
+from app.services.pdf_parser import PDFParser
+from app.services.rag_service import rag_service
+from app.services.retention import RetentionSweeper, ORPHAN_GRACE_SECONDS, delete_sessions
+from app.services.session_manager import session_manager, PARTIAL_SUFFIX
+
+LIMITS = ("session_ttl_seconds", "max_sessions", "max_upload_bytes")
+
+
+def _with_limits(**limits):
+    previous = {name: getattr(settings, name) for name in LIMITS}
+    for name in LIMITS:
+        setattr(settings, name, limits.get(name, 0))
+    return previous
+
+
+def _restore(previous):
+    for name, value in previous.items():
+        setattr(settings, name, value)
+
+
+def test_select_evictions():
+    now = time.time()
+    ids = []
+    # Idle for 5 h, 4 h, 3 h, 2 h, 1 h and just now; 1000-byte PDFs
+    for hours in (5, 4, 3, 2, 1, 0):
+        session_id = session_manager.create_session(f"{hours}h.pdf", "text", pdf_content=b"%" * 1000)
+        session_manager.get_session(session_id, touch=False).last_access = now - hours * 3600
+        ids.append(session_id)
+    other = [s for s in session_manager.session_ids() if s not in ids]
+    for session_id in other:
+        session_manager.get_session(session_id, touch=False).last_access = now
+    sweeper = RetentionSweeper()
+    previous = _with_limits()
+    try:
+        assert sweeper.select_evictions(now) == []
+        settings.session_ttl_seconds = 2.5 * 3600
+        assert sweeper.select_evictions(now) == ids[:3]
+        settings.max_sessions = len(other) + 2
+        assert sweeper.select_evictions(now) == ids[:4]
+        settings.max_upload_bytes = 1500
+        assert sweeper.select_evictions(now) == ids[:5]
+        # The session used just now is spared even over the limits
+        settings.max_sessions = 1
+        assert sweeper.select_evictions(now) == ids[:5]
+    finally:
+        _restore(previous)
+        for session_id in ids:
+            session_manager.delete_session(session_id)
+    print("✅ Evictions selected by TTL, then least recently used")
+
+
+def test_sweep_deletes_everything():
+    async def local_embed(text, priority):
+        return embed(text).tolist()
+
+    original_embed = rag_service._embed
+    rag_service._embed = local_embed
+
+    async def run():
+        ids = []
+        for seed in range(3):
+            pdf = build_sample_paper(seed=seed)
+            pages = await PDFParser.extract_pages(pdf)
+            text = PDFParser.clean_text(PDFParser.join_pages(pages))
+            session_id = session_manager.create_session("paper.pdf", text, pdf_content=pdf)
+            await rag_service.index_document(session_id, text, pages=pages)
+            session_manager.get_session(session_id, touch=False).last_access -= 3600 * (3 - seed)
+            conversation_manager.create_thread(session_id)
+            ids.append(session_id)
+        paths = [session_manager.get_session(s, touch=False).pdf_path for s in ids]
+        threads = [conversation_manager.create_thread(s).thread_id for s in ids]
+
+        previous = _with_limits(session_ttl_seconds=1.5 * 3600)
+        try:
+            result = await RetentionSweeper().sweep()
+        finally:
+            _restore(previous)
+        assert result["evicted"] == 2 and result["freed_bytes"] >= sum(map(os.path.getsize, paths[2:]))
+        for session_id, path, thread_id in zip(ids[:2], paths, threads):
+            assert not session_manager.session_exists(session_id) and not os.path.exists(path)
+            assert conversation_manager.get_thread(thread_id) is None
+            assert session_id not in rag_service.paper_index
+            assert not rag_service.index.query([0.0] * 8, top_k=10, filter={"session_id": session_id}).matches
+        assert os.path.exists(paths[2]) and await rag_service.get_chunks(ids[2], [0])
+
+        with TestClient(app) as client:
+            assert client.delete(f"/api/session/{ids[2]}").json()["deleted"] is True
+            assert client.delete(f"/api/session/{ids[2]}").status_code == 404
+        assert not os.path.exists(paths[2]) and ids[2] not in rag_service.paper_index
+
+    try:
+        asyncio.run(run())
+    finally:
+        rag_service._embed = original_embed
+    print("✅ Sweep deleted PDFs, vectors and threads of evicted sessions")
+
+
+class _RemoteIndex:
+    def __init__(self):
+        self.threads = []
+
+    def delete(self, **kwargs):
+        self.threads.append(threading.get_ident())
+
+
+def test_remote_delete_off_loop():
+    session_id = str(uuid.uuid4())
+    rag_service.paper_index.add(session_id, embed("paper vector"))
+    rag_service._current_sessions.add(session_id)
+    removals = []
+    original_remove = rag_service.paper_index.remove
+
+    def remove(paper_id):
+        removals.append(threading.get_ident())
+        original_remove(paper_id)
+
+    remote = _RemoteIndex()
+    originals = rag_service.pc, rag_service.index
+    rag_service.pc, rag_service.index = object(), remote
+    rag_service.paper_index.remove = remove
+    try:
+        asyncio.run(delete_sessions([session_id]))
+    finally:
+        rag_service.pc, rag_service.index = originals
+        del rag_service.paper_index.remove
+    loop_thread = threading.get_ident()
+    assert removals == [loop_thread] and len(remote.threads) == 1 and remote.threads[0] != loop_thread
+    assert session_id not in rag_service.paper_index and not rag_service.is_current(session_id)
+    print("✅ Remote vector deletes run in a thread, in-memory state on the loop")
+
+
+def test_orphaned_uploads_removed():
+    stale = time.time() - ORPHAN_GRACE_SECONDS - 60
+    live = session_manager.create_session("kept.pdf", "text")
+    with tempfile.TemporaryDirectory() as directory:
+        unrestored, kept = (os.path.join(directory, f"{name}.pdf") for name in (uuid.uuid4(), live))
+        old_partial, recent_partial = (
+            os.path.join(directory, f"{uuid.uuid4()}.pdf{PARTIAL_SUFFIX}") for _ in range(2)
+        )
+        for path in (unrestored, kept, old_partial, recent_partial):
+            with open(path, "wb") as f:
+                f.write(b"%PDF")
+        os.makedirs(os.path.join(directory, "incoming", "finished-job"))
+        for path in (unrestored, kept, old_partial, os.path.join(directory, "incoming", "finished-job")):
+            os.utime(path, (stale, stale))
+        try:
+            assert RetentionSweeper._remove_orphans(directory) == (2, 4)
+            assert not os.path.exists(old_partial) and os.path.exists(recent_partial)
+            assert os.path.exists(unrestored) and os.path.exists(kept)
+            assert os.listdir(os.path.join(directory, "incoming")) == []
+        finally:
+            session_manager.delete_session(live)
+    print("✅ Leftover files reclaimed after the grace period, stored PDFs kept")
+
+
+if __name__ == "__main__":
+    test_select_evictions()
+    test_sweep_deletes_everything()
+    test_remote_delete_off_loop()
+    test_orphaned_uploads_removed()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Langfuse score exporter test against a local mock ingestion collector
+
+Usage:
+    python test_score_exporter.py
+
+This script verifies that:
+1. Queuing scores never waits on the collector, even when it is slow
+2. Scores are sent in batches, flushed by size and by timer
+3. Scores beyond the queue capacity are dropped and counted
+4. Shutdown drains everything still queued
+No Langfuse account is required.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Settings require these; the mock collector never checks them
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+
+from app.services.score_exporter import ScoreExporter
+
+
+class MockCollectorHandler(BaseHTTPRequestHandler):
+    """Records ingestion batches, optionally after a delay"""
+
+    batches = []
+    delay = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        time.sleep(type(self).delay)
+        expected = "Basic " + base64.b64encode(b"pk-test:sk-test").decode()
+        assert self.headers.get("Authorization") == expected
+        assert self.path == "/api/public/ingestion"
+        type(self).batches.append(body["batch"])
+        self.send_response(207)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps({"successes": [], "errors": []}).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+def start_collector(delay: float = 0.0):
+    MockCollectorHandler.batches = []
+    MockCollectorHandler.delay = delay
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockCollectorHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def make_exporter(host: str, **kwargs) -> ScoreExporter:
+    return ScoreExporter(host=host, public_key="pk-test", secret_key="sk-test", **kwargs)
+
+
+def queue_scores(exporter: ScoreExporter, count: int):
+    for i in range(count):
+        exporter.create_score(name="faithfulness", value=0.8, trace_id=f"trace-{i}")
+
+
+def test_batches_by_size_and_timer():
+    """12 scores with batch size 5: two full batches, then the timer flushes the rest"""
+    async def run():
+        server, host = start_collector()
+        try:
+            exporter = make_exporter(host, batch_size=5, flush_interval=0.2)
+            queue_scores(exporter, 12)
+            await asyncio.sleep(0.6)
+            sizes = [len(batch) for batch in MockCollectorHandler.batches]
+            assert sizes == [5, 5, 2], sizes
+            event = MockCollectorHandler.batches[0][0]
+            assert event["type"] == "score-create"
+            assert event["body"]["traceId"] == "trace-0"
+            assert exporter.get_stats()["exported"] == 12
+            await exporter.shutdown()
+            print(f"✅ Batch sizes: {sizes}")
+        finally:
+            server.shutdown()
+
+    asyncio.run(run())
+
+
+def test_slow_collector_does_not_block():
+    """Queuing against a collector that takes 0.5s per batch returns immediately"""
+    async def run():
+        server, host = start_collector(delay=0.5)
+        try:
+            exporter = make_exporter(host, batch_size=10, flush_interval=0.05)
+            start = time.perf_counter()
+            queue_scores(exporter, 30)
+            elapsed = time.perf_counter() - start
+            assert elapsed < 0.05, elapsed
+            await exporter.shutdown()
+            assert exporter.get_stats()["exported"] == 30
+            print(f"✅ Queued 30 scores in {elapsed * 1000:.2f}ms")
+        finally:
+            server.shutdown()
+
+    asyncio.run(run())
+
+
+def test_drops_under_backpressure_and_drains_on_shutdown():
+    """A full queue drops new scores; shutdown sends everything that was queued"""
+    async def run():
+        server, host = start_collector(delay=0.2)
+        try:
+            exporter = make_exporter(host, batch_size=10, flush_interval=0.05, max_queue_size=20)
+            queue_scores(exporter, 50)
+            stats = exporter.get_stats()
+            assert stats["dropped"] == 30, stats
+            await exporter.shutdown()
+            stats = exporter.get_stats()
+            assert stats["exported"] == 20, stats
+            assert sum(len(batch) for batch in MockCollectorHandler.batches) == 20
+            print(f"✅ Backpressure: {stats}")
+        finally:
+            server.shutdown()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_batches_by_size_and_timer()
+    test_slow_collector_does_not_block()
+    test_drops_under_backpressure_and_drains_on_shutdown()
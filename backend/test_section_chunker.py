@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Section chunker test
+
+Usage:
+    python test_section_chunker.py
+
+This script verifies that:
+1. A short trailing piece is merged without repeating the overlap
+2. "References" in body prose does not move the rest of the paper out of
+   the searchable tier, while the real bibliography still does
+No API keys are required.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from benchmarks.sample_pdf import build_sample_paper
+from app.services.index_filter import find_references_start
+from app.services.pdf_parser import PDFParser
+from app.services.section_chunker import SectionChunker
+from app.utils.sections import detect_sections
+
+
+def test_merge_keeps_overlap_once():
+    sentences = [f"Sentence {number} describes the retrieval setup in detail." for number in range(38)]
+    text = " ".join(sentences)
+    chunker = SectionChunker(chunk_size=400, chunk_overlap=120, min_chunk_size=200)
+    pieces = chunker.splitter.split_text(text)
+    assert len(pieces[-1]) < chunker.min_chunk_size, "the sample must end in a short piece"
+
+    merged = chunker._split_section(text)
+    assert len(merged) == len(pieces) - 1 and merged[-1] in text
+    for sentence in sentences[-4:]:
+        assert merged[-1].count(sentence) == 1, sentence
+    print("✅ Short trailing piece merged without duplicating the overlap")
+
+
+def test_references_in_prose():
+    pages = asyncio.run(PDFParser.extract_pages(build_sample_paper(pages=8, seed=3)))
+    text = PDFParser.clean_pages(pages)
+    references = find_references_start(text)
+    assert references is not None and references > len(text) // 2
+
+    # A "References" early in the body, followed by a capitalized word
+    position = text.index(". ", len(text) // 5) + 2
+    prose = text[:position] + "References Section Two explains the retriever. " + text[position:]
+    assert [offset for offset, label in detect_sections(prose) if label == "references"] \
+        == [references + len(prose) - len(text)]
+
+    chunks = SectionChunker(chunk_size=1000, chunk_overlap=100).split(prose)
+    body = [chunk for chunk in chunks if chunk.tier == "body"]
+    assert any("References Section Two" in chunk.text for chunk in body)
+    assert sum(len(chunk.text) for chunk in body) > len(text) // 2
+    assert chunks[-1].tier == "references"
+    print("✅ Prose mention of References keeps the body searchable")
+
+
+if __name__ == "__main__":
+    test_merge_keeps_overlap_once()
+    test_references_in_prose()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Compact session record test
+
+Usage:
+    python test_session_record.py
+
+This script verifies that:
+1. Session text round-trips through compression, including non-ASCII text
+2. Listing sessions uses the stored length without decompressing the text
+3. The session API returns the same fields as before
+4. Session detail is gzip-compressed, projected with fields= and revalidated with ETags
+No API keys are required.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.session_manager import SessionRecord, session_manager
+
+TEXT = "Attention Is All You Need\n\n한국어 요약 — naïve café ∑ " * 400
+
+
+def _no_decompress(self):
+    raise AssertionError("text decompressed")
+
+
+def test_text_round_trip():
+    record = SessionRecord("s1", "paper.pdf", TEXT)
+    assert record.text == TEXT and record.text_length == len(TEXT)
+    assert not hasattr(record, "__dict__")
+    assert record.memory_bytes() < len(TEXT.encode("utf-8")) / 3
+
+    record.text = "short"
+    assert record.text == "short" and record.text_length == 5
+    print(f"✅ Text compressed to {record.memory_bytes()} bytes and restored")
+
+
+def test_session_api():
+    session_id = session_manager.create_session("paper.pdf", TEXT)
+    session_manager.update_metadata(session_id, "Attention", "Vaswani et al.", "2017")
+    try:
+        original = SessionRecord.text
+        SessionRecord.text = property(_no_decompress)
+        try:
+            with TestClient(app) as client:
+                listing = client.get("/api/sessions").json()
+        finally:
+            SessionRecord.text = original
+        item = next(item for item in listing if item["session_id"] == session_id)
+        assert item["text_length"] == len(TEXT) and item["year"] == "2017"
+
+        with TestClient(app) as client:
+            detail = client.get(f"/api/session/{session_id}").json()
+        assert detail["text"] == TEXT and detail["title"] == "Attention" and detail["has_pdf"] is False
+    finally:
+        session_manager.delete_session(session_id)
+    print("✅ Session listing and detail served from compact records")
+
+
+def test_session_detail_caching():
+    session_id = session_manager.create_session("paper.pdf", TEXT)
+    try:
+        with TestClient(app) as client:
+            url = f"/api/session/{session_id}"
+            full = client.get(url)
+            assert full.headers["content-encoding"] == "gzip"
+            assert int(full.headers["content-length"]) < len(TEXT) / 10
+            assert full.json()["text"] == TEXT
+
+            original = SessionRecord.text
+            SessionRecord.text = property(_no_decompress)
+            try:
+                meta = client.get(url, params={"fields": "title, summary,has_pdf"})
+                assert meta.json() == {"has_pdf": False, "title": None, "summary": None}
+                assert meta.headers["etag"] != full.headers["etag"]
+                assert client.get(url, params={"fields": "text_length"}).status_code == 400
+
+                # Revalidation never builds the body
+                cached = client.get(url, headers={"If-None-Match": full.headers["etag"]})
+                assert cached.status_code == 304 and cached.headers["etag"] == full.headers["etag"]
+                plain = client.get(url, params={"fields": "title"}, headers={"Accept-Encoding": "identity"})
+                assert "content-encoding" not in plain.headers
+                assert client.get(url, params={"fields": "title"},
+                                  headers={"If-None-Match": plain.headers["etag"]}).status_code == 304
+            finally:
+                SessionRecord.text = original
+
+            session_manager.update_summary(session_id, "A new summary")
+            changed = client.get(url, headers={"If-None-Match": full.headers["etag"]})
+            assert changed.status_code == 200 and changed.json()["summary"] == "A new summary"
+    finally:
+        session_manager.delete_session(session_id)
+    print("✅ Session detail compressed, projected and revalidated")
+
+
+if __name__ == "__main__":
+    test_text_round_trip()
+    test_session_api()
+    test_session_detail_caching()
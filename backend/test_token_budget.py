@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Token budget test
+
+Usage:
+    python test_token_budget.py
+
+This script verifies that:
+1. Token counts are cached for chunk-sized texts but not for whole papers
+2. Segments stay within SEGMENT_TOKENS for Latin and CJK text alike
+3. Fitted text stays within the budget
+No API keys are required (token estimates are used without tiktoken's files).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from app.services import token_budget
+from app.services.token_budget import count_tokens, fit_text, truncate_to_tokens, SEGMENT_TOKENS
+
+LATIN = "The retriever encodes each passage with a shared transformer encoder. " * 400
+# Hangul and CJK ideographs, roughly one token per character
+CJK = "본 논문은 검색 증강 생성 모델을 제안한다。我们提出一种新的检索方法。 " * 400
+
+
+def test_count_cache_bounded():
+    token_budget._count_cached.cache_clear()
+    chunk = LATIN[:1000]
+    assert count_tokens(chunk) == count_tokens(chunk) > 0
+    assert token_budget._count_cached.cache_info().hits == 1
+    assert count_tokens(LATIN) > 0 and count_tokens(LATIN) == token_budget._count(LATIN)
+    assert token_budget._count_cached.cache_info().currsize == 1
+    print("✅ Token counts cached for chunks only")
+
+
+def test_segments_within_budget():
+    for name, text in (("latin", LATIN), ("cjk", CJK)):
+        segments = token_budget._segment(text)
+        assert "".join(segment for _, _, segment in segments) == text
+        largest = max(count_tokens(segment) for _, _, segment in segments)
+        assert largest <= SEGMENT_TOKENS, (name, largest)
+        assert largest > SEGMENT_TOKENS // 3, (name, largest)
+    print("✅ Latin and CJK segments within SEGMENT_TOKENS")
+
+
+def test_fit_within_budget():
+    for text in (LATIN, CJK):
+        fitted = fit_text(text, "gpt-4o-mini", 1000, max_input_tokens=3000)
+        assert count_tokens(fitted) <= 3000 and fitted != text
+        truncated = truncate_to_tokens(text, 500)
+        assert text.startswith(truncated) and 0 < count_tokens(truncated) <= 500
+    print("✅ Fitted text within the budget")
+
+
+if __name__ == "__main__":
+    test_count_cache_bounded()
+    test_segments_within_budget()
+    test_fit_within_budget()
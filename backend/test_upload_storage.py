@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Upload storage test
+
+Usage:
+    python test_upload_storage.py
+
+This script verifies that:
+1. PDFs are written atomically: a failed or oversized write leaves nothing behind
+2. /upload streams the file to disk, parses it from there and serves it back intact,
+   with uploads, staged files and parse results in a temporary directory
+No API keys are required (a local bag-of-words embedding is used).
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("PINECONE_ENVIRONMENT", "test")
+os.environ["VECTOR_STORE"] = "memory"
+
+from benchmarks.chunking import embed
+from benchmarks.sample_pdf import build_sample_paper
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import parse_cache
+from app.services import session_manager as session_manager_module
+from app.services.llm_service import llm_service
+from app.services.rag_service import rag_service
+from app.services.session_manager import session_manager, write_atomic, COPY_BUFFER_BYTES
+
+
+class FailingReader(io.BytesIO):
+    """Fails after the first piece, like a dropped connection"""
+
+    def read(self, size=-1):
+        if self.tell():
+            raise ConnectionError("client disconnected")
+        return super().read(size)
+
+
+def test_atomic_writes():
+    content = os.urandom(COPY_BUFFER_BYTES * 2 + 17)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "paper.pdf")
+        assert write_atomic(io.BytesIO(content), path) == len(content)
+        with open(path, "rb") as f:
+            assert f.read() == content
+
+        assert write_atomic(io.BytesIO(content), os.path.join(directory, "big.pdf"), limit=len(content) - 1) is None
+        try:
+            write_atomic(FailingReader(content), os.path.join(directory, "cut.pdf"))
+            raise AssertionError("the failed read must propagate")
+        except ConnectionError:
+            pass
+        assert os.listdir(directory) == ["paper.pdf"]
+    print("✅ Interrupted and oversized writes leave no file behind")
+
+
+def test_upload_round_trip():
+    pdf = build_sample_paper(seed=5)
+    originals = rag_service._embed, llm_service.extract_metadata
+
+    async def local_embed(text, priority):
+        return embed(text).tolist()
+
+    async def local_metadata(text, filename=None, local=None, **kwargs):
+        assert local is not None, "local metadata must come from the staged file"
+        return {"title": "Sample", "authors": "Unknown", "year": "2024"}
+
+    # Keep uploads, staged files and parse results out of the real uploads directory
+    directories = session_manager_module.UPLOAD_DIR, session_manager_module.INCOMING_DIR
+    defaults = parse_cache.parse_pdf_cached.__defaults__, parse_cache.restore_sessions.__defaults__
+    rag_service._embed, llm_service.extract_metadata = local_embed, local_metadata
+    with tempfile.TemporaryDirectory() as directory:
+        uploads, incoming, parsed = (os.path.join(directory, name) for name in ("uploads", "incoming", "parsed"))
+        session_manager_module.UPLOAD_DIR, session_manager_module.INCOMING_DIR = uploads, incoming
+        parse_cache.parse_pdf_cached.__defaults__ = (parsed,)
+        parse_cache.restore_sessions.__defaults__ = (uploads, parsed)
+        os.makedirs(uploads)
+        os.makedirs(incoming)
+        try:
+            with TestClient(app) as client:
+                response = client.post("/api/upload", files={"file": ("paper.pdf", pdf, "application/pdf")})
+                assert response.status_code == 200, response.text
+                session_id = response.json()["session_id"]
+                served = client.get(f"/api/session/{session_id}/pdf")
+            assert served.content == pdf and served.headers["content-type"] == "application/pdf"
+            assert os.listdir(incoming) == [] and len(os.listdir(parsed)) == 1
+            assert session_manager.get_session(session_id).pdf_bytes == len(pdf)
+            assert os.listdir(uploads) == [f"{session_id}.pdf"]
+        finally:
+            rag_service._embed, llm_service.extract_metadata = originals
+            session_manager_module.UPLOAD_DIR, session_manager_module.INCOMING_DIR = directories
+            parse_cache.parse_pdf_cached.__defaults__, parse_cache.restore_sessions.__defaults__ = defaults
+            if "session_id" in locals():
+                session_manager.delete_session(session_id)
+                rag_service.delete_session_vectors(session_id)
+    print("✅ Uploaded PDF streamed to disk, parsed from there and served intact")
+
+
+if __name__ == "__main__":
+    test_atomic_writes()
+    test_upload_round_trip()
@@ -41,13 +41,26 @@ export default function PaperPage() {
   const [error, setError] = useState<string>("");
   const [hasSummary, setHasSummary] = useState<boolean>(false);
   const [showRawText, setShowRawText] = useState<boolean>(false);
+  const [paperText, setPaperText] = useState<string | null>(null);
 
   useEffect(() => {
     const fetchSession = async () => {
       if (!sessionId) return;
 
       try {
-        const data = await api.getSession(sessionId);
+        // The extracted text is large; it is fetched only once it is shown
+        const data = await api.getSession(sessionId, [
+          "session_id",
+          "filename",
+          "has_pdf",
+          "title",
+          "authors",
+          "year",
+          "summary",
+          "storyline",
+          "rating",
+          "created_at",
+        ]);
         setSession(data);
         if (data.summary) {
           setHasSummary(true);
@@ -62,6 +75,16 @@ export default function PaperPage() {
     fetchSession();
   }, [sessionId]);
 
+  useEffect(() => {
+    if (!session || paperText !== null) return;
+    if (session.has_pdf && !showRawText) return;
+
+    api
+      .getSessionText(sessionId)
+      .then(setPaperText)
+      .catch(() => setPaperText(""));
+  }, [session, showRawText, paperText, sessionId]);
+
   const handleSummaryGenerated = () => {
     setHasSummary(true);
   };
@@ -211,7 +234,7 @@ export default function PaperPage() {
                 {showRawText && (
                   <div className="mt-4 bg-muted/30 p-6 rounded-lg max-h-[400px] overflow-y-auto border">
                     <pre className="whitespace-pre-wrap font-serif text-sm leading-relaxed">
-                      {session.text}
+                      {paperText ?? "Loading text..."}
                     </pre>
                   </div>
                 )}
@@ -229,11 +252,11 @@ export default function PaperPage() {
             <CardContent>
               <div className="bg-muted/30 p-6 rounded-lg max-h-[400px] overflow-y-auto border">
                 <pre className="whitespace-pre-wrap font-serif text-sm leading-relaxed">
-                  {session.text}
+                  {paperText ?? "Loading text..."}
                 </pre>
               </div>
               <p className="mt-3 text-sm text-muted-foreground">
-                Total characters: {session.text.length.toLocaleString()}
+                Total characters: {(paperText ?? "").length.toLocaleString()}
               </p>
             </CardContent>
           </Card>
@@ -58,22 +58,20 @@ export default function StorylineDisplay({
     setError("");
     setStoryline("");
 
-    try {
-      const response = await api.analyzeStoryline(
-        sessionId,
-        selectedModel,
-        selectedLanguage
-      );
-      setStoryline(response.storyline);
-    } catch (err: any) {
-      const errorMsg =
-        selectedLanguage === "ko"
-          ? "스토리라인 분석에 실패했습니다"
-          : "Failed to analyze storyline";
-      setError(err.response?.data?.detail || errorMsg);
-    } finally {
-      setIsAnalyzing(false);
-    }
+    const errorMsg =
+      selectedLanguage === "ko"
+        ? "스토리라인 분석에 실패했습니다"
+        : "Failed to analyze storyline";
+
+    await api.analyzeStorylineStream(
+      sessionId,
+      selectedModel,
+      selectedLanguage,
+      (chunk) => setStoryline((prev) => prev + chunk),
+      () => {},
+      (message) => setError(message || errorMsg)
+    );
+    setIsAnalyzing(false);
   };
 
   return (
@@ -97,7 +95,7 @@ export default function StorylineDisplay({
           </div>
         )}
 
-        {isAnalyzing && (
+        {isAnalyzing && !storyline && (
           <div className="text-center p-8 bg-primary/5 rounded-lg space-y-3">
             <Loader2 className="h-10 w-10 text-primary mx-auto animate-spin" />
             <p className="font-semibold text-primary">
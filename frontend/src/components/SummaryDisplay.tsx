@@ -82,20 +82,18 @@ export default function SummaryDisplay({
       finalPrompt = `${customPrompt}\n\nPlease respond in Korean (한국어로 응답해주세요).`;
     }
 
-    try {
-      const response = await api.summarize(
-        sessionId,
-        finalPrompt || undefined,
-        selectedModel
-      );
-      setSummary(response.summary);
-      onSummaryGenerated();
-      setShowRegenerate(false);
-    } catch (err: any) {
-      setError(err.response?.data?.detail || "Failed to generate summary");
-    } finally {
-      setIsGenerating(false);
-    }
+    await api.summarizeStream(
+      sessionId,
+      finalPrompt || undefined,
+      selectedModel,
+      (chunk) => setSummary((prev) => prev + chunk),
+      () => {
+        onSummaryGenerated();
+        setShowRegenerate(false);
+      },
+      (message) => setError(message || "Failed to generate summary")
+    );
+    setIsGenerating(false);
   };
 
   const handleRate = async (ratingType: "thumbs_up" | "thumbs_down") => {
@@ -126,7 +124,7 @@ export default function SummaryDisplay({
           </div>
         )}
 
-        {isGenerating && (
+        {isGenerating && !summary && (
           <div className="text-center p-8 bg-primary/5 rounded-lg space-y-3">
             <Loader2 className="h-10 w-10 text-primary mx-auto animate-spin" />
             <p className="font-semibold text-primary">
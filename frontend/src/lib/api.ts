@@ -41,7 +41,7 @@ export interface ModelInfo {
 export interface SessionDetail {
   session_id: string;
   filename: string;
-  text: string;
+  text?: string; // Only present when requested (see getSession fields)
   has_pdf: boolean;
   title: string | null;
   authors: string | null;
@@ -75,6 +75,43 @@ export const getPdfUrl = (sessionId: string): string => {
   return `${API_BASE_URL}/session/${sessionId}/pdf`;
 };
 
+// Read a Server-Sent Events response and dispatch each JSON data line
+const readEventStream = async (
+  response: Response,
+  onEvent: (data: any) => void
+) => {
+  const reader = response.body?.getReader();
+  const decoder = new TextDecoder();
+
+  if (!reader) {
+    throw new Error("No reader available");
+  }
+
+  let buffer = "";
+  while (true) {
+    const { done, value } = await reader.read();
+
+    if (done) {
+      break;
+    }
+
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    // Keep a partial trailing line for the next read
+    buffer = lines.pop() || "";
+
+    for (const line of lines) {
+      if (line.startsWith("data: ")) {
+        try {
+          onEvent(JSON.parse(line.slice(6)));
+        } catch (e) {
+          // Skip invalid JSON
+        }
+      }
+    }
+  }
+};
+
 export const api = {
   uploadPdf: async (file: File): Promise<UploadResponse> => {
     const formData = new FormData();
@@ -137,11 +174,23 @@ export const api = {
     return response.data;
   },
 
-  getSession: async (sessionId: string): Promise<SessionDetail> => {
-    const response = await axios.get(`${API_BASE_URL}/session/${sessionId}`);
+  getSession: async (
+    sessionId: string,
+    fields?: (keyof SessionDetail)[]
+  ): Promise<SessionDetail> => {
+    const response = await axios.get(`${API_BASE_URL}/session/${sessionId}`, {
+      params: fields ? { fields: fields.join(",") } : undefined,
+    });
     return response.data;
   },
 
+  getSessionText: async (sessionId: string): Promise<string> => {
+    const response = await axios.get(`${API_BASE_URL}/session/${sessionId}`, {
+      params: { fields: "text" },
+    });
+    return response.data.text;
+  },
+
   getAllSessions: async (): Promise<SessionSummary[]> => {
     const response = await axios.get(`${API_BASE_URL}/sessions`);
     return response.data;
@@ -214,4 +263,82 @@ export const api = {
       onError(error.message || "Failed to stream answer");
     }
   },
+
+  summarizeStream: async (
+    sessionId: string,
+    customPrompt: string | undefined,
+    model: string | undefined,
+    onChunk: (content: string) => void,
+    onComplete: () => void,
+    onError: (error: string) => void
+  ) => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/summarize/stream`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({
+          session_id: sessionId,
+          custom_prompt: customPrompt,
+          model: model,
+        }),
+      });
+
+      if (!response.ok) {
+        throw new Error("Stream request failed");
+      }
+
+      await readEventStream(response, (data) => {
+        if (data.type === "content") {
+          onChunk(data.content);
+        } else if (data.type === "done") {
+          onComplete();
+        } else if (data.type === "error") {
+          onError(data.error);
+        }
+      });
+    } catch (error: any) {
+      onError(error.message || "Failed to stream summary");
+    }
+  },
+
+  analyzeStorylineStream: async (
+    sessionId: string,
+    model: string | undefined,
+    language: string | undefined,
+    onChunk: (content: string) => void,
+    onComplete: () => void,
+    onError: (error: string) => void
+  ) => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/storyline/stream`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({
+          session_id: sessionId,
+          model: model,
+          language: language || "en",
+        }),
+      });
+
+      if (!response.ok) {
+        throw new Error("Stream request failed");
+      }
+
+      await readEventStream(response, (data) => {
+        if (data.type === "content") {
+          onChunk(data.content);
+        } else if (data.type === "done") {
+          onComplete();
+        } else if (data.type === "error") {
+          onError(data.error);
+        }
+      });
+    } catch (error: any) {
+      onError(error.message || "Failed to stream storyline");
+    }
+  },
 };